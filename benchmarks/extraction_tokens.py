@@ -0,0 +1,64 @@
+"""
+Compare prompt tokens for base64-inlined course files vs locally extracted text.
+
+Usage:
+    venv/bin/python benchmarks/extraction_tokens.py <directory-of-course-files>
+
+Tokens are estimated at four characters per token.
+"""
+
+import base64
+import mimetypes
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from study_guide_agent.tools.extractors import DOCX_MIME, PPTX_MIME, extract_text
+
+EXTENSION_MIME = {".pdf": "application/pdf", ".pptx": PPTX_MIME, ".docx": DOCX_MIME}
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def main(directory: str) -> int:
+    totals: dict[str, dict[str, float]] = defaultdict(
+        lambda: {"files": 0, "base64_tokens": 0, "extracted_tokens": 0, "seconds": 0.0}
+    )
+    for path in sorted(Path(directory).rglob("*")):
+        if not path.is_file():
+            continue
+        mime_type = EXTENSION_MIME.get(path.suffix.lower()) or mimetypes.guess_type(path.name)[0]
+        if not mime_type:
+            continue
+        raw = path.read_bytes()
+        started = time.perf_counter()
+        with path.open("rb") as handle:
+            extracted = extract_text(mime_type, handle)
+        elapsed = time.perf_counter() - started
+        if extracted is None:
+            continue
+        row = totals[path.suffix.lower()]
+        row["files"] += 1
+        row["base64_tokens"] += estimate_tokens(base64.b64encode(raw).decode("ascii"))
+        row["extracted_tokens"] += estimate_tokens(extracted)
+        row["seconds"] += elapsed
+
+    print(f"{'type':<8}{'files':>7}{'base64 tok':>14}{'extracted tok':>15}{'saved':>9}{'ms/file':>10}")
+    for suffix, row in sorted(totals.items()):
+        saved = 1 - row["extracted_tokens"] / row["base64_tokens"] if row["base64_tokens"] else 0
+        per_file_ms = row["seconds"] * 1000 / row["files"]
+        print(
+            f"{suffix:<8}{int(row['files']):>7}{int(row['base64_tokens']):>14}"
+            f"{int(row['extracted_tokens']):>15}{saved:>9.1%}{per_file_ms:>10.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__)
+        raise SystemExit(2)
+    raise SystemExit(main(sys.argv[1]))
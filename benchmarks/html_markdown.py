@@ -0,0 +1,80 @@
+"""
+Measure HTML-to-markdown throughput and size reduction on Canvas rich content.
+
+Usage:
+    venv/bin/python benchmarks/html_markdown.py <directory>
+
+The directory may hold raw `.html` pages and/or course snapshot `{course_id}.json`
+files (see `CANVAS_SNAPSHOT_DIR`); every `body`, `message` and `description` string
+in a snapshot is treated as one document. Tokens are estimated at four characters
+per token.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from study_guide_agent.tools.html_markdown import HTML_FIELDS, html_to_markdown
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def collect_documents(value: Any, found: list[str]) -> None:
+    if isinstance(value, list):
+        for item in value:
+            collect_documents(item, found)
+    elif isinstance(value, dict):
+        for key, child in value.items():
+            if key in HTML_FIELDS and isinstance(child, str):
+                found.append(child)
+            else:
+                collect_documents(child, found)
+
+
+def main(directory: str) -> int:
+    documents: list[str] = []
+    for path in sorted(Path(directory).rglob("*")):
+        if path.suffix.lower() in (".html", ".htm"):
+            documents.append(path.read_text(encoding="utf-8", errors="replace"))
+        elif path.suffix.lower() == ".json":
+            collect_documents(json.loads(path.read_text(encoding="utf-8")), documents)
+    if not documents:
+        print("No HTML documents found.")
+        return 1
+
+    html_to_markdown.cache_clear()
+    started = time.perf_counter()
+    converted = [html_to_markdown(document) for document in documents]
+    cold_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    for document in documents:
+        html_to_markdown(document)
+    warm_seconds = time.perf_counter() - started
+
+    raw_bytes = sum(len(document.encode("utf-8")) for document in documents)
+    markdown_bytes = sum(len(text.encode("utf-8")) for text in converted)
+    raw_tokens = sum(estimate_tokens(document) for document in documents)
+    markdown_tokens = sum(estimate_tokens(text) for text in converted)
+    megabytes = raw_bytes / 1_000_000
+
+    print(f"documents        {len(documents):>12}")
+    print(f"html bytes       {raw_bytes:>12}")
+    print(f"markdown bytes   {markdown_bytes:>12}")
+    print(f"size reduction   {1 - markdown_bytes / raw_bytes if raw_bytes else 0:>12.1%}")
+    print(f"html tokens      {raw_tokens:>12}")
+    print(f"markdown tokens  {markdown_tokens:>12}")
+    print(f"cold MB/s        {megabytes / cold_seconds if cold_seconds else 0:>12.1f}")
+    print(f"memoized MB/s    {megabytes / warm_seconds if warm_seconds else 0:>12.1f}")
+    print(f"memo hits        {html_to_markdown.cache_info().hits:>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__)
+        raise SystemExit(2)
+    raise SystemExit(main(sys.argv[1]))
@@ -0,0 +1,55 @@
+"""
+Measure storage compression ratio and CPU cost on real study guides and metadata.
+
+Usage:
+    venv/bin/python benchmarks/storage_compression.py <directory>
+
+Every `.md` and `.json` file under the directory is compressed with each available
+codec (gzip always, zstd when `zstandard` is installed); point it at a copy of
+`runtime_storage/{provider}/study-guides` or `runs`.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from study_guide_agent.storage.compression import CODECS, zstd_available
+
+
+def main(directory: str) -> int:
+    documents = [
+        path.read_bytes()
+        for path in sorted(Path(directory).rglob("*"))
+        if path.is_file() and path.suffix.lower() in (".md", ".json")
+    ]
+    if not documents:
+        print("No .md or .json files found.")
+        return 1
+    raw_bytes = sum(len(document) for document in documents)
+    megabytes = raw_bytes / 1_000_000
+    codecs = [codec for codec in CODECS.values() if codec.name != "zstd" or zstd_available()]
+
+    print(f"{len(documents)} files, {raw_bytes} bytes")
+    print(f"{'codec':<8}{'stored':>12}{'ratio':>9}{'saved':>9}{'comp MB/s':>12}{'decomp MB/s':>14}")
+    for codec in codecs:
+        started = time.perf_counter()
+        compressed = [codec.compress(document) for document in documents]
+        compress_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        for blob in compressed:
+            codec.decompress(blob)
+        decompress_seconds = time.perf_counter() - started
+        stored = sum(len(blob) for blob in compressed)
+        print(
+            f"{codec.name:<8}{stored:>12}{raw_bytes / stored:>9.2f}{1 - stored / raw_bytes:>9.1%}"
+            f"{megabytes / compress_seconds if compress_seconds else 0:>12.1f}"
+            f"{megabytes / decompress_seconds if decompress_seconds else 0:>14.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__)
+        raise SystemExit(2)
+    raise SystemExit(main(sys.argv[1]))
@@ -0,0 +1,77 @@
+"""
+Compare the run-history summaries of two runs.
+
+Usage:
+    python -m study_guide_agent.compare_runs <baseline-run> <candidate-run>
+
+Each run is a run id read from the configured storage (`STORAGE_PROVIDER`) or a
+path to a run-history JSON file. Every numeric field is printed side by side with
+its change, e.g. `usage.totals.prompt_tokens` or `usage.tools.list_modules.seconds`.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+from study_guide_agent.storage import create_storage
+
+
+def flatten_numbers(value: Any, prefix: str = "") -> dict[str, float]:
+    if isinstance(value, bool):
+        return {}
+    if isinstance(value, (int, float)):
+        return {prefix: float(value)}
+    if isinstance(value, dict):
+        flat: dict[str, float] = {}
+        for key, child in value.items():
+            flat.update(flatten_numbers(child, f"{prefix}.{key}" if prefix else str(key)))
+        return flat
+    return {}
+
+
+def compare(
+    baseline: dict[str, Any], candidate: dict[str, Any]
+) -> list[tuple[str, float | None, float | None]]:
+    before = flatten_numbers(baseline)
+    after = flatten_numbers(candidate)
+    return [(key, before.get(key), after.get(key)) for key in sorted(before.keys() | after.keys())]
+
+
+def load_run(ref: str, storage: Any | None) -> dict[str, Any]:
+    path = Path(ref)
+    if path.suffix == ".json" and path.exists():
+        return json.loads(path.read_text())
+    if storage is None:
+        storage = create_storage(os.getenv("STORAGE_PROVIDER", "azure"))
+    summary = storage.read_run_history(ref)
+    if summary is None:
+        raise SystemExit(f"Run not found: {ref}")
+    return summary
+
+
+def main(argv: list[str], storage: Any | None = None) -> int:
+    if len(argv) != 2:
+        print(__doc__)
+        return 2
+    baseline, candidate = (load_run(ref, storage) for ref in argv)
+    rows = compare(baseline, candidate)
+    width = max([len("metric"), *(len(key) for key, _, _ in rows)])
+    print(f"{'metric':<{width}}{'baseline':>14}{'candidate':>14}{'change':>10}")
+    for key, before, after in rows:
+        change = ""
+        if before and after is not None:
+            change = f"{(after - before) / before:+.1%}"
+        print(f"{key:<{width}}{_cell(before):>14}{_cell(after):>14}{change:>10}")
+    return 0
+
+
+def _cell(value: float | None) -> str:
+    if value is None:
+        return "-"
+    return f"{value:.0f}" if value.is_integer() else f"{value:.3f}"
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
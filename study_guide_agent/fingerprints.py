@@ -0,0 +1,49 @@
+"""Cheap per-course change fingerprints used to skip unchanged courses."""
+
+import hashlib
+import json
+from typing import Any
+
+
+def config_digest(task_prompt: str, template: str, guidelines: str) -> str:
+    material = json.dumps([task_prompt, template, guidelines])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def course_fingerprint(course_data: dict[str, Any], config_hash: str) -> str:
+    """
+    Hash the change markers of a prefetched course: module structure, page, file and
+    assignment `updated_at` values, announcement ids, and the prompt configuration.
+    """
+    modules = [
+        (
+            str(module.get("id")),
+            module.get("position"),
+            module.get("name"),
+            [
+                (str(item.get("id")), item.get("title"), item.get("content_id"))
+                for item in module.get("items") or []
+            ],
+        )
+        for module in course_data.get("modules") or []
+    ]
+    markers = {
+        "config": config_hash,
+        "modules": modules,
+        "pages": _updated_markers(course_data.get("pages_index"), key="url"),
+        "files": _updated_markers(course_data.get("files")),
+        "assignments": _updated_markers(course_data.get("assignments")),
+        "announcements": _updated_markers(
+            course_data.get("announcements"), updated_key="posted_at"
+        ),
+    }
+    material = json.dumps(markers, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _updated_markers(
+    items: list[dict[str, Any]] | None, key: str = "id", updated_key: str = "updated_at"
+) -> list[tuple[str, str]]:
+    return sorted(
+        (str(item.get(key)), str(item.get(updated_key) or "")) for item in items or []
+    )
@@ -9,6 +9,8 @@ class StudyGuideConfig:
     task_prompt: str
     course_filter: str | None = None
     run_id: str | None = None
+    skip_unchanged: bool = True
+    course_fingerprints: dict[str, str | None] | None = None
 
 
 @dataclass(frozen=True)
@@ -17,6 +19,13 @@ class CourseResult:
     status: str
     guide_path: str | None = None
     error: str | None = None
+    fingerprint: str | None = None
+
+
+@dataclass(frozen=True)
+class GuideWriteResult:
+    path: str
+    status: str = "written"
 
 
 @dataclass(frozen=True)
@@ -1,3 +1,4 @@
+import json
 import os
 from collections.abc import Callable
 from typing import Any
@@ -6,39 +7,195 @@ from study_guide_agent.orchestrators.azure_openai import AzureOpenAIOrchestrator
 from study_guide_agent.orchestrators.azure_openai_client import (
     create_azure_openai_client_from_env,
 )
+from study_guide_agent.orchestrators.batch import OpenAIBatchBackend
+from study_guide_agent.orchestrators.completion_cache import CompletionCache
+from study_guide_agent.orchestrators.model_limiter import (
+    AdaptiveConcurrencyLimiter,
+    ResilientModelClient,
+)
 from study_guide_agent.orchestrators.protocol import AgentOrchestrator
-from study_guide_agent.storage import create_storage
+from study_guide_agent.orchestrators.usage import ModelPricing
+from study_guide_agent import storage as storage_providers
+from study_guide_agent.tools.async_canvas_tools import AsyncCanvasTools, BlockingCanvasTools
 from study_guide_agent.tools.canvas_tools import CanvasTools
+from study_guide_agent.tools.course_bundle import DEFAULT_PAGE_CHAR_BUDGET, build_course_bundle
+from study_guide_agent.tools.course_snapshot import CourseSnapshot
+from study_guide_agent.tools.extractors import DEFAULT_CHAR_BUDGET
+from study_guide_agent.tools.file_download import DEFAULT_MAX_FILE_BYTES
+from study_guide_agent.tools.html_markdown import normalize_html_fields
+from study_guide_agent.tools.http_cache import (
+    HttpCache,
+    LocalCacheBackend,
+    StorageCacheBackend,
+)
+from study_guide_agent.tools.projection import DEFAULT_FIELD_ALLOWLISTS, ToolResultProjector
+from study_guide_agent.tools.rate_limit import CanvasRateLimiter
+
+
+def create_http_cache_from_env(storage: Any) -> HttpCache | None:
+    mode = os.getenv("CANVAS_HTTP_CACHE", "storage").strip().lower()
+    if mode in {"", "off", "none", "0"}:
+        return None
+    max_bytes = int(os.getenv("CANVAS_HTTP_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    if mode == "local":
+        directory = os.getenv("CANVAS_HTTP_CACHE_DIR", ".cache/canvas-http")
+        return HttpCache(LocalCacheBackend(directory), max_bytes=max_bytes)
+    if mode == "storage":
+        return HttpCache(StorageCacheBackend(storage), max_bytes=max_bytes)
+    raise ValueError(f"Unknown CANVAS_HTTP_CACHE mode: {mode}")
+
+
+def create_completion_cache_from_env(client: Any, storage: Any) -> CompletionCache | None:
+    mode = os.getenv("COMPLETION_CACHE", "off").strip().lower()
+    if mode in {"", "off", "none", "0"}:
+        return None
+    if os.getenv("COMPLETION_CACHE_BACKEND", "storage").strip().lower() == "local":
+        backend = LocalCacheBackend(os.getenv("COMPLETION_CACHE_DIR", ".cache/completions"))
+    else:
+        backend = StorageCacheBackend(storage, prefix="completion-cache")
+    return CompletionCache(client, backend, mode=mode.replace("-", "_"))
+
+
+def create_resilient_client_from_env(client: Any) -> ResilientModelClient:
+    """The SDK's own retries are disabled so attempts are only counted and paced here."""
+    with_options = getattr(client, "with_options", None)
+    if callable(with_options):
+        client = with_options(max_retries=0)
+    timeout = float(os.getenv("MODEL_REQUEST_TIMEOUT_SECONDS", "300"))
+    return ResilientModelClient(
+        client,
+        limiter=AdaptiveConcurrencyLimiter(
+            initial=float(os.getenv("MODEL_CONCURRENCY", "4")),
+            maximum=float(os.getenv("MODEL_MAX_CONCURRENCY", "32")),
+        ),
+        max_retries=int(os.getenv("MODEL_MAX_RETRIES", "4")),
+        request_timeout_seconds=timeout or None,
+    )
+
+
+def create_result_projector_from_env() -> ToolResultProjector | None:
+    """`TOOL_RESULT_FIELDS` is inline JSON or a path to a JSON file of per-tool allowlists."""
+    if os.getenv("TOOL_RESULT_PROJECTION", "on").strip().lower() in {"off", "none", "0"}:
+        return None
+    allowlists = None
+    fields = os.getenv("TOOL_RESULT_FIELDS", "").strip()
+    if fields:
+        if not fields.startswith("{"):
+            with open(fields, encoding="utf-8") as handle:
+                fields = handle.read()
+        allowlists = {**DEFAULT_FIELD_ALLOWLISTS, **json.loads(fields)}
+    return ToolResultProjector(
+        allowlists,
+        use_columnar=os.getenv("TOOL_RESULT_COLUMNAR", "off").strip().lower()
+        in {"on", "1", "true"},
+    )
+
+
+def create_pricing_from_env() -> ModelPricing:
+    return ModelPricing(
+        prompt_per_million=float(os.getenv("MODEL_PROMPT_PRICE_PER_MTOK", "0")),
+        completion_per_million=float(os.getenv("MODEL_COMPLETION_PRICE_PER_MTOK", "0")),
+        cached_prompt_per_million=float(os.getenv("MODEL_CACHED_PROMPT_PRICE_PER_MTOK", "0")),
+    )
+
+
+def create_rate_limiter_from_env() -> CanvasRateLimiter | None:
+    if os.getenv("CANVAS_RATE_LIMIT", "on").strip().lower() in {"off", "none", "0"}:
+        return None
+    return CanvasRateLimiter(
+        low_watermark=float(os.getenv("CANVAS_RATE_LIMIT_LOW_WATERMARK", "150")),
+        refill_per_second=float(os.getenv("CANVAS_RATE_LIMIT_REFILL_PER_SECOND", "10")),
+    )
+
+
+def create_canvas_tools_from_env(
+    cache: HttpCache | None = None,
+    rate_limiter: CanvasRateLimiter | None = None,
+) -> CanvasTools | BlockingCanvasTools:
+    token = os.getenv("CANVAS_TOKEN", "")
+    base_url = os.getenv("CANVAS_BASE_URL", "https://q.utoronto.ca")
+    page_concurrency = int(os.getenv("CANVAS_PAGE_CONCURRENCY", "1"))
+    max_file_bytes = int(
+        os.getenv("CANVAS_MAX_FILE_BYTES", str(DEFAULT_MAX_FILE_BYTES))
+    )
+    extract_char_budget = int(
+        os.getenv("CANVAS_EXTRACT_CHAR_BUDGET", str(DEFAULT_CHAR_BUDGET))
+    )
+    if page_concurrency > 1:
+        return BlockingCanvasTools(
+            AsyncCanvasTools(
+                token=token,
+                base_url=base_url,
+                max_concurrency=page_concurrency,
+                cache=cache,
+                max_file_bytes=max_file_bytes,
+                extract_char_budget=extract_char_budget,
+                rate_limiter=rate_limiter,
+            )
+        )
+    return CanvasTools(
+        token=token,
+        base_url=base_url,
+        cache=cache,
+        max_file_bytes=max_file_bytes,
+        extract_char_budget=extract_char_budget,
+        rate_limiter=rate_limiter,
+    )
 
 
 def build_study_guide_tools(
-    canvas_tools: CanvasTools, storage: Any
+    canvas_tools: CanvasTools | BlockingCanvasTools | CourseSnapshot,
+    storage: Any,
+    html_to_markdown: bool = True,
 ) -> dict[str, Callable[..., Any]]:
     def write_study_guide(
         course_id: str, content: str, slug: str = "", meta: dict | None = None
     ) -> dict[str, Any]:
-        path = storage.write_study_guide(
+        written = storage.write_study_guide(
             course_id=str(course_id),
             slug=str(slug),
             content=str(content),
             meta=dict(meta or {}),
         )
-        return {"path": path}
+        return {"path": written.path, "status": written.status}
+
+    def get_course_bundle(
+        course_id: str, page_char_budget: int = DEFAULT_PAGE_CHAR_BUDGET
+    ) -> dict[str, Any]:
+        return build_course_bundle(
+            canvas_tools,
+            course_id=str(course_id),
+            page_char_budget=int(page_char_budget),
+            normalize=normalize_html_fields if html_to_markdown else None,
+        )
+
+    def normalized(tool: Callable[..., Any]) -> Callable[..., Any]:
+        if not html_to_markdown:
+            return tool
+        return lambda *args, **kwargs: normalize_html_fields(tool(*args, **kwargs))
 
     return {
         "list_my_courses": lambda: canvas_tools.list_my_courses(),
+        "get_course_bundle": get_course_bundle,
         "list_modules": lambda course_id: canvas_tools.list_modules(course_id=str(course_id)),
         "get_module_items": lambda course_id, module_id: canvas_tools.get_module_items(
             course_id=str(course_id), module_id=str(module_id)
         ),
-        "get_page_content": lambda course_id, page_url: canvas_tools.get_page_content(
-            course_id=str(course_id), page_url=str(page_url)
+        "list_pages": lambda course_id: canvas_tools.list_pages(course_id=str(course_id)),
+        "get_page_content": normalized(
+            lambda course_id, page_url: canvas_tools.get_page_content(
+                course_id=str(course_id), page_url=str(page_url)
+            )
         ),
         "get_file_content": lambda file_id: canvas_tools.get_file_content(file_id=str(file_id)),
-        "list_announcements": lambda context_codes: canvas_tools.list_announcements(
-            context_codes=list(context_codes)
+        "list_announcements": normalized(
+            lambda context_codes: canvas_tools.list_announcements(
+                context_codes=list(context_codes)
+            )
+        ),
+        "list_assignments": normalized(
+            lambda course_id: canvas_tools.list_assignments(course_id=str(course_id))
         ),
-        "list_assignments": lambda course_id: canvas_tools.list_assignments(course_id=str(course_id)),
         "write_study_guide": write_study_guide,
     }
 
@@ -53,14 +210,66 @@ def create_orchestrator(provider: str) -> AgentOrchestrator:
         raise RuntimeError("Missing AZURE_OPENAI_MODEL")
     storage_provider = os.getenv("STORAGE_PROVIDER", "azure")
 
-    client = create_azure_openai_client_from_env()
-    canvas_tools = CanvasTools(
-        token=os.getenv("CANVAS_TOKEN", ""),
-        base_url=os.getenv("CANVAS_BASE_URL", "https://q.utoronto.ca"),
+    raw_client = create_azure_openai_client_from_env()
+    client = create_resilient_client_from_env(raw_client)
+    storage = storage_providers.create_storage(storage_provider)
+    canvas_tools = create_canvas_tools_from_env(
+        cache=create_http_cache_from_env(storage),
+        rate_limiter=create_rate_limiter_from_env(),
+    )
+    metrics_providers = {
+        "canvas_http_cache": canvas_tools.cache_metrics,
+        "canvas_rate_limit": canvas_tools.rate_limit_metrics,
+    }
+    metrics_providers["model_calls"] = client.metrics
+    close_callbacks = [canvas_tools.close]
+    if hasattr(storage, "upload_metrics"):
+        metrics_providers["storage_uploads"] = storage.upload_metrics
+    if hasattr(storage, "close"):
+        close_callbacks.append(storage.close)
+    result_projector = create_result_projector_from_env()
+    if result_projector is not None:
+        metrics_providers["tool_projection"] = result_projector.metrics
+    completion_cache = create_completion_cache_from_env(client, storage)
+    if completion_cache is not None:
+        client = completion_cache
+        metrics_providers["completion_cache"] = completion_cache.metrics
+    snapshot = None
+    if os.getenv("CANVAS_PREFETCH", "on").strip().lower() not in {"off", "none", "0"}:
+        snapshot = CourseSnapshot(
+            canvas_tools,
+            directory=os.getenv("CANVAS_SNAPSHOT_DIR") or None,
+            max_workers=int(os.getenv("CANVAS_PREFETCH_WORKERS", "8")),
+        )
+        metrics_providers["canvas_snapshot"] = snapshot.metrics
+    tools = build_study_guide_tools(
+        canvas_tools=snapshot or canvas_tools,
+        storage=storage,
+        html_to_markdown=os.getenv("CANVAS_HTML_TO_MARKDOWN", "on").strip().lower()
+        not in {"off", "none", "0"},
+    )
+    return AzureOpenAIOrchestrator(
+        openai_client=client,
+        model=model,
+        tools=tools,
+        metrics_providers=metrics_providers,
+        close_callbacks=close_callbacks,
+        prefetcher=snapshot,
+        max_tool_workers=int(os.getenv("TOOL_CALL_WORKERS", "4")),
+        tool_timeout_seconds=float(os.getenv("TOOL_CALL_TIMEOUT_SECONDS", "120")),
+        orchestration_mode=os.getenv("ORCHESTRATION_MODE", "single").strip().lower(),
+        max_course_workers=int(os.getenv("COURSE_WORKERS", "3")),
+        context_budget_tokens=int(os.getenv("CONTEXT_BUDGET_TOKENS", "100000")) or None,
+        stream=os.getenv("STREAM_COMPLETIONS", "off").strip().lower() in {"on", "1", "true"},
+        summary_cache=StorageCacheBackend(storage, prefix="summary-cache"),
+        max_summary_workers=int(os.getenv("SUMMARY_WORKERS", "4")),
+        pricing=create_pricing_from_env(),
+        batch_backend=OpenAIBatchBackend(
+            raw_client, endpoint=os.getenv("BATCH_ENDPOINT", "/chat/completions")
+        ),
+        batch_store=StorageCacheBackend(storage, prefix="batch"),
+        result_projector=result_projector,
     )
-    storage = create_storage(storage_provider)
-    tools = build_study_guide_tools(canvas_tools=canvas_tools, storage=storage)
-    return AzureOpenAIOrchestrator(openai_client=client, model=model, tools=tools)
 
 
 __all__ = [
@@ -68,5 +277,12 @@ __all__ = [
     "AzureOpenAIOrchestrator",
     "create_azure_openai_client_from_env",
     "build_study_guide_tools",
+    "create_canvas_tools_from_env",
+    "create_completion_cache_from_env",
+    "create_http_cache_from_env",
+    "create_pricing_from_env",
+    "create_resilient_client_from_env",
+    "create_result_projector_from_env",
+    "create_rate_limiter_from_env",
     "create_orchestrator",
 ]
@@ -1,9 +1,51 @@
 import json
+import time
 from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
 from typing import Any
 
 from study_guide_agent.models import CourseResult, RunOutcome, StudyGuideConfig
+from study_guide_agent.orchestrators.batch import (
+    BATCH_ENDPOINT,
+    TERMINAL_FAILURE_STATUSES,
+    BatchBackend,
+    BatchState,
+    batch_request,
+    course_prompt,
+    parse_batch_output,
+)
+from study_guide_agent.orchestrators.context_budget import ContextBudget, estimate_tokens
+from study_guide_agent.orchestrators.map_reduce import MapReducePipeline, course_sources
+from study_guide_agent.orchestrators.protocol import CoursePrefetcher
+from study_guide_agent.orchestrators.streaming import (
+    StepTiming,
+    StreamAssembler,
+    summarize_timings,
+)
+from study_guide_agent.orchestrators.tool_memo import ToolCallMemo, back_reference
+from study_guide_agent.orchestrators.usage import ModelPricing, UsageLedger
+from study_guide_agent.tools.course_snapshot import matches_course_filter
+from study_guide_agent.tools.http_cache import CacheBackend
 from study_guide_agent.tools.openai_schemas import get_openai_tool_definitions
+from study_guide_agent.tools.projection import ToolResultProjector
+
+ORCHESTRATION_MODES = ("single", "per_course", "map_reduce", "batch")
+
+
+@dataclass
+class ConversationResult:
+    guide_paths: dict[str, str] = field(default_factory=dict)
+    guide_statuses: dict[str, str] = field(default_factory=dict)
+    write_errors: dict[str, str] = field(default_factory=dict)
+    final_text: str = ""
+    steps: int = 0
+    tool_errors: int = 0
+    memo_metrics: dict[str, int] = field(default_factory=dict)
+    prompt_tokens: list[int] = field(default_factory=list)
+    evictions: int = 0
+    step_timings: list[StepTiming] = field(default_factory=list)
 
 
 class AzureOpenAIOrchestrator:
@@ -15,85 +57,649 @@ class AzureOpenAIOrchestrator:
         model: str,
         tools: dict[str, Callable[..., Any]],
         max_steps: int = 10,
+        metrics_providers: dict[str, Callable[[], dict[str, Any]]] | None = None,
+        close_callbacks: list[Callable[[], None]] | None = None,
+        prefetcher: CoursePrefetcher | None = None,
+        max_tool_workers: int = 4,
+        tool_timeout_seconds: float | None = 120.0,
+        orchestration_mode: str = "single",
+        max_course_workers: int = 3,
+        context_budget_tokens: int | None = None,
+        stream: bool = False,
+        summary_cache: CacheBackend | None = None,
+        max_summary_workers: int = 4,
+        pricing: ModelPricing | None = None,
+        batch_backend: BatchBackend | None = None,
+        batch_store: CacheBackend | None = None,
+        result_projector: ToolResultProjector | None = None,
     ) -> None:
+        if orchestration_mode not in ORCHESTRATION_MODES:
+            raise ValueError(f"Unknown orchestration mode: {orchestration_mode}")
+        if orchestration_mode == "batch" and (batch_backend is None or batch_store is None):
+            raise ValueError("Batch mode requires a batch backend and a batch store")
         self.openai_client = openai_client
         self.model = model
         self.tools = tools
         self.max_steps = max_steps
+        self.metrics_providers = dict(metrics_providers or {})
+        self.close_callbacks = list(close_callbacks or [])
+        self.prefetcher = prefetcher
+        self.max_tool_workers = max_tool_workers
+        self.tool_timeout_seconds = tool_timeout_seconds
+        self.orchestration_mode = orchestration_mode
+        self.max_course_workers = max_course_workers
+        self.context_budget_tokens = context_budget_tokens
+        self.stream = stream
+        self.summary_cache = summary_cache
+        self.max_summary_workers = max_summary_workers
+        self.pricing = pricing
+        self.batch_backend = batch_backend
+        self.batch_store = batch_store
+        self.result_projector = result_projector
         self.tool_definitions = get_openai_tool_definitions()
 
+    def close(self) -> None:
+        for callback in self.close_callbacks:
+            callback()
+
     def invoke(self, task_prompt: str, config: StudyGuideConfig) -> RunOutcome:
-        messages: list[dict[str, Any]] = [{"role": "user", "content": task_prompt}]
-        guide_paths: dict[str, str] = {}
-        final_text = ""
-        steps = 0
+        if self.orchestration_mode == "per_course":
+            return self._invoke_per_course(task_prompt, config)
+        if self.orchestration_mode == "map_reduce":
+            return self._invoke_map_reduce(task_prompt, config)
+        if self.orchestration_mode == "batch":
+            return self._invoke_batch(task_prompt, config)
 
-        for steps in range(1, self.max_steps + 1):
-            response = self.openai_client.chat.completions.create(
-                model=self.model, messages=messages, tools=self.tool_definitions
+        usage = UsageLedger(self.pricing)
+        conversation = self._run_conversation(task_prompt, usage)
+        course_results = [
+            CourseResult(
+                course_id=cid,
+                status=conversation.guide_statuses.get(cid, "updated"),
+                guide_path=path or None,
             )
-            message = response.choices[0].message
-            tool_calls = getattr(message, "tool_calls", None)
-
-            if not tool_calls:
-                final_text = getattr(message, "content", "") or ""
-                break
-
-            assistant_tool_calls: list[dict[str, Any]] = []
-            for call in tool_calls:
-                assistant_tool_calls.append(
-                    {
-                        "id": call.id,
-                        "type": "function",
-                        "function": {
-                            "name": call.function.name,
-                            "arguments": call.function.arguments,
-                        },
-                    }
+            for cid, path in sorted(conversation.guide_paths.items())
+        ]
+        course_results.extend(
+            CourseResult(course_id=cid, status="failed", error=error)
+            for cid, error in sorted(conversation.write_errors.items())
+        )
+        metrics: dict[str, Any] = {
+            "provider": config.agent_provider,
+            "model": self.model,
+            "steps": conversation.steps,
+            "output_text_length": len(conversation.final_text),
+            "tool_memo": conversation.memo_metrics,
+            "tool_errors": conversation.tool_errors,
+            "prompt_tokens_per_step": conversation.prompt_tokens,
+            "context_evictions": conversation.evictions,
+            "step_timings": [timing.to_dict() for timing in conversation.step_timings],
+            "model_latency": summarize_timings(conversation.step_timings),
+            "usage": usage.metrics(),
+        }
+        return RunOutcome(
+            success=not conversation.write_errors,
+            course_results=course_results,
+            metrics=self._with_providers(metrics),
+        )
+
+    def _invoke_per_course(self, task_prompt: str, config: StudyGuideConfig) -> RunOutcome:
+        """List courses once, then run one isolated conversation per course in parallel."""
+        courses = self._selected_courses(config)
+        usage = UsageLedger(self.pricing)
+
+        def run_course(
+            course: dict[str, Any],
+        ) -> tuple[ConversationResult | None, str | None, float]:
+            started = time.perf_counter()
+            try:
+                conversation = self._run_conversation(
+                    self._course_prompt(task_prompt, course), usage, str(course.get("id"))
+                )
+            except Exception as exc:
+                return None, f"{type(exc).__name__}: {exc}", time.perf_counter() - started
+            return conversation, None, time.perf_counter() - started
+
+        with ThreadPoolExecutor(
+            max_workers=max(self.max_course_workers, 1), thread_name_prefix="course"
+        ) as executor:
+            outcomes = list(executor.map(run_course, courses))
+
+        # A conversation may also write guides for other courses; those only count
+        # for courses whose own conversation did not report a result.
+        own_results: dict[str, CourseResult] = {}
+        other_results: dict[str, CourseResult] = {}
+        course_metrics: dict[str, dict[str, Any]] = {}
+        memo_totals = {"hits": 0, "misses": 0, "entries": 0}
+        total_steps = 0
+        tool_errors = 0
+        step_timings: list[StepTiming] = []
+        for course, (conversation, error, seconds) in zip(courses, outcomes):
+            course_id = str(course.get("id"))
+            course_metrics[course_id] = {"seconds": round(seconds, 3)}
+            if conversation is None:
+                own_results[course_id] = CourseResult(
+                    course_id=course_id, status="failed", error=error
+                )
+                continue
+            course_metrics[course_id]["steps"] = conversation.steps
+            course_metrics[course_id]["prompt_tokens_per_step"] = conversation.prompt_tokens
+            course_metrics[course_id]["context_evictions"] = conversation.evictions
+            course_metrics[course_id]["model_latency"] = summarize_timings(
+                conversation.step_timings
+            )
+            step_timings.extend(conversation.step_timings)
+            total_steps += conversation.steps
+            tool_errors += conversation.tool_errors
+            for key in memo_totals:
+                memo_totals[key] += conversation.memo_metrics.get(key, 0)
+            path = conversation.guide_paths.get(course_id)
+            if course_id in conversation.write_errors:
+                own_results[course_id] = CourseResult(
+                    course_id=course_id,
+                    status="failed",
+                    error=conversation.write_errors[course_id],
                 )
-            messages.append({"role": "assistant", "tool_calls": assistant_tool_calls})
-
-            for call in tool_calls:
-                tool_name = call.function.name
-                args_text = call.function.arguments or "{}"
-                args = json.loads(args_text)
-                tool = self.tools.get(tool_name)
-                if tool is None:
-                    raise KeyError(f"Unknown tool: {tool_name}")
-                result = tool(**args)
-
-                if tool_name == "write_study_guide":
-                    course_id = str(args.get("course_id", ""))
-                    if course_id:
-                        if isinstance(result, dict):
-                            guide_paths[course_id] = str(result.get("path", ""))
-                        else:
-                            guide_paths[course_id] = str(result)
-
-                serialized_result = (
-                    json.dumps(result) if not isinstance(result, str) else result
+            elif path is None:
+                own_results[course_id] = CourseResult(course_id=course_id, status="no_guide")
+            else:
+                own_results[course_id] = CourseResult(
+                    course_id=course_id,
+                    status=conversation.guide_statuses.get(course_id, "updated"),
+                    guide_path=path or None,
                 )
-                messages.append(
-                    {
-                        "role": "tool",
-                        "tool_call_id": call.id,
-                        "content": serialized_result,
+            for other_id, other_error in sorted(conversation.write_errors.items()):
+                if other_id != course_id:
+                    other_results.setdefault(
+                        other_id,
+                        CourseResult(course_id=other_id, status="failed", error=other_error),
+                    )
+            for other_id, other_path in sorted(conversation.guide_paths.items()):
+                if other_id != course_id:
+                    other_results.setdefault(
+                        other_id,
+                        CourseResult(
+                            course_id=other_id,
+                            status=conversation.guide_statuses.get(other_id, "updated"),
+                            guide_path=other_path or None,
+                        ),
+                    )
+        course_results = list(own_results.values()) + [
+            result for other_id, result in other_results.items() if other_id not in own_results
+        ]
+
+
+        metrics: dict[str, Any] = {
+            "provider": config.agent_provider,
+            "model": self.model,
+            "orchestration_mode": "per_course",
+            "steps": total_steps,
+            "tool_memo": memo_totals,
+            "tool_errors": tool_errors,
+            "courses": course_metrics,
+            "model_latency": summarize_timings(step_timings),
+            "usage": usage.metrics(),
+        }
+        return RunOutcome(
+            success=not any(result.error for result in course_results),
+            course_results=course_results,
+            metrics=self._with_providers(metrics),
+        )
+
+    def _invoke_map_reduce(self, task_prompt: str, config: StudyGuideConfig) -> RunOutcome:
+        """Summarize each course's modules and pages in parallel, then reduce to a guide."""
+        courses = self._selected_courses(config)
+        usage = UsageLedger(self.pricing)
+        pipeline = MapReducePipeline(
+            openai_client=self.openai_client,
+            model=self.model,
+            tools=self.tools,
+            summary_cache=self.summary_cache,
+            max_workers=self.max_summary_workers,
+            usage=usage,
+        )
+
+        def run_course(course: dict[str, Any]) -> tuple[Any, str | None, float]:
+            started = time.perf_counter()
+            try:
+                written = pipeline.run_course(task_prompt, course)
+            except Exception as exc:
+                return None, f"{type(exc).__name__}: {exc}", time.perf_counter() - started
+            return written, None, time.perf_counter() - started
+
+        with ThreadPoolExecutor(
+            max_workers=max(self.max_course_workers, 1), thread_name_prefix="course"
+        ) as executor:
+            outcomes = list(executor.map(run_course, courses))
+
+        course_results: list[CourseResult] = []
+        course_metrics: dict[str, dict[str, Any]] = {}
+        for course, (written, error, seconds) in zip(courses, outcomes):
+            course_id = str(course.get("id"))
+            course_metrics[course_id] = {"seconds": round(seconds, 3)}
+            if error is not None:
+                course_results.append(
+                    CourseResult(course_id=course_id, status="failed", error=error)
+                )
+                continue
+            guide_paths: dict[str, str] = {}
+            guide_statuses: dict[str, str] = {}
+            self._record_guide_path(
+                guide_paths, {"course_id": course_id}, written, guide_statuses
+            )
+            course_results.append(
+                CourseResult(
+                    course_id=course_id,
+                    status=guide_statuses.get(course_id, "updated"),
+                    guide_path=guide_paths.get(course_id) or None,
+                )
+            )
+
+        metrics: dict[str, Any] = {
+            "provider": config.agent_provider,
+            "model": self.model,
+            "orchestration_mode": "map_reduce",
+            "courses": course_metrics,
+            "summaries": pipeline.metrics(),
+            "usage": usage.metrics(),
+        }
+        return RunOutcome(
+            success=not any(result.error for result in course_results),
+            course_results=course_results,
+            metrics=self._with_providers(metrics),
+        )
+
+    @property
+    def defers_results(self) -> bool:
+        """Batch mode reports guides a later run collects, so it must run even with no changes."""
+        return self.orchestration_mode == "batch"
+
+    def _invoke_batch(self, task_prompt: str, config: StudyGuideConfig) -> RunOutcome:
+        """
+        Collect the pending batch if it has finished, then submit one request per
+        selected course. While a batch is still running nothing new is submitted, and
+        courses collected in this run are not submitted again. With
+        `config.course_fingerprints` only those courses are submitted, and each
+        fingerprint is kept with the pending batch so the collected guide is
+        fingerprinted with the data it was generated from.
+        """
+        assert self.batch_backend is not None and self.batch_store is not None
+        state = BatchState(self.batch_store)
+        usage = UsageLedger(self.pricing)
+        course_results: list[CourseResult] = []
+        batch_metrics: dict[str, Any] = {}
+
+        pending = state.load()
+        if pending is not None:
+            status = self.batch_backend.status(pending["batch_id"])
+            batch_metrics.update(collected_batch_id=pending["batch_id"], collected_status=status)
+            if status == "completed":
+                course_results.extend(self._collect_batch(pending, usage))
+                state.clear()
+            elif status in TERMINAL_FAILURE_STATUSES:
+                course_results.extend(
+                    CourseResult(course_id=cid, status="failed", error=f"Batch {status}")
+                    for cid in pending["courses"]
+                )
+                state.clear()
+            else:
+                course_results.extend(
+                    CourseResult(course_id=cid, status="pending") for cid in pending["courses"]
+                )
+                return self._batch_outcome(config, course_results, batch_metrics, usage)
+
+        collected = {result.course_id for result in course_results}
+        fingerprints = config.course_fingerprints
+        endpoint = getattr(self.batch_backend, "endpoint", BATCH_ENDPOINT)
+        requests: list[dict[str, Any]] = []
+        submitted: list[dict[str, Any]] = []
+        for course in self._selected_courses(config):
+            course_id = str(course.get("id"))
+            if course_id in collected or (
+                fingerprints is not None and course_id not in fingerprints
+            ):
+                continue
+            try:
+                sources = course_sources(self.tools, course_id)
+            except Exception as exc:
+                course_results.append(
+                    CourseResult(
+                        course_id=course_id, status="failed", error=f"{type(exc).__name__}: {exc}"
+                    )
+                )
+                continue
+            requests.append(
+                batch_request(
+                    f"course-{course_id}",
+                    self.model,
+                    course_prompt(task_prompt, course, sources),
+                    endpoint=endpoint,
+                )
+            )
+            submitted.append(course)
+        if submitted:
+            batch_id = self.batch_backend.submit(
+                "\n".join(json.dumps(request) for request in requests).encode("utf-8")
+            )
+            state.save(
+                batch_id,
+                {
+                    str(course.get("id")): {
+                        **{key: course.get(key) for key in ("name", "course_code")},
+                        "fingerprint": (fingerprints or {}).get(str(course.get("id"))),
                     }
+                    for course in submitted
+                },
+            )
+            batch_metrics.update(submitted_batch_id=batch_id, submitted_requests=len(requests))
+            course_results.extend(
+                CourseResult(course_id=str(course.get("id")), status="submitted")
+                for course in submitted
+            )
+        return self._batch_outcome(config, course_results, batch_metrics, usage)
+
+    def _collect_batch(self, pending: dict[str, Any], usage: UsageLedger) -> list[CourseResult]:
+        assert self.batch_backend is not None
+        outputs = parse_batch_output(self.batch_backend.results(pending["batch_id"]))
+        results: list[CourseResult] = []
+        for course_id, course in pending["courses"].items():
+            output = outputs.get(f"course-{course_id}") or {
+                "content": None,
+                "error": "Missing from batch output",
+            }
+            if output["error"] is not None:
+                results.append(
+                    CourseResult(course_id=course_id, status="failed", error=output["error"])
                 )
-        else:
-            raise RuntimeError("Max orchestration steps exceeded")
+                continue
+            usage.record_completion(output.get("usage"), 0.0, course_id)
+            try:
+                written = self.tools["write_study_guide"](
+                    course_id=course_id,
+                    content=output["content"],
+                    slug=str(course.get("course_code") or ""),
+                    meta={
+                        "course_id": course_id,
+                        "name": course.get("name"),
+                        "generated_by": "batch",
+                        "batch_id": pending["batch_id"],
+                    },
+                )
+            except Exception as exc:
+                results.append(
+                    CourseResult(
+                        course_id=course_id, status="failed", error=f"{type(exc).__name__}: {exc}"
+                    )
+                )
+                continue
+            guide_paths: dict[str, str] = {}
+            guide_statuses: dict[str, str] = {}
+            self._record_guide_path(
+                guide_paths, {"course_id": course_id}, written, guide_statuses
+            )
+            results.append(
+                CourseResult(
+                    course_id=course_id,
+                    status=guide_statuses.get(course_id, "updated"),
+                    guide_path=guide_paths.get(course_id) or None,
+                    fingerprint=course.get("fingerprint"),
+                )
+            )
+        return results
 
-        course_results = [
-            CourseResult(course_id=cid, status="updated", guide_path=path or None)
-            for cid, path in sorted(guide_paths.items())
-        ]
+    def _batch_outcome(
+        self,
+        config: StudyGuideConfig,
+        course_results: list[CourseResult],
+        batch_metrics: dict[str, Any],
+        usage: UsageLedger,
+    ) -> RunOutcome:
+        metrics: dict[str, Any] = {
+            "provider": config.agent_provider,
+            "model": self.model,
+            "orchestration_mode": "batch",
+            "batch": batch_metrics,
+            "usage": usage.metrics(),
+        }
         return RunOutcome(
-            success=True,
+            success=not any(result.error for result in course_results),
             course_results=course_results,
-            metrics={
-                "provider": config.agent_provider,
-                "model": self.model,
-                "steps": steps,
-                "output_text_length": len(final_text),
-            },
+            metrics=self._with_providers(metrics),
+        )
+
+    def _selected_courses(self, config: StudyGuideConfig) -> list[dict[str, Any]]:
+        return [
+            course
+            for course in self.tools["list_my_courses"]()
+            if matches_course_filter(course, config.course_filter)
+        ]
+
+    @staticmethod
+    def _course_prompt(task_prompt: str, course: dict[str, Any]) -> str:
+        course_ref = {
+            key: course[key] for key in ("id", "name", "course_code") if key in course
+        }
+        return (
+            f"{task_prompt}\n\nWork only on this course and write its study guide with "
+            f"write_study_guide using course_id {course.get('id')}:\n{json.dumps(course_ref)}"
+        )
+
+    def _with_providers(self, metrics: dict[str, Any]) -> dict[str, Any]:
+        for name, provider in self.metrics_providers.items():
+            metrics[name] = provider()
+        return metrics
+
+    def _run_conversation(
+        self, task_prompt: str, usage: UsageLedger, course_id: str | None = None
+    ) -> ConversationResult:
+        messages: list[dict[str, Any]] = [{"role": "user", "content": task_prompt}]
+        result = ConversationResult()
+        memo = ToolCallMemo()
+        budget = ContextBudget(max_tokens=self.context_budget_tokens)
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_tool_workers, thread_name_prefix="tool-call"
+        )
+
+        try:
+            for steps in range(1, self.max_steps + 1):
+                result.steps = steps
+                for evicted_call_id in budget.compact(messages):
+                    memo.forget(evicted_call_id)
+                result.prompt_tokens.append(budget.measure(messages))
+                dispatched: list[tuple[Any, Future, float]] = []
+                if self.stream:
+                    assembler = StreamAssembler()
+                    chunks = self.openai_client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        tools=self.tool_definitions,
+                        stream=True,
+                        stream_options={"include_usage": True},
+                    )
+                    for call in assembler.tool_calls(chunks):
+                        dispatched.append(
+                            (
+                                call,
+                                executor.submit(self._execute_tool_call, memo, call),
+                                time.monotonic(),
+                            )
+                        )
+                    tool_calls = assembler.assembled_tool_calls
+                    content = assembler.content
+                    result.step_timings.append(assembler.timing)
+                    usage.record_completion(
+                        assembler.usage, assembler.timing.generation_seconds, course_id
+                    )
+                else:
+                    step_started = time.perf_counter()
+                    response = self.openai_client.chat.completions.create(
+                        model=self.model, messages=messages, tools=self.tool_definitions
+                    )
+                    message = response.choices[0].message
+                    tool_calls = getattr(message, "tool_calls", None) or []
+                    content = getattr(message, "content", "") or ""
+                    elapsed = time.perf_counter() - step_started
+                    result.step_timings.append(
+                        self._response_timing(response, message, elapsed)
+                    )
+                    usage.record_completion(getattr(response, "usage", None), elapsed, course_id)
+
+                if not tool_calls:
+                    result.final_text = content
+                    break
+
+                assistant_tool_calls: list[dict[str, Any]] = []
+                for call in tool_calls:
+                    assistant_tool_calls.append(
+                        {
+                            "id": call.id,
+                            "type": "function",
+                            "function": {
+                                "name": call.function.name,
+                                "arguments": call.function.arguments,
+                            },
+                        }
+                    )
+                messages.append({"role": "assistant", "tool_calls": assistant_tool_calls})
+
+                if not dispatched:
+                    dispatched_at = time.monotonic()
+                    dispatched = [
+                        (call, executor.submit(self._execute_tool_call, memo, call), dispatched_at)
+                        for call in tool_calls
+                    ]
+                for position, (call, future, dispatched_at) in enumerate(dispatched):
+                    is_write = call.function.name == "write_study_guide"
+                    try:
+                        args, tool_result, earlier_call_id, seconds = future.result(
+                            timeout=None if is_write else self._tool_wait(dispatched_at, position)
+                        )
+                    except FutureTimeoutError:
+                        future.cancel()
+                        result.tool_errors += 1
+                        serialized_result = json.dumps(
+                            {
+                                "error": "Tool call timed out after "
+                                f"{self.tool_timeout_seconds}s"
+                            }
+                        )
+                        usage.record_tool(
+                            call.function.name, time.monotonic() - dispatched_at, error=True
+                        )
+                    except Exception as exc:
+                        result.tool_errors += 1
+                        if is_write:
+                            self._record_write_error(result.write_errors, call, exc)
+                        serialized_result = json.dumps(
+                            {"error": f"{type(exc).__name__}: {exc}"}
+                        )
+                        usage.record_tool(
+                            call.function.name, time.monotonic() - dispatched_at, error=True
+                        )
+                    else:
+                        if is_write:
+                            self._record_guide_path(
+                                result.guide_paths, args, tool_result, result.guide_statuses
+                            )
+                            result.write_errors.pop(str(args.get("course_id", "")), None)
+                        serialized_result = self._serialize_result(
+                            call.function.name, tool_result, earlier_call_id
+                        )
+                        usage.record_tool(
+                            call.function.name,
+                            seconds,
+                            len(serialized_result.encode("utf-8")),
+                        )
+                    messages.append(
+                        {
+                            "role": "tool",
+                            "tool_call_id": call.id,
+                            "content": serialized_result,
+                        }
+                    )
+            else:
+                raise RuntimeError("Max orchestration steps exceeded")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        result.memo_metrics = memo.metrics()
+        result.evictions = budget.evictions
+        return result
+
+    def _execute_tool_call(
+        self, memo: ToolCallMemo, call: Any
+    ) -> tuple[dict[str, Any], Any, str | None, float]:
+        started = time.perf_counter()
+        tool_name = call.function.name
+        args = json.loads(call.function.arguments or "{}")
+        tool = self.tools.get(tool_name)
+        if tool is None:
+            raise KeyError(f"Unknown tool: {tool_name}")
+        result, earlier_call_id = memo.call(tool_name, args, call.id, tool)
+        return args, result, earlier_call_id, time.perf_counter() - started
+
+    @staticmethod
+    def _response_timing(response: Any, message: Any, elapsed: float) -> StepTiming:
+        """Non-streamed steps have no first-token time; tokens come from usage when present."""
+        usage = getattr(response, "usage", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if not isinstance(completion_tokens, int):
+            generated = str(getattr(message, "content", "") or "") + "".join(
+                call.function.name + (call.function.arguments or "")
+                for call in getattr(message, "tool_calls", None) or []
+            )
+            completion_tokens = estimate_tokens(generated)
+        return StepTiming(
+            generation_seconds=elapsed,
+            completion_tokens=completion_tokens,
+            tokens_per_second=completion_tokens / elapsed if elapsed > 0 else None,
         )
+
+    def _tool_wait(self, dispatched_at: float, position: int) -> float | None:
+        """Each call gets the full timeout once a pool worker is free to run it."""
+        if self.tool_timeout_seconds is None:
+            return None
+        rounds = position // self.max_tool_workers + 1
+        deadline = dispatched_at + self.tool_timeout_seconds * rounds
+        return max(deadline - time.monotonic(), 0.0)
+
+    @staticmethod
+    def _record_guide_path(
+        guide_paths: dict[str, str],
+        args: dict[str, Any],
+        result: Any,
+        guide_statuses: dict[str, str] | None = None,
+    ) -> None:
+        """
+        Remember where a course's guide was written. A write the storage skipped as
+        byte-identical reports `unchanged`, unless an earlier write in the same run
+        already updated the guide.
+        """
+        course_id = str(args.get("course_id", ""))
+        if course_id:
+            if isinstance(result, dict):
+                guide_paths[course_id] = str(result.get("path", ""))
+            else:
+                guide_paths[course_id] = str(result)
+            if guide_statuses is not None and guide_statuses.get(course_id) != "updated":
+                unchanged = isinstance(result, dict) and result.get("status") == "unchanged"
+                guide_statuses[course_id] = "unchanged" if unchanged else "updated"
+
+    @staticmethod
+    def _record_write_error(write_errors: dict[str, str], call: Any, exc: Exception) -> None:
+        """A failed write fails its course unless a later retry in the same run succeeds."""
+        try:
+            course_id = str(json.loads(call.function.arguments or "{}").get("course_id", ""))
+        except (ValueError, AttributeError):
+            course_id = ""
+        if course_id:
+            write_errors[course_id] = f"{type(exc).__name__}: {exc}"
+
+    def _serialize_result(
+        self, tool_name: str, result: Any, earlier_call_id: str | None
+    ) -> str:
+        if earlier_call_id is not None:
+            return back_reference(earlier_call_id)
+        if self.result_projector is not None:
+            return self.result_projector.serialize(tool_name, result)
+        return json.dumps(result) if not isinstance(result, str) else result
@@ -0,0 +1,157 @@
+import json
+import time
+from collections.abc import Callable
+from typing import Any, Protocol
+
+from study_guide_agent.tools.http_cache import CacheBackend
+
+BATCH_STATE_NAME = "pending.json"
+BATCH_ENDPOINT = "/chat/completions"
+TERMINAL_FAILURE_STATUSES = frozenset({"failed", "expired", "cancelled"})
+
+
+class BatchBackend(Protocol):
+    """Submits a JSONL file of chat-completion requests and returns its output later."""
+
+    def submit(self, requests_jsonl: bytes) -> str:
+        ...
+
+    def status(self, batch_id: str) -> str:
+        ...
+
+    def results(self, batch_id: str) -> bytes:
+        ...
+
+
+class OpenAIBatchBackend:
+    """Batch API of an OpenAI-compatible client (Azure OpenAI global-batch deployments)."""
+
+    def __init__(self, client: Any, endpoint: str = BATCH_ENDPOINT) -> None:
+        self.client = client
+        self.endpoint = endpoint
+
+    def submit(self, requests_jsonl: bytes) -> str:
+        uploaded = self.client.files.create(
+            file=("study-guides.jsonl", requests_jsonl), purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id, endpoint=self.endpoint, completion_window="24h"
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> bytes:
+        batch = self.client.batches.retrieve(batch_id)
+        if not batch.output_file_id:
+            return b""
+        return self.client.files.content(batch.output_file_id).read()
+
+
+class LocalBatchServer:
+    """
+    In-process stand-in for the batch API. Each request body is answered by
+    `complete`; a batch reports `in_progress` for `polls_until_complete` status
+    checks before it completes.
+    """
+
+    def __init__(
+        self,
+        complete: Callable[[dict[str, Any]], dict[str, Any]],
+        polls_until_complete: int = 0,
+    ) -> None:
+        self.complete = complete
+        self.polls_until_complete = polls_until_complete
+        self.batches: dict[str, dict[str, Any]] = {}
+
+    def submit(self, requests_jsonl: bytes) -> str:
+        batch_id = f"batch_{len(self.batches) + 1}"
+        requests = [json.loads(line) for line in requests_jsonl.splitlines() if line.strip()]
+        self.batches[batch_id] = {"requests": requests, "polls": 0}
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        batch = self.batches[batch_id]
+        batch["polls"] += 1
+        return "completed" if batch["polls"] > self.polls_until_complete else "in_progress"
+
+    def results(self, batch_id: str) -> bytes:
+        lines = []
+        for request in self.batches[batch_id]["requests"]:
+            try:
+                response = {"status_code": 200, "body": self.complete(request["body"])}
+                error = None
+            except Exception as exc:
+                response = None
+                error = {"message": f"{type(exc).__name__}: {exc}"}
+            record = {"custom_id": request["custom_id"], "response": response, "error": error}
+            lines.append(json.dumps(record))
+        return "\n".join(lines).encode("utf-8")
+
+
+def batch_request(
+    custom_id: str, model: str, prompt: str, endpoint: str = BATCH_ENDPOINT
+) -> dict[str, Any]:
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": endpoint,
+        "body": {"model": model, "messages": [{"role": "user", "content": prompt}]},
+    }
+
+
+def parse_batch_output(output: bytes) -> dict[str, dict[str, Any]]:
+    """Map `custom_id` to its `content`, `error` and `usage` for a batch output file."""
+    parsed: dict[str, dict[str, Any]] = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        custom_id = str(record.get("custom_id"))
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            error = (record.get("error") or {}).get("message") or (
+                f"Batch request failed with status {response.get('status_code')}"
+            )
+            parsed[custom_id] = {"content": None, "error": error, "usage": None}
+            continue
+        body = response.get("body") or {}
+        choices = body.get("choices") or [{}]
+        parsed[custom_id] = {
+            "content": (choices[0].get("message") or {}).get("content") or "",
+            "error": None,
+            "usage": body.get("usage"),
+        }
+    return parsed
+
+
+def course_prompt(
+    task_prompt: str, course: dict[str, Any], sources: list[dict[str, str]]
+) -> str:
+    sections = "\n\n".join(source["text"] for source in sources)
+    return (
+        f"{task_prompt}\n\nWrite the complete study guide for course "
+        f"{course.get('name') or course.get('id')} following the template and guidelines "
+        "above, using the course content below. Respond with only the markdown of the "
+        f"guide.\n\n{sections}"
+    )
+
+
+class BatchState:
+    """Pending batch record kept in the storage backend between invocations."""
+
+    def __init__(self, store: CacheBackend) -> None:
+        self.store = store
+
+    def load(self) -> dict[str, Any] | None:
+        data = self.store.read(BATCH_STATE_NAME)
+        return json.loads(data) if data else None
+
+    def save(self, batch_id: str, courses: dict[str, dict[str, Any]]) -> dict[str, Any]:
+        record = {"batch_id": batch_id, "submitted_at": time.time(), "courses": courses}
+        self.store.write(BATCH_STATE_NAME, json.dumps(record).encode("utf-8"))
+        return record
+
+    def clear(self) -> None:
+        self.store.delete(BATCH_STATE_NAME)
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import threading
+from collections.abc import Iterable, Iterator
+from types import SimpleNamespace
+from typing import Any
+
+from study_guide_agent.tools.http_cache import CacheBackend
+
+COMPLETION_CACHE_MODES = ("record", "replay", "read_through")
+
+
+class CompletionCacheMiss(KeyError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def completion_key(model: str, messages: list[dict[str, Any]], tools: Any, stream: bool) -> str:
+    """Stable hash of everything that determines a completion; streamed and plain differ."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "tools": tools, "stream": stream},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def to_plain(value: Any) -> Any:
+    """Convert OpenAI response objects (pydantic or attribute bags) into JSON values."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if isinstance(value, dict):
+        return {str(k): to_plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(v) for v in value]
+    if hasattr(value, "__dict__"):
+        return {k: to_plain(v) for k, v in vars(value).items() if not k.startswith("_")}
+    return value
+
+
+def to_namespace(value: Any) -> Any:
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [to_namespace(v) for v in value]
+    return value
+
+
+class CompletionCache:
+    """
+    Wraps an OpenAI-compatible client so `chat.completions.create` is served from
+    recorded responses.
+
+    - `record` always calls the model and stores the response.
+    - `replay` only serves recorded responses and raises `CompletionCacheMiss` otherwise.
+    - `read_through` serves recorded responses and records misses.
+
+    Streamed responses are stored as their chunk list and replayed chunk by chunk.
+    """
+
+    def __init__(self, client: Any, backend: CacheBackend, mode: str = "read_through") -> None:
+        if mode not in COMPLETION_CACHE_MODES:
+            raise ValueError(f"Unknown completion cache mode: {mode}")
+        self.client = client
+        self.backend = backend
+        self.mode = mode
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    def create(self, **kwargs: Any) -> Any:
+        stream = bool(kwargs.get("stream"))
+        key = completion_key(
+            kwargs.get("model", ""), kwargs.get("messages", []), kwargs.get("tools"), stream
+        )
+        if self.mode != "record":
+            data = self.backend.read(f"{key}.json")
+            if data is not None:
+                self._count("hits")
+                recorded = json.loads(data)
+                if stream:
+                    return iter([to_namespace(chunk) for chunk in recorded["chunks"]])
+                return to_namespace(recorded["response"])
+            self._count("misses")
+            if self.mode == "replay":
+                raise CompletionCacheMiss(f"No recorded completion for request {key}")
+
+        response = self.client.chat.completions.create(**kwargs)
+        if stream:
+            return self._record_stream(key, response)
+        self._store(key, {"response": to_plain(response)})
+        return response
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "hits": self.hits,
+                "misses": self.misses,
+                "recorded": self.recorded,
+            }
+
+    def _record_stream(self, key: str, chunks: Iterable[Any]) -> Iterator[Any]:
+        recorded = []
+        for chunk in chunks:
+            recorded.append(to_plain(chunk))
+            yield chunk
+        self._store(key, {"chunks": recorded})
+
+    def _store(self, key: str, payload: dict[str, Any]) -> None:
+        self.backend.write(f"{key}.json", json.dumps(payload).encode("utf-8"))
+        self._count("recorded")
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
@@ -0,0 +1,132 @@
+import json
+from typing import Any
+
+from study_guide_agent.orchestrators.tool_memo import back_reference
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+PREVIEW_CHARS = 200
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class ContextBudget:
+    """
+    Tracks an estimated token count per orchestration message and, once the list
+    crosses `max_tokens`, replaces the oldest tool results with short stubs the
+    model can re-request. Results from the most recent `keep_recent` tool calls
+    are never evicted. A back-reference to an evicted result (see
+    `back_reference`) gets that result inlined, so it never points at a stub.
+    With `max_tokens=None` it only measures. One instance tracks one conversation.
+    """
+
+    def __init__(self, max_tokens: int | None = None, keep_recent: int = 4) -> None:
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self._estimates: dict[int, tuple[dict[str, Any], int]] = {}
+        self._evicted_ids: set[str] = set()
+        self.evictions = 0
+
+    def message_tokens(self, message: dict[str, Any]) -> int:
+        cached = self._estimates.get(id(message))
+        if cached is not None and cached[0] is message:
+            return cached[1]
+        text = str(message.get("content") or "")
+        for call in message.get("tool_calls") or []:
+            function = call.get("function", {})
+            text += str(function.get("name", "")) + str(function.get("arguments", ""))
+        tokens = estimate_tokens(text) + MESSAGE_OVERHEAD_TOKENS
+        self._estimates[id(message)] = (message, tokens)
+        return tokens
+
+    def measure(self, messages: list[dict[str, Any]]) -> int:
+        return sum(self.message_tokens(message) for message in messages)
+
+    def compact(self, messages: list[dict[str, Any]]) -> list[str]:
+        """Evict old tool results in place until under budget; returns evicted call ids."""
+        if self.max_tokens is None:
+            return []
+        total = self.measure(messages)
+        if total <= self.max_tokens:
+            return []
+
+        calls_by_id = {
+            call["id"]: call.get("function", {})
+            for message in messages
+            if message.get("role") == "assistant"
+            for call in message.get("tool_calls") or []
+        }
+        tool_positions = [
+            index
+            for index, message in enumerate(messages)
+            if message.get("role") == "tool"
+            and message.get("tool_call_id") not in self._evicted_ids
+        ]
+        evictable = tool_positions[: max(len(tool_positions) - self.keep_recent, 0)]
+
+        evicted: list[str] = []
+        for index in evictable:
+            if total <= self.max_tokens:
+                break
+            message = messages[index]
+            before = self.message_tokens(message)
+            function = calls_by_id.get(message.get("tool_call_id"), {})
+            stub = {
+                **message,
+                "content": self._stub(function, str(message.get("content") or "")),
+            }
+            after = self.message_tokens(stub)
+            if after >= before:
+                self._estimates.pop(id(stub), None)
+                continue
+            call_id = str(message.get("tool_call_id"))
+            self._replace(messages, index, stub)
+            total -= before - after
+            total += self._inline_back_references(messages, call_id, message.get("content"))
+            evicted.append(call_id)
+            self._evicted_ids.add(call_id)
+        self.evictions += len(evicted)
+        return evicted
+
+    def _replace(self, messages: list[dict[str, Any]], index: int, message: dict[str, Any]) -> int:
+        """Swap in `message`, dropping the replaced one's estimate; returns the token change."""
+        before = self.message_tokens(messages[index])
+        self._estimates.pop(id(messages[index]), None)
+        messages[index] = message
+        return self.message_tokens(message) - before
+
+    def _inline_back_references(
+        self, messages: list[dict[str, Any]], call_id: str, content: Any
+    ) -> int:
+        """
+        Move an evicted result into the first message that back-references it and
+        point the remaining back-references there; returns the token change.
+        """
+        reference = back_reference(call_id)
+        positions = [
+            index
+            for index, message in enumerate(messages)
+            if message.get("role") == "tool" and message.get("content") == reference
+        ]
+        if not positions:
+            return 0
+        first, *rest = positions
+        delta = self._replace(messages, first, {**messages[first], "content": content})
+        moved_to = back_reference(str(messages[first].get("tool_call_id")))
+        for index in rest:
+            delta += self._replace(messages, index, {**messages[index], "content": moved_to})
+        return delta
+
+    @staticmethod
+    def _stub(function: dict[str, Any], content: str) -> str:
+        return json.dumps(
+            {
+                "evicted": True,
+                "tool": function.get("name"),
+                "arguments": function.get("arguments"),
+                "preview": content[:PREVIEW_CHARS],
+                "note": "Result removed to save context; call the tool again if needed.",
+            }
+        )
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from study_guide_agent.orchestrators.usage import UsageLedger
+from study_guide_agent.tools.http_cache import CacheBackend
+
+MAX_SOURCE_CHARS = 60_000
+
+SUMMARY_PROMPT = (
+    "Summarize the following course material for a student study guide. Keep every "
+    "definition, formula, key concept, example and deadline; drop navigation text and "
+    "boilerplate. Respond in concise markdown."
+)
+
+
+def course_sources(
+    tools: dict[str, Callable[..., Any]], course_id: str
+) -> list[dict[str, str]]:
+    """
+    Split a course into independently summarizable units: one per module (with the
+    bodies of its pages), one per page outside any module, and one each for
+    assignments and announcements.
+    """
+    sources: list[dict[str, str]] = []
+    module_pages: set[str] = set()
+    for module in tools["list_modules"](course_id) or []:
+        items = module.get("items")
+        if items is None:
+            items = tools["get_module_items"](course_id, str(module.get("id")))
+        parts = [f"# Module: {module.get('name', '')}"]
+        for item in items or []:
+            parts.append(f"## {item.get('title', '')} ({item.get('type', '')})")
+            page_url = item.get("page_url")
+            if item.get("type") == "Page" and page_url:
+                module_pages.add(page_url)
+                page = tools["get_page_content"](course_id, page_url) or {}
+                parts.append(str(page.get("body") or ""))
+        sources.append(
+            {"kind": "module", "title": str(module.get("name", "")), "text": "\n".join(parts)}
+        )
+
+    for page in tools["list_pages"](course_id) or []:
+        page_url = page.get("url")
+        if not page_url or page_url in module_pages:
+            continue
+        body = (tools["get_page_content"](course_id, page_url) or {}).get("body") or ""
+        title = str(page.get("title") or page_url)
+        sources.append({"kind": "page", "title": title, "text": f"# {title}\n{body}"})
+
+    assignments = tools["list_assignments"](course_id) or []
+    if assignments:
+        text = "\n".join(
+            f"## {a.get('name', '')} (due {a.get('due_at') or 'n/a'})\n{a.get('description') or ''}"
+            for a in assignments
+        )
+        sources.append({"kind": "assignments", "title": "Assignments", "text": text})
+
+    announcements = tools["list_announcements"]([f"course_{course_id}"]) or []
+    if announcements:
+        text = "\n".join(
+            f"## {a.get('title', '')} ({a.get('posted_at') or ''})\n{a.get('message') or ''}"
+            for a in announcements
+        )
+        sources.append({"kind": "announcements", "title": "Announcements", "text": text})
+
+    for source in sources:
+        if len(source["text"]) > MAX_SOURCE_CHARS:
+            source["text"] = source["text"][:MAX_SOURCE_CHARS] + "\n[truncated]"
+    return sources
+
+
+def source_hash(model: str, source: dict[str, str]) -> str:
+    material = json.dumps([SUMMARY_PROMPT, model, source["kind"], source["title"], source["text"]])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class MapReducePipeline:
+    """
+    Generates one course guide in two passes: every source unit is summarized in
+    parallel (map), then the summaries are combined into the guide (reduce).
+
+    Summaries are cached by a hash of their source text, so a rerun only pays for
+    modules and pages whose content changed.
+    """
+
+    def __init__(
+        self,
+        openai_client: Any,
+        model: str,
+        tools: dict[str, Callable[..., Any]],
+        summary_cache: CacheBackend | None = None,
+        max_workers: int = 4,
+        usage: UsageLedger | None = None,
+    ) -> None:
+        self.openai_client = openai_client
+        self.model = model
+        self.tools = tools
+        self.summary_cache = summary_cache
+        self.max_workers = max_workers
+        self.usage = usage
+        self._lock = threading.Lock()
+        self.summarized = 0
+        self.cached = 0
+
+    def run_course(self, task_prompt: str, course: dict[str, Any]) -> dict[str, Any]:
+        """Summarize, reduce and write one course; returns the `write_study_guide` result."""
+        course_id = str(course.get("id"))
+        sources = course_sources(self.tools, course_id)
+        with ThreadPoolExecutor(
+            max_workers=max(self.max_workers, 1), thread_name_prefix="summarize"
+        ) as executor:
+            summaries = list(
+                executor.map(lambda source: self.summarize(source, course_id), sources)
+            )
+
+        guide = self._complete(
+            self._reduce_prompt(task_prompt, course, sources, summaries), course_id
+        )
+        return self.tools["write_study_guide"](
+            course_id=course_id,
+            content=guide,
+            slug=str(course.get("course_code") or ""),
+            meta={
+                "course_id": course_id,
+                "name": course.get("name"),
+                "generated_by": "map_reduce",
+                "sources": len(sources),
+            },
+        )
+
+    def summarize(self, source: dict[str, str], course_id: str | None = None) -> str:
+        key = f"{source_hash(self.model, source)}.json"
+        if self.summary_cache is not None:
+            data = self.summary_cache.read(key)
+            if data is not None:
+                self._count("cached")
+                return json.loads(data)["summary"]
+
+        summary = self._complete(
+            f"{SUMMARY_PROMPT}\n\n{source['kind'].title()}: {source['title']}\n\n{source['text']}",
+            course_id,
+        )
+        self._count("summarized")
+        if self.summary_cache is not None:
+            self.summary_cache.write(key, json.dumps({"summary": summary}).encode("utf-8"))
+        return summary
+
+    def metrics(self) -> dict[str, int]:
+        with self._lock:
+            return {"summarized": self.summarized, "cached": self.cached}
+
+    def _complete(self, prompt: str, course_id: str | None = None) -> str:
+        started = time.perf_counter()
+        response = self.openai_client.chat.completions.create(
+            model=self.model, messages=[{"role": "user", "content": prompt}]
+        )
+        if self.usage is not None:
+            self.usage.record_completion(
+                getattr(response, "usage", None), time.perf_counter() - started, course_id
+            )
+        return getattr(response.choices[0].message, "content", "") or ""
+
+    @staticmethod
+    def _reduce_prompt(
+        task_prompt: str,
+        course: dict[str, Any],
+        sources: list[dict[str, str]],
+        summaries: list[str],
+    ) -> str:
+        sections = "\n\n".join(
+            f"### {source['kind'].title()}: {source['title']}\n{summary}"
+            for source, summary in zip(sources, summaries)
+        )
+        return (
+            f"{task_prompt}\n\nThe content of course {course.get('name') or course.get('id')} "
+            "has already been summarized below. Combine these summaries into the complete "
+            "study guide following the template and guidelines above. Respond with only "
+            f"the markdown of the guide.\n\n{sections}"
+        )
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
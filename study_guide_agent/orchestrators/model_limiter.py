@@ -0,0 +1,186 @@
+import random
+import threading
+import time
+from collections.abc import Callable, Iterator
+from types import SimpleNamespace
+from typing import Any
+
+from study_guide_agent.tools.rate_limit import parse_retry_after
+
+THROTTLE_STATUS_CODES = frozenset({429, 503})
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+RETRYABLE_ERROR_NAMES = frozenset({"APIConnectionError", "APITimeoutError"})
+
+
+def error_status(exc: BaseException) -> int | None:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if error_status(exc) in RETRYABLE_STATUS_CODES:
+        return True
+    return isinstance(exc, (TimeoutError, ConnectionError)) or any(
+        cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(exc).__mro__
+    )
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is None:
+        return None
+    return parse_retry_after(headers.get("retry-after") or headers.get("Retry-After"))
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limit on in-flight model calls: every success grows the limit by
+    `1 / limit` (about one slot per full window), every throttle multiplies it by
+    `decrease_factor`. Callers block in `acquire` while the window is full.
+    """
+
+    def __init__(
+        self,
+        initial: float = 4.0,
+        minimum: float = 1.0,
+        maximum: float = 32.0,
+        decrease_factor: float = 0.5,
+    ) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self._limit = min(max(initial, minimum), maximum)
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self.max_in_flight = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+
+    def release(self, throttled: bool = False, succeeded: bool = False) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                self._limit = max(self.minimum, self._limit * self.decrease_factor)
+            elif succeeded:
+                self._limit = min(self.maximum, self._limit + 1.0 / self._limit)
+            self._condition.notify_all()
+
+
+class ResilientModelClient:
+    """
+    Wraps an OpenAI-compatible client so every `chat.completions.create` runs under
+    the adaptive limiter and is retried on 429, 5xx, timeouts and connection errors
+    with full-jitter exponential backoff. A `Retry-After` header sets the minimum
+    delay. Streamed responses hold their slot until the stream is consumed.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        limiter: AdaptiveConcurrencyLimiter | None = None,
+        max_retries: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        request_timeout_seconds: float | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+        jitter: Callable[[], float] = random.random,
+    ) -> None:
+        self.client = client
+        self.limiter = limiter or AdaptiveConcurrencyLimiter()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.request_timeout_seconds = request_timeout_seconds
+        self._sleep = sleep
+        self._jitter = jitter
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self._lock = threading.Lock()
+        self._started_at: float | None = None
+        self.requests = 0
+        self.successes = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+        self.backoff_seconds = 0.0
+
+    def create(self, **kwargs: Any) -> Any:
+        if self.request_timeout_seconds is not None:
+            kwargs.setdefault("timeout", self.request_timeout_seconds)
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            self._count("requests")
+            try:
+                response = self.client.chat.completions.create(**kwargs)
+            except Exception as exc:
+                throttled = error_status(exc) in THROTTLE_STATUS_CODES
+                self.limiter.release(throttled=throttled)
+                if throttled:
+                    self._count("throttled")
+                if not is_retryable(exc) or attempt >= self.max_retries:
+                    self._count("failures")
+                    raise
+                delay = self._backoff(attempt, retry_after_seconds(exc))
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                    self.backoff_seconds += delay
+                self._sleep(delay)
+                continue
+            if kwargs.get("stream"):
+                return self._hold_slot(response)
+            self._succeeded()
+            return response
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+            return {
+                "requests": self.requests,
+                "successes": self.successes,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "failures": self.failures,
+                "backoff_seconds": round(self.backoff_seconds, 3),
+                "concurrency_limit": self.limiter.limit,
+                "max_in_flight": self.limiter.max_in_flight,
+                "successes_per_minute": (
+                    round(self.successes * 60 / elapsed, 2) if elapsed > 0 else None
+                ),
+            }
+
+    def _backoff(self, attempt: int, retry_after: float | None) -> float:
+        ceiling = min(self.max_delay, self.base_delay * (2**attempt))
+        delay = ceiling * self._jitter()
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _hold_slot(self, chunks: Any) -> Iterator[Any]:
+        try:
+            yield from chunks
+        except BaseException:
+            self.limiter.release()
+            raise
+        self._succeeded()
+
+    def _succeeded(self) -> None:
+        self.limiter.release(succeeded=True)
+        self._count("successes")
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            if self._started_at is None:
+                self._started_at = time.monotonic()
+            setattr(self, counter, getattr(self, counter) + 1)
@@ -1,6 +1,7 @@
-from typing import Protocol, runtime_checkable
+from datetime import date
+from typing import Any, Protocol, runtime_checkable
 
-from study_guide_agent.models import RunOutcome, StudyGuideConfig
+from study_guide_agent.models import GuideWriteResult, RunOutcome, StudyGuideConfig
 
 
 @runtime_checkable
@@ -11,6 +12,26 @@ class AgentOrchestrator(Protocol):
         ...
 
 
+@runtime_checkable
+class CoursePrefetcher(Protocol):
+    """Loads course data before the orchestration loop starts."""
+
+    def prefetch(self, course_filter: str | None = None) -> dict[str, Any]:
+        ...
+
+    def course_ids(self) -> list[str]:
+        ...
+
+    def course(self, course_id: str) -> dict[str, Any] | None:
+        ...
+
+    def is_complete(self, course_id: str) -> bool:
+        ...
+
+    def restrict(self, course_ids: list[str]) -> None:
+        ...
+
+
 @runtime_checkable
 class StudyGuideStorage(Protocol):
     """Strategy protocol for study guide storage providers."""
@@ -20,8 +41,35 @@ class StudyGuideStorage(Protocol):
 
     def write_study_guide(
         self, course_id: str, slug: str, content: str, meta: dict
-    ) -> str:
+    ) -> GuideWriteResult:
+        ...
+
+    def read_course_fingerprint(self, course_id: str) -> dict | None:
+        ...
+
+    def write_course_fingerprint(self, course_id: str, record: dict) -> str:
         ...
 
     def write_run_history(self, run_id: str, summary: dict) -> str:
         ...
+
+    def read_run_history(self, run_id: str) -> dict | None:
+        ...
+
+    def query_run_history(
+        self,
+        start: date | str | None = None,
+        end: date | str | None = None,
+        status: str | None = None,
+        provider: str | None = None,
+    ) -> list[dict]:
+        ...
+
+    def read_artifact(self, name: str) -> bytes | None:
+        ...
+
+    def write_artifact(self, name: str, data: bytes) -> str:
+        ...
+
+    def delete_artifact(self, name: str) -> None:
+        ...
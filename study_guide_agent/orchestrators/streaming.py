@@ -0,0 +1,138 @@
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from study_guide_agent.orchestrators.context_budget import estimate_tokens
+
+
+@dataclass
+class AssembledFunction:
+    name: str = ""
+    arguments: str = ""
+
+
+@dataclass
+class AssembledToolCall:
+    """Mirrors the attributes of a non-streamed tool call so both paths share dispatch."""
+
+    id: str = ""
+    function: AssembledFunction = field(default_factory=AssembledFunction)
+
+
+@dataclass
+class StepTiming:
+    ttft_seconds: float | None = None
+    generation_seconds: float = 0.0
+    completion_tokens: int = 0
+    tokens_per_second: float | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "ttft_seconds": None if self.ttft_seconds is None else round(self.ttft_seconds, 3),
+            "generation_seconds": round(self.generation_seconds, 3),
+            "completion_tokens": self.completion_tokens,
+            "tokens_per_second": (
+                None if self.tokens_per_second is None else round(self.tokens_per_second, 1)
+            ),
+        }
+
+
+class StreamAssembler:
+    """
+    Rebuilds one assistant message from `chat.completions` stream chunks.
+
+    Iterating `tool_calls(chunks)` yields each tool call as soon as its arguments are
+    complete, i.e. when the stream moves on to the next tool-call index or ends, so
+    callers can start executing it while the model is still generating.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self._clock = clock
+        self._content: list[str] = []
+        self._calls: dict[int, AssembledToolCall] = {}
+        self._usage_tokens: int | None = None
+        self.usage: Any = None
+        self.timing = StepTiming()
+
+    @property
+    def content(self) -> str:
+        return "".join(self._content)
+
+    @property
+    def assembled_tool_calls(self) -> list[AssembledToolCall]:
+        return [self._calls[index] for index in sorted(self._calls)]
+
+    def tool_calls(self, chunks: Iterable[Any]) -> Iterator[AssembledToolCall]:
+        started = self._clock()
+        pending: int | None = None
+        for chunk in chunks:
+            usage = getattr(chunk, "usage", None)
+            if usage is not None and getattr(usage, "completion_tokens", None) is not None:
+                self.usage = usage
+                self._usage_tokens = int(usage.completion_tokens)
+            choices = getattr(chunk, "choices", None) or []
+            if not choices:
+                continue
+            delta = getattr(choices[0], "delta", None)
+            if delta is None:
+                continue
+            content = getattr(delta, "content", None)
+            call_deltas = getattr(delta, "tool_calls", None) or []
+            if (content or call_deltas) and self.timing.ttft_seconds is None:
+                self.timing.ttft_seconds = self._clock() - started
+            if content:
+                self._content.append(content)
+            for call_delta in call_deltas:
+                index = int(getattr(call_delta, "index", 0) or 0)
+                if pending is not None and index != pending:
+                    yield self._calls[pending]
+                pending = index
+                self._merge(index, call_delta)
+        if pending is not None:
+            yield self._calls[pending]
+        self._finish(self._clock() - started)
+
+    def _merge(self, index: int, call_delta: Any) -> None:
+        call = self._calls.setdefault(index, AssembledToolCall())
+        if getattr(call_delta, "id", None):
+            call.id = call_delta.id
+        function = getattr(call_delta, "function", None)
+        if function is None:
+            return
+        if getattr(function, "name", None):
+            call.function.name += function.name
+        if getattr(function, "arguments", None):
+            call.function.arguments += function.arguments
+
+    def _finish(self, elapsed: float) -> None:
+        timing = self.timing
+        timing.generation_seconds = elapsed
+        if self._usage_tokens is not None:
+            timing.completion_tokens = self._usage_tokens
+        else:
+            generated = self.content + "".join(
+                call.function.name + call.function.arguments
+                for call in self._calls.values()
+            )
+            timing.completion_tokens = estimate_tokens(generated)
+        decode_seconds = elapsed - (timing.ttft_seconds or 0.0)
+        if timing.completion_tokens and decode_seconds > 0:
+            timing.tokens_per_second = timing.completion_tokens / decode_seconds
+
+
+def summarize_timings(timings: list[StepTiming]) -> dict[str, Any]:
+    """Run-level latency summary; time-to-first-token is only known for streamed steps."""
+    ttfts = [t.ttft_seconds for t in timings if t.ttft_seconds is not None]
+    generation = sum(t.generation_seconds for t in timings)
+    tokens = sum(t.completion_tokens for t in timings)
+    return {
+        "steps": len(timings),
+        "mean_ttft_seconds": round(sum(ttfts) / len(ttfts), 3) if ttfts else None,
+        "generation_seconds": round(generation, 3),
+        "completion_tokens": tokens,
+        "tokens_per_second": round(tokens / generation, 1) if generation > 0 else None,
+    }
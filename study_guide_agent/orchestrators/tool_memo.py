@@ -0,0 +1,90 @@
+import json
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any
+
+NON_MEMOIZED_TOOLS = frozenset({"write_study_guide"})
+
+
+def normalize_arguments(value: Any) -> Any:
+    """Tool ids arrive as strings or numbers; normalize scalars so both share a key."""
+    if isinstance(value, dict):
+        return {str(k): normalize_arguments(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_arguments(v) for v in value]
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def back_reference(call_id: str) -> str:
+    """Tool message content pointing the model at an earlier identical result."""
+    return json.dumps({"same_result_as_tool_call_id": call_id})
+
+
+class ToolCallMemo:
+    """
+    Run-scoped memo for read-only tool calls, keyed by tool name and normalized
+    arguments. Concurrent identical calls share one in-flight execution.
+    """
+
+    def __init__(self, skip: frozenset[str] = NON_MEMOIZED_TOOLS) -> None:
+        self.skip = skip
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[str, Future]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(tool_name: str, args: dict[str, Any]) -> str:
+        return json.dumps([tool_name, normalize_arguments(args)], sort_keys=True, default=str)
+
+    def call(
+        self,
+        tool_name: str,
+        args: dict[str, Any],
+        call_id: str,
+        tool: Callable[..., Any],
+    ) -> tuple[Any, str | None]:
+        """Return `(result, earlier_call_id)`; the id is set when the result was reused."""
+        if tool_name in self.skip:
+            return tool(**args), None
+
+        key = self.key(tool_name, args)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                future: Future = Future()
+                self._entries[key] = (call_id, future)
+                self.misses += 1
+            else:
+                self.hits += 1
+        if entry is not None:
+            earlier_call_id, earlier = entry
+            return earlier.result(), earlier_call_id
+
+        try:
+            result = tool(**args)
+        except BaseException as exc:
+            with self._lock:
+                self._entries.pop(key, None)
+            future.set_exception(exc)
+            raise
+        future.set_result(result)
+        return result, None
+
+    def forget(self, call_id: str) -> None:
+        """Drop the entry owned by `call_id`, e.g. once its payload left the context."""
+        with self._lock:
+            for key, (owner, _) in list(self._entries.items()):
+                if owner == call_id:
+                    del self._entries[key]
+
+    def metrics(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
@@ -0,0 +1,114 @@
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+UNATTRIBUTED = "_unattributed"
+
+
+@dataclass(frozen=True)
+class ModelPricing:
+    """USD per million tokens; cached prompt tokens are billed at their own rate."""
+
+    prompt_per_million: float = 0.0
+    completion_per_million: float = 0.0
+    cached_prompt_per_million: float = 0.0
+
+    def cost(self, prompt_tokens: int, completion_tokens: int, cached_tokens: int) -> float:
+        uncached = max(prompt_tokens - cached_tokens, 0)
+        return (
+            uncached * self.prompt_per_million
+            + cached_tokens * self.cached_prompt_per_million
+            + completion_tokens * self.completion_per_million
+        ) / 1_000_000
+
+
+def usage_counts(usage: Any) -> tuple[int, int, int]:
+    """Read `(prompt, completion, cached)` tokens from an OpenAI `usage` object or dict."""
+    if usage is None:
+        return 0, 0, 0
+
+    def read(source: Any, name: str) -> Any:
+        return source.get(name) if isinstance(source, dict) else getattr(source, name, None)
+
+    details = read(usage, "prompt_tokens_details")
+    cached = read(details, "cached_tokens") if details is not None else None
+    return (
+        int(read(usage, "prompt_tokens") or 0),
+        int(read(usage, "completion_tokens") or 0),
+        int(cached or 0),
+    )
+
+
+class UsageLedger:
+    """
+    Thread-safe per-run accounting of completion usage and tool calls.
+
+    Completions are attributed to a course id when the caller knows it (per-course
+    and map-reduce modes); everything else lands under `_unattributed`.
+    """
+
+    def __init__(self, pricing: ModelPricing | None = None) -> None:
+        self.pricing = pricing or ModelPricing()
+        self._lock = threading.Lock()
+        self._courses: dict[str, dict[str, float]] = {}
+        self._tools: dict[str, dict[str, float]] = {}
+
+    def record_completion(
+        self, usage: Any, seconds: float, course_id: str | None = None
+    ) -> None:
+        prompt, completion, cached = usage_counts(usage)
+        with self._lock:
+            row = self._courses.setdefault(
+                course_id or UNATTRIBUTED,
+                {
+                    "completions": 0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "cached_tokens": 0,
+                    "seconds": 0.0,
+                },
+            )
+            row["completions"] += 1
+            row["prompt_tokens"] += prompt
+            row["completion_tokens"] += completion
+            row["cached_tokens"] += cached
+            row["seconds"] += seconds
+
+    def record_tool(
+        self, tool_name: str, seconds: float = 0.0, result_bytes: int = 0, error: bool = False
+    ) -> None:
+        with self._lock:
+            row = self._tools.setdefault(
+                tool_name, {"calls": 0, "errors": 0, "seconds": 0.0, "result_bytes": 0}
+            )
+            row["calls"] += 1
+            row["errors"] += int(error)
+            row["seconds"] += seconds
+            row["result_bytes"] += result_bytes
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            courses = {cid: self._finish(dict(row)) for cid, row in self._courses.items()}
+            tools = {
+                name: {**row, "seconds": round(row["seconds"], 3)}
+                for name, row in self._tools.items()
+            }
+        totals = {
+            key: sum(row[key] for row in courses.values())
+            for key in ("completions", "prompt_tokens", "completion_tokens", "cached_tokens")
+        }
+        totals["seconds"] = round(sum(row["seconds"] for row in courses.values()), 3)
+        totals["estimated_cost_usd"] = round(
+            sum(row["estimated_cost_usd"] for row in courses.values()), 6
+        )
+        return {"totals": totals, "courses": courses, "tools": tools}
+
+    def _finish(self, row: dict[str, float]) -> dict[str, Any]:
+        row["seconds"] = round(row["seconds"], 3)
+        row["estimated_cost_usd"] = round(
+            self.pricing.cost(
+                int(row["prompt_tokens"]), int(row["completion_tokens"]), int(row["cached_tokens"])
+            ),
+            6,
+        )
+        return row
@@ -0,0 +1,73 @@
+"""
+Summarize run-history trends per day from the run index.
+
+Usage:
+    python -m study_guide_agent.run_trends [--days 90] [--since YYYY-MM-DD]
+        [--until YYYY-MM-DD] [--status success|failed] [--provider NAME]
+
+Reads only the daily index partitions in the range from the configured storage
+(`STORAGE_PROVIDER`) and prints runs, failures, errors, mean duration and estimated
+cost per day.
+"""
+
+import argparse
+import os
+import sys
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from study_guide_agent.storage import create_storage
+from study_guide_agent.storage.run_history import RUN_STATUSES
+
+
+def daily_trends(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    days: dict[str, dict[str, Any]] = defaultdict(
+        lambda: {"runs": 0, "failed": 0, "errors": 0, "seconds": 0.0, "cost_usd": 0.0}
+    )
+    for record in records:
+        row = days[str(record.get("recorded_at", ""))[:10]]
+        row["runs"] += 1
+        row["failed"] += record.get("status") == "failed"
+        row["errors"] += int(record.get("errors") or 0)
+        row["seconds"] += float(record.get("duration_seconds") or 0.0)
+        row["cost_usd"] += float(record.get("estimated_cost_usd") or 0.0)
+    return [
+        {
+            "day": day,
+            "runs": row["runs"],
+            "failed": row["failed"],
+            "errors": row["errors"],
+            "mean_seconds": round(row["seconds"] / row["runs"], 3),
+            "cost_usd": round(row["cost_usd"], 4),
+        }
+        for day, row in sorted(days.items())
+    ]
+
+
+def main(argv: list[str], storage: Any | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="run_trends", description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--since", type=date.fromisoformat)
+    parser.add_argument("--until", type=date.fromisoformat)
+    parser.add_argument("--status", choices=RUN_STATUSES)
+    parser.add_argument("--provider")
+    args = parser.parse_args(argv)
+    if storage is None:
+        storage = create_storage(os.getenv("STORAGE_PROVIDER", "azure"))
+    until = args.until or datetime.now(timezone.utc).date()
+    since = args.since or until - timedelta(days=args.days - 1)
+    records = storage.query_run_history(
+        start=since, end=until, status=args.status, provider=args.provider
+    )
+    print(f"{'day':<12}{'runs':>6}{'failed':>8}{'errors':>8}{'mean s':>10}{'cost $':>10}")
+    for row in daily_trends(records):
+        print(
+            f"{row['day']:<12}{row['runs']:>6}{row['failed']:>8}{row['errors']:>8}"
+            f"{row['mean_seconds']:>10.1f}{row['cost_usd']:>10.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -1,9 +1,16 @@
 import os
+import time
+from dataclasses import replace
 from datetime import UTC, datetime
 
-from study_guide_agent.models import RunOutcome, StudyGuideConfig
+from study_guide_agent.fingerprints import config_digest, course_fingerprint
+from study_guide_agent.models import CourseResult, RunOutcome, StudyGuideConfig
 from study_guide_agent.orchestrators import create_orchestrator
-from study_guide_agent.orchestrators.protocol import AgentOrchestrator, StudyGuideStorage
+from study_guide_agent.orchestrators.protocol import (
+    AgentOrchestrator,
+    CoursePrefetcher,
+    StudyGuideStorage,
+)
 from study_guide_agent.storage import create_storage
 
 
@@ -16,6 +23,8 @@ def load_config_from_env() -> StudyGuideConfig:
         ),
         course_filter=os.getenv("COURSE_FILTER"),
         run_id=os.getenv("RUN_ID"),
+        skip_unchanged=os.getenv("SKIP_UNCHANGED_COURSES", "true").strip().lower()
+        not in {"false", "0", "off", "no"},
     )
 
 
@@ -29,30 +38,138 @@ class StudyGuideRunner:
         self.storage = storage
 
     def run(self, config: StudyGuideConfig) -> RunOutcome:
+        owns_orchestrator = self.orchestrator is None
         orchestrator = self.orchestrator or create_orchestrator(config.agent_provider)
         storage = self.storage or create_storage(config.storage_provider)
+        run_id = config.run_id or datetime.now(tz=UTC).strftime("%Y%m%dT%H%M%SZ")
 
         template, guidelines = storage.read_config()
         compiled_prompt = self._compose_prompt(config.task_prompt, template, guidelines)
-        effective_config = StudyGuideConfig(
-            agent_provider=config.agent_provider,
-            storage_provider=config.storage_provider,
-            task_prompt=compiled_prompt,
-            course_filter=config.course_filter,
-            run_id=config.run_id,
-        )
-        outcome = orchestrator.invoke(compiled_prompt, effective_config)
+        effective_config = replace(config, task_prompt=compiled_prompt)
+        started = time.perf_counter()
+        fingerprints: dict[str, str | None] = {}
+        unchanged: list[CourseResult] = []
+        time_saved = 0.0
+        defers_results = bool(getattr(orchestrator, "defers_results", False))
+        try:
+            prefetcher = getattr(orchestrator, "prefetcher", None)
+            if prefetcher is not None:
+                prefetcher.prefetch(config.course_filter)
+                if config.skip_unchanged:
+                    config_hash = config_digest(config.task_prompt, template, guidelines)
+                    fingerprints, unchanged, time_saved = self._partition_unchanged(
+                        prefetcher, storage, config_hash
+                    )
+                    effective_config = replace(
+                        effective_config, course_fingerprints=dict(fingerprints)
+                    )
+            if unchanged and not fingerprints and not defers_results:
+                outcome = RunOutcome(
+                    success=True, metrics={"provider": config.agent_provider, "steps": 0}
+                )
+            else:
+                if unchanged and fingerprints and prefetcher is not None:
+                    changed_ids = sorted(fingerprints)
+                    prefetcher.restrict(changed_ids)
+                    compiled_prompt = (
+                        f"{compiled_prompt}\n\nOnly these courses changed since the last "
+                        f"run; update only them: {', '.join(changed_ids)}"
+                    )
+                    effective_config = replace(
+                        effective_config,
+                        task_prompt=compiled_prompt,
+                        course_filter=",".join(changed_ids),
+                    )
+                outcome = orchestrator.invoke(compiled_prompt, effective_config)
+        finally:
+            close = getattr(orchestrator, "close", None)
+            if owns_orchestrator and callable(close):
+                close()
+        duration = time.perf_counter() - started
 
-        run_id = config.run_id or datetime.now(tz=UTC).strftime("%Y%m%dT%H%M%SZ")
+        self._record_fingerprints(
+            storage, outcome, {} if defers_results else fingerprints, duration, run_id
+        )
+        outcome = RunOutcome(
+            success=outcome.success,
+            course_results=[*outcome.course_results, *unchanged],
+            metrics={
+                **outcome.metrics,
+                "skipped_courses": len(unchanged),
+                "time_saved_seconds": round(time_saved, 3),
+            },
+        )
         summary = {
             "success": outcome.success,
             "course_count": len(outcome.course_results),
             "errors": len([c for c in outcome.course_results if c.error]),
             "provider": config.agent_provider,
+            "skipped_courses": len(unchanged),
+            "time_saved_seconds": round(time_saved, 3),
+            "duration_seconds": round(duration, 3),
+            "model_latency": outcome.metrics.get("model_latency", {}),
+            "usage": outcome.metrics.get("usage", {}),
         }
         storage.write_run_history(run_id=run_id, summary=summary)
         return outcome
 
+    @staticmethod
+    def _partition_unchanged(
+        prefetcher: CoursePrefetcher, storage: StudyGuideStorage, config_hash: str
+    ) -> tuple[dict[str, str | None], list[CourseResult], float]:
+        """
+        Split prefetched courses into changed fingerprints and unchanged results.
+        Courses whose prefetch was incomplete count as changed but carry no
+        fingerprint, so they are regenerated without being marked as up to date.
+        """
+        changed: dict[str, str | None] = {}
+        unchanged: list[CourseResult] = []
+        time_saved = 0.0
+        for course_id in prefetcher.course_ids():
+            course_data = prefetcher.course(course_id)
+            if course_data is None or not prefetcher.is_complete(course_id):
+                changed[course_id] = None
+                continue
+            fingerprint = course_fingerprint(course_data, config_hash)
+            stored = storage.read_course_fingerprint(course_id)
+            if stored and stored.get("fingerprint") == fingerprint:
+                unchanged.append(CourseResult(course_id=course_id, status="unchanged"))
+                time_saved += float(stored.get("generation_seconds", 0.0))
+            else:
+                changed[course_id] = fingerprint
+        return changed, unchanged, time_saved
+
+    @staticmethod
+    def _record_fingerprints(
+        storage: StudyGuideStorage,
+        outcome: RunOutcome,
+        fingerprints: dict[str, str | None],
+        duration: float,
+        run_id: str,
+    ) -> None:
+        """
+        A result's own fingerprint (the data a collected batch was generated from)
+        wins over the fingerprint of this run's data.
+        """
+        generated = [
+            (result, result.fingerprint or fingerprints.get(result.course_id))
+            for result in outcome.course_results
+            if result.status in ("updated", "unchanged") and not result.error
+        ]
+        generated = [(result, fingerprint) for result, fingerprint in generated if fingerprint]
+        if not generated:
+            return
+        per_course_seconds = duration / len(generated)
+        for result, fingerprint in generated:
+            storage.write_course_fingerprint(
+                result.course_id,
+                {
+                    "fingerprint": fingerprint,
+                    "generation_seconds": round(per_course_seconds, 3),
+                    "run_id": run_id,
+                },
+            )
+
     @staticmethod
     def _compose_prompt(base_prompt: str, template: str, guidelines: str) -> str:
         parts = [base_prompt]
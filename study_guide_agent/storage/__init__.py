@@ -1,14 +1,19 @@
+import os
+
 from study_guide_agent.orchestrators.protocol import StudyGuideStorage
 from study_guide_agent.storage.azure_blob import AzureBlobStorage
+from study_guide_agent.storage.compression import resolve_codec
 from study_guide_agent.storage.gcs import GCSStorage
 
 
 def create_storage(provider: str) -> StudyGuideStorage:
     normalized = provider.strip().lower()
+    codec = resolve_codec(os.getenv("STORAGE_COMPRESSION", "off"))
+    upload_workers = int(os.getenv("STORAGE_UPLOAD_WORKERS", "4"))
     if normalized == "azure":
-        return AzureBlobStorage()
+        return AzureBlobStorage(upload_workers=upload_workers, codec=codec)
     if normalized == "gcs":
-        return GCSStorage()
+        return GCSStorage(upload_workers=upload_workers, codec=codec)
     raise ValueError(f"Unknown storage provider: {provider}")
 
 
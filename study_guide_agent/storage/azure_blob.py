@@ -1,14 +1,36 @@
+import hashlib
 import json
+import logging
 import os
+import threading
+from datetime import date
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
 from azure.identity import DefaultAzureCredential
-from azure.storage.blob import BlobServiceClient
+from azure.storage.blob import BlobServiceClient, ContentSettings
+
+from study_guide_agent.models import GuideWriteResult
+from study_guide_agent.storage.compression import (
+    Codec,
+    decode,
+    delete_local,
+    read_local,
+    write_local,
+    write_local_if_changed,
+)
+from study_guide_agent.storage.run_history import RunHistoryIndex
+from study_guide_agent.storage.upload_pool import UploadPool
+from study_guide_agent.storage.upload_stats import HASH_METADATA_KEY, UploadStats, content_sha256
+
+logger = logging.getLogger(__name__)
 
 CONTAINER_CONFIG = "config"
 CONTAINER_GUIDES = "study-guides"
 CONTAINER_RUNS = "runs"
+CONTAINER_ARTIFACTS = "artifacts"
+MAX_CACHED_BLOB_CLIENTS = 1024
 
 
 def _blob_service_client() -> BlobServiceClient | None:
@@ -29,13 +51,41 @@ class AzureBlobStorage:
     """
     Azure Blob Storage adapter. Uses containers: config, study-guides, runs.
     Falls back to local filesystem when no storage env vars are set (for tests/local dev).
+
+    Container and blob clients are created once and reused for the life of the
+    adapter. With `upload_workers` above 1, a guide and its `course-meta.json` are
+    uploaded concurrently on a shared thread pool, and `write_study_guides` fans
+    out every course's uploads at once; `upload_workers=1` keeps the serial path.
+
+    Guides and metadata are uploaded with their SHA-256 in blob metadata. A write
+    whose content matches the stored hash (or the blob's Content-MD5) is skipped and
+    reported as `unchanged`.
+
+    With a `codec`, every blob is stored compressed with `Content-Encoding` set
+    (local files get the codec suffix) and reads decompress transparently, so
+    compressed and plain objects can coexist.
+
+    Besides `runs/{run_id}.json`, every run is appended to a daily-partitioned index
+    (`runs/index/YYYY-MM-DD.jsonl`) that `query_run_history` reads by date range.
     """
 
     def __init__(
         self,
         blob_service_client: Optional[BlobServiceClient] = None,
         base_dir: str = "runtime_storage/azure",
+        upload_workers: int = 4,
+        codec: Codec | None = None,
     ) -> None:
+        self.codec = codec
+        self._uploads = UploadPool(upload_workers, thread_name_prefix="blob-upload")
+        self._containers: dict[str, Any] = {}
+        self._blobs: dict[tuple[str, str], Any] = {}
+        self._stored_hashes: dict[tuple[str, str], str] = {}
+        self._clients_lock = threading.Lock()
+        self._upload_stats = UploadStats()
+        self._run_index = RunHistoryIndex(
+            self._read_run_object, self._write_run_object, self._uploads.run_all
+        )
         client: Optional[BlobServiceClient] = blob_service_client or _blob_service_client()
         if client is not None:
             self._client: Optional[BlobServiceClient] = client
@@ -47,69 +97,274 @@ class AzureBlobStorage:
 
     def read_config(self) -> tuple[str, str]:
         if self._client is not None:
-            config_container = self._client.get_container_client(CONTAINER_CONFIG)
-            template = self._download_text(
-                config_container, "study-guide-template.md"
-            )
-            guidelines = self._download_text(config_container, "guidelines.md")
+            template = self._download_text(CONTAINER_CONFIG, "study-guide-template.md")
+            guidelines = self._download_text(CONTAINER_CONFIG, "guidelines.md")
             return template, guidelines
         base = self._base_path
         if base is None:
             raise RuntimeError("Storage not configured")
         config_path = base / "config"
         config_path.mkdir(parents=True, exist_ok=True)
-        template_file = config_path / "study-guide-template.md"
-        guidelines_file = config_path / "guidelines.md"
-        template = template_file.read_text() if template_file.exists() else ""
-        guidelines = guidelines_file.read_text() if guidelines_file.exists() else ""
-        return template, guidelines
+        template = read_local(config_path / "study-guide-template.md") or b""
+        guidelines = read_local(config_path / "guidelines.md") or b""
+        return template.decode("utf-8"), guidelines.decode("utf-8")
 
     def write_study_guide(
         self, course_id: str, slug: str, content: str, meta: dict
-    ) -> str:
+    ) -> GuideWriteResult:
+        return self.write_study_guides(
+            [{"course_id": course_id, "slug": slug, "content": content, "meta": meta}]
+        )[0]
+
+    def write_study_guides(self, guides: list[dict]) -> list[GuideWriteResult]:
+        """
+        Write many guides at once; each entry has `course_id`, `slug`, `content` and
+        `meta`. Every upload is submitted before any is awaited, and the results
+        follow the order of `guides`. The first failed upload is re-raised.
+        """
         if self._client is not None:
-            guides_container = self._client.get_container_client(CONTAINER_GUIDES)
-            guide_blob = f"{course_id}/study-guide.md"
-            meta_blob = f"{course_id}/course-meta.json"
-            self._upload_text(guides_container, guide_blob, content)
-            self._upload_text(
-                guides_container, meta_blob, json.dumps(meta)
+            uploads = [
+                upload
+                for guide in guides
+                for upload in (
+                    (f"{guide['course_id']}/study-guide.md", str(guide["content"])),
+                    (f"{guide['course_id']}/course-meta.json", json.dumps(guide["meta"])),
+                )
+            ]
+            written = self._uploads.run_all(
+                [
+                    lambda blob_name=blob_name, text=text: self._upload_if_changed(
+                        CONTAINER_GUIDES, blob_name, text.encode("utf-8")
+                    )
+                    for blob_name, text in uploads
+                ]
             )
-            return f"{CONTAINER_GUIDES}/{guide_blob}"
+            return [
+                GuideWriteResult(
+                    path=f"{CONTAINER_GUIDES}/{guide['course_id']}/study-guide.md",
+                    status="written" if any(written[2 * index : 2 * index + 2]) else "unchanged",
+                )
+                for index, guide in enumerate(guides)
+            ]
+        base = self._base_path
+        if base is None:
+            raise RuntimeError("Storage not configured")
+        results = []
+        for guide in guides:
+            guides_path = base / "study-guides" / str(guide["course_id"])
+            guides_path.mkdir(parents=True, exist_ok=True)
+            guide_path, guide_written = self._write_local(
+                guides_path / "study-guide.md", str(guide["content"])
+            )
+            _, meta_written = self._write_local(
+                guides_path / "course-meta.json", json.dumps(guide["meta"])
+            )
+            results.append(
+                GuideWriteResult(
+                    path=str(guide_path),
+                    status="written" if guide_written or meta_written else "unchanged",
+                )
+            )
+        return results
+
+    def upload_metrics(self) -> dict[str, float | int | None]:
+        return {**self._upload_stats.metrics(), "workers": self._uploads.workers}
+
+    def close(self) -> None:
+        self._uploads.close()
+
+    def read_course_fingerprint(self, course_id: str) -> dict | None:
+        if self._client is not None:
+            data = self._download_bytes(CONTAINER_GUIDES, f"{course_id}/fingerprint.json")
+            return json.loads(data) if data else None
+        base = self._base_path
+        if base is None:
+            raise RuntimeError("Storage not configured")
+        data = read_local(base / "study-guides" / course_id / "fingerprint.json")
+        return json.loads(data) if data else None
+
+    def write_course_fingerprint(self, course_id: str, record: dict) -> str:
+        if self._client is not None:
+            blob_name = f"{course_id}/fingerprint.json"
+            self._upload_text(CONTAINER_GUIDES, blob_name, json.dumps(record))
+            return f"{CONTAINER_GUIDES}/{blob_name}"
         base = self._base_path
         if base is None:
             raise RuntimeError("Storage not configured")
-        guides_path = base / "study-guides" / course_id
-        guides_path.mkdir(parents=True, exist_ok=True)
-        (guides_path / "study-guide.md").write_text(content)
-        (guides_path / "course-meta.json").write_text(json.dumps(meta))
-        return str(guides_path / "study-guide.md")
+        path = base / "study-guides" / course_id / "fingerprint.json"
+        return str(write_local(path, json.dumps(record).encode("utf-8"), self.codec))
 
     def write_run_history(self, run_id: str, summary: dict) -> str:
+        path = self._write_run_object(f"{run_id}.json", json.dumps(summary).encode("utf-8"))
+        try:
+            self._run_index.append(run_id, summary)
+        except Exception:
+            logger.warning("Could not index run %s", run_id, exc_info=True)
+        return path
+
+    def query_run_history(
+        self,
+        start: date | str | None = None,
+        end: date | str | None = None,
+        status: str | None = None,
+        provider: str | None = None,
+    ) -> list[dict]:
+        return self._run_index.query(start=start, end=end, status=status, provider=provider)
+
+    def read_run_history(self, run_id: str) -> dict | None:
+        if self._client is not None:
+            data = self._download_bytes(CONTAINER_RUNS, f"{run_id}.json")
+            return json.loads(data) if data else None
+        base = self._base_path
+        if base is None:
+            raise RuntimeError("Storage not configured")
+        data = read_local(base / "runs" / f"{run_id}.json")
+        return json.loads(data) if data else None
+
+    def read_artifact(self, name: str) -> bytes | None:
+        if self._client is not None:
+            return self._download_bytes(CONTAINER_ARTIFACTS, name)
+        return read_local(self._artifact_path(name))
+
+    def write_artifact(self, name: str, data: bytes) -> str:
+        if self._client is not None:
+            try:
+                self._upload_bytes(CONTAINER_ARTIFACTS, name, data)
+            except ResourceNotFoundError:
+                self._create_container(CONTAINER_ARTIFACTS)
+                self._upload_bytes(CONTAINER_ARTIFACTS, name, data)
+            return f"{CONTAINER_ARTIFACTS}/{name}"
+        return str(write_local(self._artifact_path(name), data, self.codec))
+
+    def delete_artifact(self, name: str) -> None:
         if self._client is not None:
-            runs_container = self._client.get_container_client(CONTAINER_RUNS)
-            blob_name = f"{run_id}.json"
-            self._upload_text(runs_container, blob_name, json.dumps(summary))
-            return f"{CONTAINER_RUNS}/{blob_name}"
+            try:
+                self._blob_client(CONTAINER_ARTIFACTS, name).delete_blob()
+            except Exception:
+                pass
+            return
+        delete_local(self._artifact_path(name))
+
+    def _read_run_object(self, name: str) -> bytes | None:
+        """Read from the runs container; only a missing blob reads as None."""
+        if self._client is None:
+            return read_local(self._runs_path() / name)
+        try:
+            downloader = self._blob_client(CONTAINER_RUNS, name).download_blob(decompress=False)
+            data = downloader.readall()
+        except ResourceNotFoundError:
+            return None
+        return decode(data, downloader.properties.content_settings.content_encoding)
+
+    def _write_run_object(self, name: str, data: bytes) -> str:
+        if self._client is not None:
+            self._upload_bytes(CONTAINER_RUNS, name, data)
+            return f"{CONTAINER_RUNS}/{name}"
+        return str(write_local(self._runs_path() / name, data, self.codec))
+
+    def _runs_path(self) -> Path:
+        base = self._base_path
+        if base is None:
+            raise RuntimeError("Storage not configured")
+        return base / "runs"
+
+    def _artifact_path(self, name: str) -> Path:
         base = self._base_path
         if base is None:
             raise RuntimeError("Storage not configured")
-        runs_path = base / "runs"
-        runs_path.mkdir(parents=True, exist_ok=True)
-        output_path = runs_path / f"{run_id}.json"
-        output_path.write_text(json.dumps(summary))
-        return str(output_path)
-
-    @staticmethod
-    def _download_text(container_client, blob_name: str) -> str:
+        return base / "artifacts" / name
+
+    def _container_client(self, container: str) -> Any:
+        with self._clients_lock:
+            client = self._containers.get(container)
+            if client is None:
+                assert self._client is not None
+                client = self._client.get_container_client(container)
+                self._containers[container] = client
+            return client
+
+    def _create_container(self, container: str) -> None:
+        """Deployments that predate a container get it on first write."""
+        try:
+            self._container_client(container).create_container()
+        except ResourceExistsError:
+            pass
+
+    def _blob_client(self, container: str, blob_name: str) -> Any:
+        key = (container, blob_name)
+        with self._clients_lock:
+            client = self._blobs.get(key)
+        if client is None:
+            client = self._container_client(container).get_blob_client(blob_name)
+            with self._clients_lock:
+                if key not in self._blobs and len(self._blobs) >= MAX_CACHED_BLOB_CLIENTS:
+                    self._blobs.pop(next(iter(self._blobs)))
+                client = self._blobs.setdefault(key, client)
+        return client
+
+    def _write_local(self, path: Path, content: str) -> tuple[Path, bool]:
+        return write_local_if_changed(path, content.encode("utf-8"), self.codec, self._upload_stats)
+
+    def _upload_if_changed(self, container: str, blob_name: str, data: bytes) -> bool:
+        """Upload unless the stored blob already has this content; True when uploaded."""
+        digest = content_sha256(data)
+        key = (container, blob_name)
+        with self._clients_lock:
+            known = self._stored_hashes.get(key)
+        if known is None:
+            known = self._stored_hash(container, blob_name, data)
+        if known == digest:
+            self._upload_stats.record_skip(len(data))
+            with self._clients_lock:
+                self._stored_hashes[key] = digest
+            return False
+        self._upload_bytes(container, blob_name, data, metadata={HASH_METADATA_KEY: digest})
+        with self._clients_lock:
+            self._stored_hashes[key] = digest
+        return True
+
+    def _stored_hash(self, container: str, blob_name: str, data: bytes) -> str | None:
+        """
+        SHA-256 recorded on the stored blob. Blobs written before hashes were kept
+        fall back to Content-MD5: a match means `data` is what is stored.
+        """
         try:
-            blob_client = container_client.get_blob_client(blob_name)
-            data = blob_client.download_blob().readall()
-            return data.decode("utf-8")
+            properties = self._blob_client(container, blob_name).get_blob_properties()
         except Exception:
-            return ""
+            return None
+        stored = (properties.metadata or {}).get(HASH_METADATA_KEY)
+        if stored:
+            return stored
+        content_md5 = getattr(properties.content_settings, "content_md5", None)
+        if content_md5 and bytes(content_md5) == hashlib.md5(data).digest():
+            return content_sha256(data)
+        return None
+
+    def _download_bytes(self, container: str, blob_name: str) -> bytes | None:
+        try:
+            downloader = self._blob_client(container, blob_name).download_blob(decompress=False)
+            data = downloader.readall()
+        except Exception:
+            return None
+        return decode(data, downloader.properties.content_settings.content_encoding)
 
-    @staticmethod
-    def _upload_text(container_client, blob_name: str, content: str) -> None:
-        blob_client = container_client.get_blob_client(blob_name)
-        blob_client.upload_blob(content.encode("utf-8"), overwrite=True)
+    def _download_text(self, container: str, blob_name: str) -> str:
+        data = self._download_bytes(container, blob_name)
+        return data.decode("utf-8") if data is not None else ""
+
+    def _upload_text(self, container: str, blob_name: str, content: str) -> None:
+        self._upload_bytes(container, blob_name, content.encode("utf-8"))
+
+    def _upload_bytes(
+        self, container: str, blob_name: str, data: bytes, metadata: dict | None = None
+    ) -> None:
+        kwargs: dict[str, Any] = {"overwrite": True}
+        if metadata is not None:
+            kwargs["metadata"] = metadata
+        payload = data
+        if self.codec is not None:
+            payload = self.codec.compress(data)
+            kwargs["content_settings"] = ContentSettings(content_encoding=self.codec.name)
+        with self._upload_stats.timed(len(data)) as timer:
+            timer.stored_size = len(payload)
+            self._blob_client(container, blob_name).upload_blob(payload, **kwargs)
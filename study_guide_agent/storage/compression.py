@@ -0,0 +1,127 @@
+import gzip
+import importlib.util
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from study_guide_agent.storage.upload_stats import UploadStats
+
+COMPRESSION_MODES = ("off", "gzip", "zstd", "auto")
+
+
+@dataclass(frozen=True)
+class Codec:
+    """A compression format; `name` doubles as the blob `Content-Encoding` token."""
+
+    name: str
+    suffix: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+GZIP = Codec(
+    name="gzip",
+    suffix=".gz",
+    compress=lambda data: gzip.compress(data, compresslevel=6, mtime=0),
+    decompress=gzip.decompress,
+)
+
+
+def zstd_available() -> bool:
+    return importlib.util.find_spec("zstandard") is not None
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    import zstandard
+
+    return zstandard.ZstdCompressor(level=10).compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    import zstandard
+
+    return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+ZSTD = Codec(name="zstd", suffix=".zst", compress=_zstd_compress, decompress=_zstd_decompress)
+
+CODECS = {codec.name: codec for codec in (GZIP, ZSTD)}
+
+
+def resolve_codec(mode: str | None) -> Codec | None:
+    """
+    `off` disables compression, `gzip` and `zstd` pick that codec and `auto` uses
+    zstd when the `zstandard` package is installed, otherwise gzip.
+    """
+    normalized = (mode or "off").strip().lower()
+    if normalized in ("off", "none", "0", ""):
+        return None
+    if normalized == "auto":
+        return ZSTD if zstd_available() else GZIP
+    if normalized == "zstd" and not zstd_available():
+        raise RuntimeError("STORAGE_COMPRESSION=zstd needs the zstandard package")
+    if normalized not in CODECS:
+        raise ValueError(f"Unknown storage compression: {mode}")
+    return CODECS[normalized]
+
+
+def decode(data: bytes, content_encoding: str | None) -> bytes:
+    """Undo `content_encoding`; unencoded (or `identity`) data is returned as is."""
+    encoding = (content_encoding or "").strip().lower()
+    if encoding in ("", "identity"):
+        return data
+    codec = CODECS.get(encoding)
+    if codec is None:
+        raise ValueError(f"Unsupported Content-Encoding: {content_encoding}")
+    return codec.decompress(data)
+
+
+def local_variants(path: Path) -> list[Path]:
+    """`path` followed by its compressed siblings (`name.gz`, `name.zst`)."""
+    return [path, *(path.with_name(path.name + codec.suffix) for codec in CODECS.values())]
+
+
+def read_local(path: Path) -> bytes | None:
+    """Read whichever variant of `path` exists, decompressing by suffix."""
+    for candidate in local_variants(path):
+        try:
+            data = candidate.read_bytes()
+        except FileNotFoundError:
+            continue
+        for codec in CODECS.values():
+            if candidate.name.endswith(codec.suffix) and candidate != path:
+                return codec.decompress(data)
+        return data
+    return None
+
+
+def write_local(path: Path, data: bytes, codec: Codec | None) -> Path:
+    """
+    Write `data` to `path` (plus the codec suffix when compressing) and remove the
+    other variants so a later read cannot pick up stale content.
+    """
+    target = path.with_name(path.name + codec.suffix) if codec is not None else path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(codec.compress(data) if codec is not None else data)
+    for candidate in local_variants(path):
+        if candidate != target:
+            candidate.unlink(missing_ok=True)
+    return target
+
+
+def write_local_if_changed(
+    path: Path, data: bytes, codec: Codec | None, stats: UploadStats
+) -> tuple[Path, bool]:
+    """Write unless the stored content is identical; returns the file and if it was written."""
+    if read_local(path) == data:
+        stats.record_skip(len(data))
+        return next(candidate for candidate in local_variants(path) if candidate.exists()), False
+    with stats.timed(len(data)) as timer:
+        target = write_local(path, data, codec)
+        timer.stored_size = target.stat().st_size
+    return target, True
+
+
+def delete_local(path: Path) -> None:
+    for candidate in local_variants(path):
+        candidate.unlink(missing_ok=True)
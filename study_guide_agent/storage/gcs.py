@@ -1,40 +1,375 @@
+import base64
+import hashlib
 import json
+import logging
+import math
+import os
+import threading
+import uuid
+from datetime import date
 from pathlib import Path
+from typing import Any
+
+from study_guide_agent.models import GuideWriteResult
+from study_guide_agent.storage.compression import (
+    Codec,
+    decode,
+    delete_local,
+    read_local,
+    write_local,
+    write_local_if_changed,
+)
+from study_guide_agent.storage.run_history import RunHistoryIndex
+from study_guide_agent.storage.upload_pool import UploadPool
+from study_guide_agent.storage.upload_stats import HASH_METADATA_KEY, UploadStats, content_sha256
+
+logger = logging.getLogger(__name__)
+
+PREFIX_CONFIG = "config"
+PREFIX_GUIDES = "study-guides"
+PREFIX_RUNS = "runs"
+PREFIX_ARTIFACTS = "artifacts"
+RESUMABLE_THRESHOLD_BYTES = 8 * 1024 * 1024
+RESUMABLE_CHUNK_BYTES = 8 * 1024 * 1024
+COMPOSITE_THRESHOLD_BYTES = 64 * 1024 * 1024
+COMPOSITE_PART_BYTES = 16 * 1024 * 1024
+MAX_COMPOSE_SOURCES = 32
+CONTENT_TYPES = {".md": "text/markdown; charset=utf-8", ".json": "application/json"}
+
+
+def _gcs_bucket(upload_workers: int) -> Any | None:
+    bucket_name = os.getenv("GCS_BUCKET")
+    if not bucket_name:
+        return None
+    from google.cloud import storage
+
+    project = os.getenv("GCS_PROJECT") or None
+    if os.getenv("STORAGE_EMULATOR_HOST"):
+        from google.auth.credentials import AnonymousCredentials
+
+        client = storage.Client(project=project or "local", credentials=AnonymousCredentials())
+    else:
+        client = storage.Client(project=project)
+    _size_connection_pool(client, upload_workers)
+    return client.bucket(bucket_name)
+
+
+def _size_connection_pool(client: Any, upload_workers: int) -> None:
+    """Give the client's HTTP session one keep-alive connection per upload thread."""
+    session = getattr(client, "_http", None)
+    if session is None or not hasattr(session, "mount"):
+        return
+    from requests.adapters import HTTPAdapter
+
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(upload_workers * 2, 10))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+def _content_type(name: str) -> str:
+    return CONTENT_TYPES.get(Path(name).suffix.lower(), "application/octet-stream")
 
 
 class GCSStorage:
     """
-    Local filesystem-backed placeholder for GCS strategy.
+    Google Cloud Storage adapter. Objects live in one bucket (`GCS_BUCKET`) under the
+    prefixes config/, study-guides/, runs/ and artifacts/. Falls back to the local
+    filesystem when no bucket is configured (for tests/local dev); setting
+    `STORAGE_EMULATOR_HOST` points the client at a local GCS emulator.
+
+    One client (and its connection pool) serves every request. A guide and its
+    `course-meta.json` upload concurrently and `write_study_guides` fans out many
+    courses at once. Payloads above `resumable_threshold` use resumable uploads;
+    payloads above `composite_threshold` are uploaded as parallel parts that are
+    composed into the final object, with the parts deleted in one batch request.
+
+    Guide writes whose SHA-256 (or, for older objects, MD5) matches the stored object
+    are skipped and reported as `unchanged`. With a `codec`, objects are stored
+    compressed with `Content-Encoding` set and read back transparently.
+
+    Besides `runs/{run_id}.json`, every run is appended to a daily-partitioned index
+    (`runs/index/YYYY-MM-DD.jsonl`) that `query_run_history` reads by date range.
     """
 
-    def __init__(self, base_dir: str = "runtime_storage/gcs") -> None:
+    def __init__(
+        self,
+        base_dir: str = "runtime_storage/gcs",
+        codec: Codec | None = None,
+        bucket: Any | None = None,
+        upload_workers: int = 4,
+        resumable_threshold: int = RESUMABLE_THRESHOLD_BYTES,
+        composite_threshold: int = COMPOSITE_THRESHOLD_BYTES,
+        composite_part_bytes: int = COMPOSITE_PART_BYTES,
+    ) -> None:
+        self.codec = codec
+        self.resumable_threshold = resumable_threshold
+        self.composite_threshold = composite_threshold
+        self.composite_part_bytes = composite_part_bytes
+        self._uploads = UploadPool(upload_workers, thread_name_prefix="gcs-upload")
+        self._part_uploads = UploadPool(upload_workers, thread_name_prefix="gcs-part")
+        self._upload_stats = UploadStats()
+        self._stored_hashes: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.resumable_uploads = 0
+        self.composite_uploads = 0
+        self._bucket = bucket if bucket is not None else _gcs_bucket(self._uploads.workers)
+        self._run_index = RunHistoryIndex(
+            self._read_run_object, self._write_run_object, self._uploads.run_all
+        )
         self.base_path = Path(base_dir)
         self.config_path = self.base_path / "config"
         self.guides_path = self.base_path / "study-guides"
         self.runs_path = self.base_path / "runs"
-        self.config_path.mkdir(parents=True, exist_ok=True)
-        self.guides_path.mkdir(parents=True, exist_ok=True)
-        self.runs_path.mkdir(parents=True, exist_ok=True)
+        self.artifacts_path = self.base_path / "artifacts"
+        if self._bucket is None:
+            self.config_path.mkdir(parents=True, exist_ok=True)
+            self.guides_path.mkdir(parents=True, exist_ok=True)
+            self.runs_path.mkdir(parents=True, exist_ok=True)
 
     def read_config(self) -> tuple[str, str]:
-        template_file = self.config_path / "study-guide-template.md"
-        guidelines_file = self.config_path / "guidelines.md"
-        template = template_file.read_text() if template_file.exists() else ""
-        guidelines = guidelines_file.read_text() if guidelines_file.exists() else ""
-        return template, guidelines
+        if self._bucket is not None:
+            template = self._download_bytes(f"{PREFIX_CONFIG}/study-guide-template.md") or b""
+            guidelines = self._download_bytes(f"{PREFIX_CONFIG}/guidelines.md") or b""
+        else:
+            template = read_local(self.config_path / "study-guide-template.md") or b""
+            guidelines = read_local(self.config_path / "guidelines.md") or b""
+        return template.decode("utf-8"), guidelines.decode("utf-8")
 
     def write_study_guide(
         self, course_id: str, slug: str, content: str, meta: dict
-    ) -> str:
-        course_dir = self.guides_path / course_id
-        course_dir.mkdir(parents=True, exist_ok=True)
-        guide_path = course_dir / "study-guide.md"
-        guide_path.write_text(content)
-        meta_path = course_dir / "course-meta.json"
-        meta_path.write_text(json.dumps(meta))
-        return str(guide_path)
+    ) -> GuideWriteResult:
+        return self.write_study_guides(
+            [{"course_id": course_id, "slug": slug, "content": content, "meta": meta}]
+        )[0]
+
+    def write_study_guides(self, guides: list[dict]) -> list[GuideWriteResult]:
+        """
+        Write many guides at once; each entry has `course_id`, `slug`, `content` and
+        `meta`. Results follow the order of `guides`; the first failed upload is
+        re-raised.
+        """
+        if self._bucket is None:
+            return [self._write_local_guide(guide) for guide in guides]
+        uploads = [
+            upload
+            for guide in guides
+            for upload in (
+                (f"{PREFIX_GUIDES}/{guide['course_id']}/study-guide.md", str(guide["content"])),
+                (
+                    f"{PREFIX_GUIDES}/{guide['course_id']}/course-meta.json",
+                    json.dumps(guide["meta"]),
+                ),
+            )
+        ]
+        written = self._uploads.run_all(
+            [
+                lambda name=name, text=text: self._upload_if_changed(name, text.encode("utf-8"))
+                for name, text in uploads
+            ]
+        )
+        return [
+            GuideWriteResult(
+                path=f"{PREFIX_GUIDES}/{guide['course_id']}/study-guide.md",
+                status="written" if any(written[2 * index : 2 * index + 2]) else "unchanged",
+            )
+            for index, guide in enumerate(guides)
+        ]
+
+    def upload_metrics(self) -> dict[str, float | int | None]:
+        with self._lock:
+            counts = {
+                "resumable_uploads": self.resumable_uploads,
+                "composite_uploads": self.composite_uploads,
+            }
+        return {**self._upload_stats.metrics(), **counts, "workers": self._uploads.workers}
+
+    def close(self) -> None:
+        self._uploads.close()
+        self._part_uploads.close()
+
+    def read_course_fingerprint(self, course_id: str) -> dict | None:
+        if self._bucket is not None:
+            data = self._download_bytes(f"{PREFIX_GUIDES}/{course_id}/fingerprint.json")
+        else:
+            data = read_local(self.guides_path / course_id / "fingerprint.json")
+        return json.loads(data) if data else None
+
+    def write_course_fingerprint(self, course_id: str, record: dict) -> str:
+        data = json.dumps(record).encode("utf-8")
+        if self._bucket is not None:
+            name = f"{PREFIX_GUIDES}/{course_id}/fingerprint.json"
+            self._upload_bytes(name, data)
+            return name
+        path = self.guides_path / course_id / "fingerprint.json"
+        return str(write_local(path, data, self.codec))
 
     def write_run_history(self, run_id: str, summary: dict) -> str:
-        output_path = self.runs_path / f"{run_id}.json"
-        output_path.write_text(json.dumps(summary))
-        return str(output_path)
+        path = self._write_run_object(f"{run_id}.json", json.dumps(summary).encode("utf-8"))
+        try:
+            self._run_index.append(run_id, summary)
+        except Exception:
+            logger.warning("Could not index run %s", run_id, exc_info=True)
+        return path
+
+    def query_run_history(
+        self,
+        start: date | str | None = None,
+        end: date | str | None = None,
+        status: str | None = None,
+        provider: str | None = None,
+    ) -> list[dict]:
+        return self._run_index.query(start=start, end=end, status=status, provider=provider)
+
+    def read_run_history(self, run_id: str) -> dict | None:
+        if self._bucket is not None:
+            data = self._download_bytes(f"{PREFIX_RUNS}/{run_id}.json")
+        else:
+            data = read_local(self.runs_path / f"{run_id}.json")
+        return json.loads(data) if data else None
+
+    def read_artifact(self, name: str) -> bytes | None:
+        if self._bucket is not None:
+            return self._download_bytes(f"{PREFIX_ARTIFACTS}/{name}")
+        return read_local(self.artifacts_path / name)
+
+    def write_artifact(self, name: str, data: bytes) -> str:
+        if self._bucket is not None:
+            object_name = f"{PREFIX_ARTIFACTS}/{name}"
+            self._upload_bytes(object_name, data)
+            return object_name
+        return str(write_local(self.artifacts_path / name, data, self.codec))
+
+    def delete_artifact(self, name: str) -> None:
+        if self._bucket is not None:
+            try:
+                self._bucket.blob(f"{PREFIX_ARTIFACTS}/{name}").delete()
+            except Exception:
+                pass
+            return
+        delete_local(self.artifacts_path / name)
+
+    def _read_run_object(self, name: str) -> bytes | None:
+        """Read from the runs prefix; only a missing object reads as None."""
+        if self._bucket is None:
+            return read_local(self.runs_path / name)
+        blob = self._bucket.get_blob(f"{PREFIX_RUNS}/{name}")
+        if blob is None:
+            return None
+        return decode(blob.download_as_bytes(raw_download=True), blob.content_encoding)
+
+    def _write_run_object(self, name: str, data: bytes) -> str:
+        if self._bucket is not None:
+            self._upload_bytes(f"{PREFIX_RUNS}/{name}", data)
+            return f"{PREFIX_RUNS}/{name}"
+        return str(write_local(self.runs_path / name, data, self.codec))
+
+    def _write_local_guide(self, guide: dict) -> GuideWriteResult:
+        course_dir = self.guides_path / str(guide["course_id"])
+        guide_path, guide_written = write_local_if_changed(
+            course_dir / "study-guide.md",
+            str(guide["content"]).encode("utf-8"),
+            self.codec,
+            self._upload_stats,
+        )
+        _, meta_written = write_local_if_changed(
+            course_dir / "course-meta.json",
+            json.dumps(guide["meta"]).encode("utf-8"),
+            self.codec,
+            self._upload_stats,
+        )
+        return GuideWriteResult(
+            path=str(guide_path),
+            status="written" if guide_written or meta_written else "unchanged",
+        )
+
+    def _upload_if_changed(self, name: str, data: bytes) -> bool:
+        """Upload unless the stored object already has this content; True when uploaded."""
+        digest = content_sha256(data)
+        with self._lock:
+            known = self._stored_hashes.get(name)
+        if known is None:
+            known = self._stored_hash(name, data)
+        if known == digest:
+            self._upload_stats.record_skip(len(data))
+        else:
+            self._upload_bytes(name, data, metadata={HASH_METADATA_KEY: digest})
+        with self._lock:
+            self._stored_hashes[name] = digest
+        return known != digest
+
+    def _stored_hash(self, name: str, data: bytes) -> str | None:
+        """
+        SHA-256 recorded on the stored object. Objects written before hashes were
+        kept fall back to their MD5: a match means `data` is what is stored.
+        """
+        try:
+            blob = self._bucket.get_blob(name)
+        except Exception:
+            return None
+        if blob is None:
+            return None
+        stored = (blob.metadata or {}).get(HASH_METADATA_KEY)
+        if stored:
+            return stored
+        md5 = base64.b64encode(hashlib.md5(data).digest()).decode("ascii")
+        return content_sha256(data) if blob.md5_hash == md5 else None
+
+    def _upload_bytes(self, name: str, data: bytes, metadata: dict | None = None) -> None:
+        payload = self.codec.compress(data) if self.codec is not None else data
+        blob = self._bucket.blob(name)
+        if metadata is not None:
+            blob.metadata = metadata
+        if self.codec is not None:
+            blob.content_encoding = self.codec.name
+        blob.content_type = _content_type(name)
+        with self._upload_stats.timed(len(data)) as timer:
+            timer.stored_size = len(payload)
+            if len(payload) >= self.composite_threshold:
+                self._composite_upload(blob, payload)
+                counter = "composite_uploads"
+            else:
+                counter = None
+                if len(payload) >= self.resumable_threshold:
+                    blob.chunk_size = RESUMABLE_CHUNK_BYTES
+                    counter = "resumable_uploads"
+                blob.upload_from_string(payload, content_type=blob.content_type)
+        if counter is not None:
+            with self._lock:
+                setattr(self, counter, getattr(self, counter) + 1)
+
+    def _composite_upload(self, blob: Any, payload: bytes) -> None:
+        """Upload parts in parallel, compose them into `blob` and delete the parts."""
+        part_count = min(math.ceil(len(payload) / self.composite_part_bytes), MAX_COMPOSE_SOURCES)
+        part_size = math.ceil(len(payload) / part_count)
+        token = uuid.uuid4().hex[:12]
+        parts = [
+            self._bucket.blob(f"{blob.name}.part-{token}-{index}") for index in range(part_count)
+        ]
+        try:
+            self._part_uploads.run_all(
+                [
+                    lambda part=part, index=index: part.upload_from_string(
+                        payload[index * part_size : (index + 1) * part_size],
+                        content_type="application/octet-stream",
+                    )
+                    for index, part in enumerate(parts)
+                ]
+            )
+            blob.compose(parts)
+        finally:
+            try:
+                with self._bucket.client.batch():
+                    for part in parts:
+                        part.delete()
+            except Exception:
+                pass
+
+    def _download_bytes(self, name: str) -> bytes | None:
+        try:
+            blob = self._bucket.get_blob(name)
+            if blob is None:
+                return None
+            data = blob.download_as_bytes(raw_download=True)
+        except Exception:
+            return None
+        return decode(data, blob.content_encoding)
@@ -0,0 +1,114 @@
+import json
+import threading
+from collections.abc import Callable
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+INDEX_PREFIX = "index"
+DEFAULT_QUERY_DAYS = 90
+RUN_STATUSES = ("success", "failed")
+
+
+def index_record(run_id: str, summary: dict, recorded_at: datetime) -> dict[str, Any]:
+    """Compact, query-friendly projection of a run-history summary."""
+    totals = (summary.get("usage") or {}).get("totals") or {}
+    return {
+        "run_id": run_id,
+        "recorded_at": recorded_at.isoformat(timespec="seconds"),
+        "status": "success" if summary.get("success") else "failed",
+        "provider": summary.get("provider"),
+        "course_count": summary.get("course_count"),
+        "errors": summary.get("errors"),
+        "skipped_courses": summary.get("skipped_courses"),
+        "duration_seconds": summary.get("duration_seconds"),
+        "prompt_tokens": totals.get("prompt_tokens"),
+        "completion_tokens": totals.get("completion_tokens"),
+        "estimated_cost_usd": totals.get("estimated_cost_usd"),
+    }
+
+
+def partition_name(day: date) -> str:
+    return f"{INDEX_PREFIX}/{day.isoformat()}.jsonl"
+
+
+def _as_date(value: date | str | None) -> date | None:
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+
+class RunHistoryIndex:
+    """
+    Rolling run index kept next to the per-run summaries as one JSONL partition per
+    UTC day (`index/YYYY-MM-DD.jsonl`). Appends rewrite only that day's partition;
+    queries read only the partitions inside the requested date range, in parallel
+    through `run_all`, and filter them in memory.
+
+    The append is a read-modify-write serialized only within this process, so the
+    index assumes a single writer (one scheduled sync at a time); overlapping runs
+    in separate processes can drop each other's entries. The per-run summaries are
+    the record of truth, and storage adapters log rather than raise when an append
+    fails.
+    """
+
+    def __init__(
+        self,
+        read: Callable[[str], bytes | None],
+        write: Callable[[str, bytes], Any],
+        run_all: Callable[[list[Callable[[], Any]]], list[Any]],
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ) -> None:
+        self.read = read
+        self.write = write
+        self.run_all = run_all
+        self.clock = clock
+        self._lock = threading.Lock()
+
+    def append(self, run_id: str, summary: dict) -> dict[str, Any]:
+        recorded_at = self.clock()
+        record = index_record(run_id, summary, recorded_at)
+        name = partition_name(recorded_at.date())
+        with self._lock:
+            existing = self.read(name) or b""
+            if existing and not existing.endswith(b"\n"):
+                existing += b"\n"
+            self.write(name, existing + json.dumps(record).encode("utf-8") + b"\n")
+        return record
+
+    def query(
+        self,
+        start: date | str | None = None,
+        end: date | str | None = None,
+        status: str | None = None,
+        provider: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Index records recorded between `start` and `end` (inclusive UTC dates;
+        defaults to the last `DEFAULT_QUERY_DAYS` days), optionally restricted to
+        one `status` (`success` or `failed`) and `provider`, oldest first.
+        """
+        if status is not None and status not in RUN_STATUSES:
+            raise ValueError(f"Unknown run status: {status}")
+        end_day = _as_date(end) or self.clock().date()
+        start_day = _as_date(start) or end_day - timedelta(days=DEFAULT_QUERY_DAYS - 1)
+        days = [
+            start_day + timedelta(days=offset)
+            for offset in range((end_day - start_day).days + 1)
+        ]
+        partitions = self.run_all([lambda day=day: self.read(partition_name(day)) for day in days])
+        records = [
+            json.loads(line)
+            for data in partitions
+            if data
+            for line in data.decode("utf-8").splitlines()
+            if line.strip()
+        ]
+        return sorted(
+            (
+                record
+                for record in records
+                if (status is None or record.get("status") == status)
+                and (provider is None or record.get("provider") == provider)
+            ),
+            key=lambda record: str(record.get("recorded_at")),
+        )
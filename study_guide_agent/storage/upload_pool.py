@@ -0,0 +1,40 @@
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+
+class UploadPool:
+    """
+    Lazily created thread pool shared by every write of a storage adapter. With one
+    worker (or a single upload) the uploads run inline, which is the serial path.
+    """
+
+    def __init__(self, workers: int, thread_name_prefix: str) -> None:
+        self.workers = max(int(workers), 1)
+        self.thread_name_prefix = thread_name_prefix
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def run_all(self, uploads: list[Callable[[], Any]]) -> list[Any]:
+        """Run every upload, wait for all of them and re-raise the first failure."""
+        if self.workers <= 1 or len(uploads) <= 1:
+            return [upload() for upload in uploads]
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix=self.thread_name_prefix
+                )
+            executor = self._executor
+        futures = [executor.submit(upload) for upload in uploads]
+        errors = [future.exception() for future in futures]
+        for error in errors:
+            if error is not None:
+                raise error
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
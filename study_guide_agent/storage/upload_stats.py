@@ -0,0 +1,90 @@
+import hashlib
+import math
+import threading
+import time
+
+HASH_METADATA_KEY = "content_sha256"
+
+
+def content_sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class UploadStats:
+    """
+    Per-upload latency and aggregate throughput for a storage adapter, plus the
+    writes skipped because the stored content was already identical. `bytes` counts
+    content before compression and `stored_bytes` what was actually transferred.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._latencies: list[float] = []
+        self._bytes = 0
+        self._stored_bytes = 0
+        self._skipped = 0
+        self._skipped_bytes = 0
+        self._first_started: float | None = None
+        self._last_finished: float | None = None
+
+    def record(
+        self, size: int, started: float, finished: float, stored_size: int | None = None
+    ) -> None:
+        with self._lock:
+            self._latencies.append(finished - started)
+            self._bytes += size
+            self._stored_bytes += size if stored_size is None else stored_size
+            if self._first_started is None or started < self._first_started:
+                self._first_started = started
+            if self._last_finished is None or finished > self._last_finished:
+                self._last_finished = finished
+
+    def record_skip(self, size: int) -> None:
+        with self._lock:
+            self._skipped += 1
+            self._skipped_bytes += size
+
+    def timed(self, size: int) -> "_UploadTimer":
+        return _UploadTimer(self, size)
+
+    def metrics(self) -> dict[str, float | int | None]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            wall = (
+                self._last_finished - self._first_started
+                if self._first_started is not None and self._last_finished is not None
+                else 0.0
+            )
+            count = len(latencies)
+            return {
+                "uploads": count,
+                "bytes": self._bytes,
+                "stored_bytes": self._stored_bytes,
+                "mean_ms": round(sum(latencies) * 1000 / count, 2) if count else None,
+                "p95_ms": (
+                    round(latencies[max(math.ceil(count * 0.95) - 1, 0)] * 1000, 2)
+                    if count
+                    else None
+                ),
+                "max_ms": round(latencies[-1] * 1000, 2) if count else None,
+                "wall_seconds": round(wall, 3),
+                "bytes_per_second": round(self._bytes / wall, 1) if wall > 0 else None,
+                "skipped_unchanged": self._skipped,
+                "skipped_bytes": self._skipped_bytes,
+            }
+
+
+class _UploadTimer:
+    def __init__(self, stats: UploadStats, size: int) -> None:
+        self.stats = stats
+        self.size = size
+        self.stored_size: int | None = None
+        self.started = 0.0
+
+    def __enter__(self) -> "_UploadTimer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.stats.record(self.size, self.started, time.perf_counter(), self.stored_size)
@@ -1,4 +1,10 @@
+from study_guide_agent.tools.async_canvas_tools import AsyncCanvasTools, BlockingCanvasTools
 from study_guide_agent.tools.canvas_tools import CanvasTools
 from study_guide_agent.tools.openai_schemas import get_openai_tool_definitions
 
-__all__ = ["CanvasTools", "get_openai_tool_definitions"]
+__all__ = [
+    "AsyncCanvasTools",
+    "BlockingCanvasTools",
+    "CanvasTools",
+    "get_openai_tool_definitions",
+]
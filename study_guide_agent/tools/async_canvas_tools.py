@@ -0,0 +1,321 @@
+import asyncio
+import threading
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+import httpx
+
+from study_guide_agent.tools.canvas_tools import QUERCUS_BASE_URL, canvas_headers
+from study_guide_agent.tools.extractors import DEFAULT_CHAR_BUDGET
+from study_guide_agent.tools.file_download import (
+    DEFAULT_MAX_FILE_BYTES,
+    DEFAULT_MAX_INLINE_BYTES,
+    FileDownload,
+    build_file_result,
+)
+from study_guide_agent.tools.http_cache import HttpCache
+from study_guide_agent.tools.rate_limit import CanvasRateLimiter, is_rate_limited
+
+T = TypeVar("T")
+
+
+def expand_page_urls(last_url: str) -> list[str] | None:
+    """
+    Build the URLs for pages 2..N from a Canvas `Link: last` URL.
+    Returns None when the pagination uses opaque bookmarks instead of page numbers.
+    """
+    parts = urlsplit(last_url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    page_values = [value for key, value in query if key == "page"]
+    if len(page_values) != 1 or not page_values[0].isdigit():
+        return None
+    last_page = int(page_values[0])
+    urls: list[str] = []
+    for page in range(2, last_page + 1):
+        page_query = [
+            (key, str(page) if key == "page" else value) for key, value in query
+        ]
+        urls.append(urlunsplit(parts._replace(query=urlencode(page_query))))
+    return urls
+
+
+class AsyncCanvasTools:
+    """
+    Async Canvas API helper. Mirrors `CanvasTools`, but fetches the remaining pages
+    of a paginated endpoint concurrently when Canvas advertises a `Link: last` page.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        base_url: str = QUERCUS_BASE_URL,
+        client: httpx.AsyncClient | None = None,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.2,
+        max_concurrency: int = 4,
+        cache: HttpCache | None = None,
+        max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+        max_inline_bytes: int = DEFAULT_MAX_INLINE_BYTES,
+        extract_char_budget: int = DEFAULT_CHAR_BUDGET,
+        rate_limiter: CanvasRateLimiter | None = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_concurrency = max_concurrency
+        self.client = client or httpx.AsyncClient()
+        self.cache = cache
+        self.max_file_bytes = max_file_bytes
+        self.max_inline_bytes = max_inline_bytes
+        self.extract_char_budget = extract_char_budget
+        self.rate_limiter = rate_limiter
+
+    async def list_my_courses(self) -> list[dict[str, Any]]:
+        return await self._get_paginated(
+            "/api/v1/courses",
+            params={"enrollment_type": "student", "enrollment_state": "active"},
+        )
+
+    async def list_modules(self, course_id: str) -> list[dict[str, Any]]:
+        include_values = ["items", "content_details"]
+        return await self._get_paginated(
+            f"/api/v1/courses/{course_id}/modules",
+            params={"include[]": include_values},
+        )
+
+    async def get_module_items(
+        self, course_id: str, module_id: str
+    ) -> list[dict[str, Any]]:
+        return await self._get_paginated(
+            f"/api/v1/courses/{course_id}/modules/{module_id}/items"
+        )
+
+    async def list_pages(self, course_id: str) -> list[dict[str, Any]]:
+        return await self._get_paginated(f"/api/v1/courses/{course_id}/pages")
+
+    async def get_page_content(self, course_id: str, page_url: str) -> dict[str, Any]:
+        return await self._get_json(f"/api/v1/courses/{course_id}/pages/{page_url}")
+
+    async def get_file_content(self, file_id: str) -> dict[str, Any]:
+        metadata = await self._get_json(f"/api/v1/files/{file_id}")
+        download_url = metadata.get("url")
+        if not download_url:
+            raise ValueError("File metadata missing download url")
+
+        absolute_download_url = urljoin(self.base_url + "/", str(download_url))
+        with await self._download(absolute_download_url) as download:
+            return build_file_result(
+                metadata,
+                file_id,
+                download,
+                max_inline_bytes=self.max_inline_bytes,
+                char_budget=self.extract_char_budget,
+            )
+
+    async def list_announcements(
+        self, context_codes: list[str]
+    ) -> list[dict[str, Any]]:
+        return await self._get_paginated(
+            "/api/v1/announcements",
+            params={"context_codes[]": context_codes},
+        )
+
+    async def list_assignments(self, course_id: str) -> list[dict[str, Any]]:
+        return await self._get_paginated(f"/api/v1/courses/{course_id}/assignments")
+
+    async def list_files(self, course_id: str) -> list[dict[str, Any]]:
+        return await self._get_paginated(f"/api/v1/courses/{course_id}/files")
+
+    def cache_metrics(self) -> dict[str, int]:
+        return self.cache.metrics() if self.cache is not None else {}
+
+    def rate_limit_metrics(self) -> dict[str, float | int]:
+        return self.rate_limiter.metrics() if self.rate_limiter is not None else {}
+
+    async def aclose(self) -> None:
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.flush)
+        await self.client.aclose()
+
+    async def _request(
+        self, method: str, url: str, params: dict[str, Any] | None = None
+    ) -> httpx.Response:
+        """Cache reads and writes can be storage round trips, so they run off the loop."""
+        headers = canvas_headers(self.token)
+        cache_key = None
+        cached = None
+        if self.cache is not None and method.upper() == "GET":
+            cache_key = HttpCache.key(method, url, params, self.token)
+            cached = await asyncio.to_thread(self.cache.lookup, cache_key)
+            if cached is not None:
+                headers.update(cached.validators())
+
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+            response = await self.client.request(
+                method=method,
+                url=url,
+                params=params,
+                headers=headers,
+                timeout=30.0,
+            )
+            if self.rate_limiter is not None:
+                self.rate_limiter.observe(response)
+            if self.cache is not None and cache_key is not None:
+                response = await asyncio.to_thread(
+                    self.cache.resolve, cache_key, cached, response
+                )
+            if not is_rate_limited(response):
+                response.raise_for_status()
+                return response
+            if attempt == self.max_retries:
+                response.raise_for_status()
+            delay = self.backoff_seconds * (2**attempt)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        raise RuntimeError("retry loop exhausted")
+
+    async def _download(self, url: str) -> FileDownload:
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+            async with self.client.stream(
+                "GET", url, headers=canvas_headers(self.token), timeout=30.0
+            ) as response:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.observe(response)
+                if not is_rate_limited(response):
+                    response.raise_for_status()
+                    download = FileDownload(max_bytes=self.max_file_bytes)
+                    try:
+                        async for chunk in response.aiter_bytes():
+                            if not download.write(chunk):
+                                break
+                    except BaseException:
+                        download.close()
+                        raise
+                    return download
+                if attempt == self.max_retries:
+                    response.raise_for_status()
+            delay = self.backoff_seconds * (2**attempt)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        raise RuntimeError("retry loop exhausted")
+
+    async def _get_json(
+        self, path: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        response = await self._request("GET", f"{self.base_url}{path}", params=params)
+        payload = response.json()
+        if not isinstance(payload, dict):
+            raise TypeError("Expected JSON object response")
+        return payload
+
+    async def _get_paginated(
+        self, path: str, params: dict[str, Any] | None = None
+    ) -> list[dict[str, Any]]:
+        first = await self._request("GET", f"{self.base_url}{path}", params=params)
+        items = _list_payload(first)
+        next_url = first.links.get("next", {}).get("url")
+        if not next_url:
+            return items
+
+        last_url = first.links.get("last", {}).get("url")
+        page_urls = expand_page_urls(last_url) if last_url else None
+        if page_urls is None:
+            return items + await self._follow_next_links(next_url)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(url: str) -> list[dict[str, Any]]:
+            async with semaphore:
+                return _list_payload(await self._request("GET", url))
+
+        pages = await asyncio.gather(*(fetch(url) for url in page_urls))
+        for page in pages:
+            items.extend(page)
+        return items
+
+    async def _follow_next_links(self, next_url: str | None) -> list[dict[str, Any]]:
+        items: list[dict[str, Any]] = []
+        while next_url:
+            response = await self._request("GET", next_url)
+            items.extend(_list_payload(response))
+            next_url = response.links.get("next", {}).get("url")
+        return items
+
+
+def _list_payload(response: httpx.Response) -> list[dict[str, Any]]:
+    payload = response.json()
+    return payload if isinstance(payload, list) else []
+
+
+class BlockingCanvasTools:
+    """
+    Synchronous facade over `AsyncCanvasTools` so it can back the regular tool callables.
+    Coroutines run on a private event loop thread, which keeps the async client's
+    connection pool bound to one loop no matter which thread calls in.
+    """
+
+    def __init__(self, async_tools: AsyncCanvasTools) -> None:
+        self.async_tools = async_tools
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="canvas-tools-loop", daemon=True
+        )
+        self._thread.start()
+
+    def list_my_courses(self) -> list[dict[str, Any]]:
+        return self._run(self.async_tools.list_my_courses())
+
+    def list_modules(self, course_id: str) -> list[dict[str, Any]]:
+        return self._run(self.async_tools.list_modules(course_id=course_id))
+
+    def get_module_items(self, course_id: str, module_id: str) -> list[dict[str, Any]]:
+        return self._run(
+            self.async_tools.get_module_items(course_id=course_id, module_id=module_id)
+        )
+
+    def list_pages(self, course_id: str) -> list[dict[str, Any]]:
+        return self._run(self.async_tools.list_pages(course_id=course_id))
+
+    def get_page_content(self, course_id: str, page_url: str) -> dict[str, Any]:
+        return self._run(
+            self.async_tools.get_page_content(course_id=course_id, page_url=page_url)
+        )
+
+    def get_file_content(self, file_id: str) -> dict[str, Any]:
+        return self._run(self.async_tools.get_file_content(file_id=file_id))
+
+    def list_announcements(self, context_codes: list[str]) -> list[dict[str, Any]]:
+        return self._run(
+            self.async_tools.list_announcements(context_codes=context_codes)
+        )
+
+    def list_assignments(self, course_id: str) -> list[dict[str, Any]]:
+        return self._run(self.async_tools.list_assignments(course_id=course_id))
+
+    def list_files(self, course_id: str) -> list[dict[str, Any]]:
+        return self._run(self.async_tools.list_files(course_id=course_id))
+
+    def cache_metrics(self) -> dict[str, int]:
+        return self.async_tools.cache_metrics()
+
+    def rate_limit_metrics(self) -> dict[str, float | int]:
+        return self.async_tools.rate_limit_metrics()
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        self._run(self.async_tools.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _run(self, coro: Coroutine[Any, Any, T]) -> T:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
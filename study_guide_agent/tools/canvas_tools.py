@@ -1,13 +1,29 @@
-import base64
 import time
 from typing import Any
 from urllib.parse import urljoin
 
 import httpx
 
+from study_guide_agent.tools.extractors import DEFAULT_CHAR_BUDGET
+from study_guide_agent.tools.file_download import (
+    DEFAULT_MAX_FILE_BYTES,
+    DEFAULT_MAX_INLINE_BYTES,
+    FileDownload,
+    build_file_result,
+)
+from study_guide_agent.tools.http_cache import HttpCache
+from study_guide_agent.tools.rate_limit import CanvasRateLimiter, is_rate_limited
+
 QUERCUS_BASE_URL = "https://q.utoronto.ca"
 
 
+def canvas_headers(token: str) -> dict[str, str]:
+    return {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/json+canvas-string-ids",
+    }
+
+
 class CanvasTools:
     """Canvas API helper with pagination and basic retry handling."""
 
@@ -18,12 +34,22 @@ class CanvasTools:
         client: httpx.Client | None = None,
         max_retries: int = 3,
         backoff_seconds: float = 0.2,
+        cache: HttpCache | None = None,
+        max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+        max_inline_bytes: int = DEFAULT_MAX_INLINE_BYTES,
+        extract_char_budget: int = DEFAULT_CHAR_BUDGET,
+        rate_limiter: CanvasRateLimiter | None = None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.token = token
         self.max_retries = max_retries
         self.backoff_seconds = backoff_seconds
         self.client = client or httpx.Client()
+        self.cache = cache
+        self.max_file_bytes = max_file_bytes
+        self.max_inline_bytes = max_inline_bytes
+        self.extract_char_budget = extract_char_budget
+        self.rate_limiter = rate_limiter
 
     def list_my_courses(self) -> list[dict[str, Any]]:
         return self._get_paginated(
@@ -43,6 +69,9 @@ class CanvasTools:
             f"/api/v1/courses/{course_id}/modules/{module_id}/items"
         )
 
+    def list_pages(self, course_id: str) -> list[dict[str, Any]]:
+        return self._get_paginated(f"/api/v1/courses/{course_id}/pages")
+
     def get_page_content(self, course_id: str, page_url: str) -> dict[str, Any]:
         return self._get_json(f"/api/v1/courses/{course_id}/pages/{page_url}")
 
@@ -53,26 +82,14 @@ class CanvasTools:
             raise ValueError("File metadata missing download url")
 
         absolute_download_url = urljoin(self.base_url + "/", str(download_url))
-        response = self._request("GET", absolute_download_url)
-        raw = response.content
-        mime_type = metadata.get("content-type", "application/octet-stream")
-        name = metadata.get("display_name") or metadata.get("filename") or str(file_id)
-
-        try:
-            text = raw.decode("utf-8")
-            encoding = "text"
-            content: str = text
-        except UnicodeDecodeError:
-            encoding = "base64"
-            content = base64.b64encode(raw).decode("ascii")
-
-        return {
-            "id": str(metadata.get("id", file_id)),
-            "name": name,
-            "mime_type": mime_type,
-            "encoding": encoding,
-            "content": content,
-        }
+        with self._download(absolute_download_url) as download:
+            return build_file_result(
+                metadata,
+                file_id,
+                download,
+                max_inline_bytes=self.max_inline_bytes,
+                char_budget=self.extract_char_budget,
+            )
 
     def list_announcements(self, context_codes: list[str]) -> list[dict[str, Any]]:
         return self._get_paginated(
@@ -83,24 +100,50 @@ class CanvasTools:
     def list_assignments(self, course_id: str) -> list[dict[str, Any]]:
         return self._get_paginated(f"/api/v1/courses/{course_id}/assignments")
 
+    def list_files(self, course_id: str) -> list[dict[str, Any]]:
+        return self._get_paginated(f"/api/v1/courses/{course_id}/files")
+
+    def cache_metrics(self) -> dict[str, int]:
+        return self.cache.metrics() if self.cache is not None else {}
+
+    def rate_limit_metrics(self) -> dict[str, float | int]:
+        return self.rate_limiter.metrics() if self.rate_limiter is not None else {}
+
+    def close(self) -> None:
+        if self.cache is not None:
+            self.cache.flush()
+        self.client.close()
+
     def _headers(self) -> dict[str, str]:
-        return {
-            "Authorization": f"Bearer {self.token}",
-            "Accept": "application/json+canvas-string-ids",
-        }
+        return canvas_headers(self.token)
 
     def _request(
         self, method: str, url: str, params: dict[str, Any] | None = None
     ) -> httpx.Response:
+        headers = self._headers()
+        cache_key = None
+        cached = None
+        if self.cache is not None and method.upper() == "GET":
+            cache_key = HttpCache.key(method, url, params, self.token)
+            cached = self.cache.lookup(cache_key)
+            if cached is not None:
+                headers.update(cached.validators())
+
         for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
             response = self.client.request(
                 method=method,
                 url=url,
                 params=params,
-                headers=self._headers(),
+                headers=headers,
                 timeout=30.0,
             )
-            if response.status_code != 429:
+            if self.rate_limiter is not None:
+                self.rate_limiter.observe(response)
+            if self.cache is not None and cache_key is not None:
+                response = self.cache.resolve(cache_key, cached, response)
+            if not is_rate_limited(response):
                 response.raise_for_status()
                 return response
             if attempt == self.max_retries:
@@ -110,6 +153,33 @@ class CanvasTools:
                 time.sleep(delay)
         raise RuntimeError("retry loop exhausted")
 
+    def _download(self, url: str) -> FileDownload:
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            with self.client.stream(
+                "GET", url, headers=self._headers(), timeout=30.0
+            ) as response:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.observe(response)
+                if not is_rate_limited(response):
+                    response.raise_for_status()
+                    download = FileDownload(max_bytes=self.max_file_bytes)
+                    try:
+                        for chunk in response.iter_bytes():
+                            if not download.write(chunk):
+                                break
+                    except BaseException:
+                        download.close()
+                        raise
+                    return download
+                if attempt == self.max_retries:
+                    response.raise_for_status()
+            delay = self.backoff_seconds * (2**attempt)
+            if delay > 0:
+                time.sleep(delay)
+        raise RuntimeError("retry loop exhausted")
+
     def _get_json(
         self, path: str, params: dict[str, Any] | None = None
     ) -> dict[str, Any]:
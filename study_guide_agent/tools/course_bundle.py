@@ -0,0 +1,131 @@
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+DEFAULT_PAGE_CHAR_BUDGET = 60_000
+DEFAULT_MAX_ANNOUNCEMENTS = 10
+DESCRIPTION_CHARS = 2_000
+
+
+def build_course_bundle(
+    canvas_tools: Any,
+    course_id: str,
+    page_char_budget: int = DEFAULT_PAGE_CHAR_BUDGET,
+    max_announcements: int = DEFAULT_MAX_ANNOUNCEMENTS,
+    max_workers: int = 8,
+    normalize: Callable[[Any], Any] | None = None,
+) -> dict[str, Any]:
+    """
+    One-call view of a course: modules with items, page bodies in module order until
+    `page_char_budget` characters are used, assignments and the most recent
+    announcements. Listings are fetched in parallel; page bodies are fetched in
+    waves of `max_workers` and no further waves start once the budget is spent.
+    Pages past the budget are listed with `body: None` and `truncated: True` so the
+    model can still fetch them with `get_page_content`; a page that cannot be fetched is
+    listed with `body: None` and its `error`. `normalize` (e.g. HTML to markdown)
+    is applied to fetched results before budgets and truncation.
+    """
+    normalize = normalize or (lambda value: value)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bundle") as executor:
+        modules_future = executor.submit(canvas_tools.list_modules, course_id=course_id)
+        pages_future = executor.submit(canvas_tools.list_pages, course_id=course_id)
+        assignments_future = executor.submit(canvas_tools.list_assignments, course_id=course_id)
+        announcements_future = executor.submit(
+            canvas_tools.list_announcements, context_codes=[f"course_{course_id}"]
+        )
+        modules = [dict(module) for module in modules_future.result() or []]
+        missing_items = {
+            str(module.get("id")): executor.submit(
+                canvas_tools.get_module_items, course_id=course_id, module_id=str(module.get("id"))
+            )
+            for module in modules
+            if module.get("items") is None
+        }
+        for module in modules:
+            future = missing_items.get(str(module.get("id")))
+            if future is not None:
+                module["items"] = future.result() or []
+
+        pages_index = pages_future.result() or []
+        page_order = _page_order(modules, pages_index)
+        titles = {page.get("url"): page.get("title") for page in pages_index}
+        pages: list[dict[str, Any]] = []
+        remaining = page_char_budget
+        for start in range(0, len(page_order), max(max_workers, 1)):
+            if remaining <= 0:
+                break
+            wave = page_order[start : start + max(max_workers, 1)]
+            bodies = [
+                executor.submit(canvas_tools.get_page_content, course_id=course_id, page_url=url)
+                for url in wave
+            ]
+            for url, future in zip(wave, bodies):
+                entry: dict[str, Any] = {"url": url, "title": titles.get(url) or url}
+                try:
+                    body = str((normalize(future.result()) or {}).get("body") or "")
+                except Exception as exc:
+                    entry.update(body=None, truncated=False, error=f"{type(exc).__name__}: {exc}")
+                    pages.append(entry)
+                    continue
+                if remaining <= 0:
+                    entry.update(body=None, truncated=True)
+                elif len(body) > remaining:
+                    entry.update(body=body[:remaining], truncated=True)
+                    remaining = 0
+                else:
+                    entry.update(body=body, truncated=False)
+                    remaining -= len(body)
+                pages.append(entry)
+        pages.extend(
+            {"url": url, "title": titles.get(url) or url, "body": None, "truncated": True}
+            for url in page_order[len(pages) :]
+        )
+
+        assignments = [
+            {
+                "id": assignment.get("id"),
+                "name": assignment.get("name"),
+                "due_at": assignment.get("due_at"),
+                "points_possible": assignment.get("points_possible"),
+                "description": (assignment.get("description") or "")[:DESCRIPTION_CHARS],
+            }
+            for assignment in normalize(assignments_future.result() or [])
+        ]
+        announcements = sorted(
+            normalize(announcements_future.result() or []),
+            key=lambda announcement: str(announcement.get("posted_at") or ""),
+            reverse=True,
+        )[:max_announcements]
+
+    return {
+        "course_id": course_id,
+        "modules": modules,
+        "pages": pages,
+        "assignments": assignments,
+        "announcements": [
+            {
+                "id": announcement.get("id"),
+                "title": announcement.get("title"),
+                "posted_at": announcement.get("posted_at"),
+                "message": announcement.get("message"),
+            }
+            for announcement in announcements
+        ],
+    }
+
+
+def _page_order(modules: list[dict[str, Any]], pages_index: list[dict[str, Any]]) -> list[str]:
+    """Pages linked from modules first (in module order), then the remaining pages."""
+    order: list[str] = []
+    seen: set[str] = set()
+    linked = [
+        item.get("page_url")
+        for module in modules
+        for item in module.get("items") or []
+        if item.get("type") == "Page"
+    ]
+    for url in [*linked, *(page.get("url") for page in pages_index)]:
+        if url and url not in seen:
+            seen.add(url)
+            order.append(url)
+    return order
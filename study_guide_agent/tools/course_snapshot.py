@@ -0,0 +1,267 @@
+import json
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+OPTIONAL_LISTINGS = frozenset({"files", "announcements"})
+"""Listings students often cannot see (hidden Files tab, announcements turned off)."""
+UNAVAILABLE_STATUSES = frozenset({401, 403, 404})
+
+
+def matches_course_filter(course: dict[str, Any], course_filter: str | None) -> bool:
+    """
+    `COURSE_FILTER` is a comma-separated list; a course matches a term by exact id
+    or by case-insensitive substring of its course code or name.
+    """
+    if not course_filter or not course_filter.strip():
+        return True
+    course_id = str(course.get("id", ""))
+    labels = " ".join(
+        str(course.get(key) or "") for key in ("course_code", "name")
+    ).lower()
+    for term in (part.strip() for part in course_filter.split(",")):
+        if term and (term == course_id or term.lower() in labels):
+            return True
+    return False
+
+
+class CourseSnapshot:
+    """
+    Prefetches every selected course's modules (with items), pages, files, assignments
+    and announcements in parallel before the model loop starts, then serves the
+    `CanvasTools` read methods from memory, falling back to live Canvas on a miss.
+    Each course is also written to `directory` as `{course_id}.json` when one is given.
+    """
+
+    def __init__(
+        self,
+        canvas_tools: Any,
+        directory: str | None = None,
+        max_workers: int = 8,
+    ) -> None:
+        self.canvas_tools = canvas_tools
+        self.directory = Path(directory) if directory else None
+        self.max_workers = max_workers
+        self.courses: list[dict[str, Any]] | None = None
+        self._all_courses: list[dict[str, Any]] = []
+        self._course_data: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors: list[str] = []
+        self._incomplete: set[str] = set()
+        self.prefetch_seconds = 0.0
+
+    def prefetch(self, course_filter: str | None = None) -> dict[str, Any]:
+        started = time.perf_counter()
+        with self._lock:
+            self.errors = []
+            self._incomplete = set()
+        courses = [
+            course
+            for course in self.canvas_tools.list_my_courses()
+            if matches_course_filter(course, course_filter)
+        ]
+        course_data: dict[str, dict[str, Any]] = {
+            str(course.get("id")): {"course": course, "pages": {}} for course in courses
+        }
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            listings = {
+                (course_id, key): executor.submit(
+                    self._safe, course_id, fetch, key in OPTIONAL_LISTINGS
+                )
+                for course_id in course_data
+                for key, fetch in self._listing_fetchers(course_id).items()
+            }
+            for (course_id, key), future in listings.items():
+                course_data[course_id][key] = future.result()
+
+            page_futures = {
+                (course_id, page["url"]): executor.submit(
+                    self._safe,
+                    course_id,
+                    lambda cid=course_id, url=page["url"]: self.canvas_tools.get_page_content(
+                        course_id=cid, page_url=url
+                    ),
+                )
+                for course_id, data in course_data.items()
+                for page in data.get("pages_index") or []
+                if page.get("url")
+            }
+            for (course_id, page_url), future in page_futures.items():
+                page = future.result()
+                if page is not None:
+                    course_data[course_id]["pages"][page_url] = page
+
+        with self._lock:
+            self.courses = courses
+            self._all_courses = courses
+            self._course_data = course_data
+            self.prefetch_seconds = time.perf_counter() - started
+        if self.directory is not None:
+            self._write_to_disk(self.directory, course_data)
+        return self.metrics()
+
+    def course_ids(self) -> list[str]:
+        return [str(course.get("id")) for course in self._all_courses]
+
+    def course(self, course_id: str) -> dict[str, Any] | None:
+        return self._course_data.get(str(course_id))
+
+    def is_complete(self, course_id: str) -> bool:
+        """True when every listing for the course was fetched without errors."""
+        return str(course_id) in self._course_data and str(course_id) not in self._incomplete
+
+    def restrict(self, course_ids: list[str]) -> None:
+        """Limit `list_my_courses` to the given prefetched courses."""
+        wanted = {str(course_id) for course_id in course_ids}
+        with self._lock:
+            self.courses = [
+                course for course in self._all_courses if str(course.get("id")) in wanted
+            ]
+
+    def list_files(self, course_id: str) -> list[dict[str, Any]]:
+        return self._cached(
+            course_id, "files", lambda: self.canvas_tools.list_files(course_id=course_id)
+        )
+
+    def list_my_courses(self) -> list[dict[str, Any]]:
+        if self.courses is not None:
+            self._count(hit=True)
+            return list(self.courses)
+        self._count(hit=False)
+        return self.canvas_tools.list_my_courses()
+
+    def list_modules(self, course_id: str) -> list[dict[str, Any]]:
+        return self._cached(
+            course_id, "modules", lambda: self.canvas_tools.list_modules(course_id=course_id)
+        )
+
+    def get_module_items(self, course_id: str, module_id: str) -> list[dict[str, Any]]:
+        data = self.course(course_id) or {}
+        for module in data.get("modules") or []:
+            if str(module.get("id")) == str(module_id) and "items" in module:
+                self._count(hit=True)
+                return module["items"]
+        self._count(hit=False)
+        return self.canvas_tools.get_module_items(course_id=course_id, module_id=module_id)
+
+    def list_pages(self, course_id: str) -> list[dict[str, Any]]:
+        return self._cached(
+            course_id, "pages_index", lambda: self.canvas_tools.list_pages(course_id=course_id)
+        )
+
+    def get_page_content(self, course_id: str, page_url: str) -> dict[str, Any]:
+        data = self.course(course_id)
+        if data is not None and page_url in data["pages"]:
+            self._count(hit=True)
+            return data["pages"][page_url]
+        self._count(hit=False)
+        page = self.canvas_tools.get_page_content(course_id=course_id, page_url=page_url)
+        if data is not None:
+            with self._lock:
+                data["pages"][page_url] = page
+        return page
+
+    def get_file_content(self, file_id: str) -> dict[str, Any]:
+        return self.canvas_tools.get_file_content(file_id=file_id)
+
+    def list_announcements(self, context_codes: list[str]) -> list[dict[str, Any]]:
+        per_course = []
+        for code in context_codes:
+            data = self.course(code.removeprefix("course_")) if code.startswith("course_") else None
+            if data is None or data.get("announcements") is None:
+                self._count(hit=False)
+                return self.canvas_tools.list_announcements(context_codes=context_codes)
+            per_course.append(data["announcements"])
+        self._count(hit=True)
+        return [announcement for batch in per_course for announcement in batch]
+
+    def list_assignments(self, course_id: str) -> list[dict[str, Any]]:
+        return self._cached(
+            course_id,
+            "assignments",
+            lambda: self.canvas_tools.list_assignments(course_id=course_id),
+        )
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "courses": len(self.courses or []),
+                "pages": sum(len(data["pages"]) for data in self._course_data.values()),
+                "prefetch_seconds": round(self.prefetch_seconds, 3),
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": list(self.errors),
+            }
+
+    def cache_metrics(self) -> dict[str, int]:
+        return self.canvas_tools.cache_metrics()
+
+    def rate_limit_metrics(self) -> dict[str, float | int]:
+        return self.canvas_tools.rate_limit_metrics()
+
+    def close(self) -> None:
+        self.canvas_tools.close()
+
+    def _listing_fetchers(self, course_id: str) -> dict[str, Callable[[], Any]]:
+        tools = self.canvas_tools
+        return {
+            "modules": lambda: tools.list_modules(course_id=course_id),
+            "pages_index": lambda: tools.list_pages(course_id=course_id),
+            "assignments": lambda: tools.list_assignments(course_id=course_id),
+            "files": lambda: tools.list_files(course_id=course_id),
+            "announcements": lambda: tools.list_announcements(
+                context_codes=[f"course_{course_id}"]
+            ),
+        }
+
+    def _safe(self, course_id: str, fetch: Callable[[], Any], optional: bool = False) -> Any:
+        """
+        Fetch or record the error and mark the course incomplete. An optional listing
+        the token may not see (401/403/404) reads as empty instead.
+        """
+        try:
+            return fetch()
+        except Exception as exc:
+            if (
+                optional
+                and isinstance(exc, httpx.HTTPStatusError)
+                and exc.response.status_code in UNAVAILABLE_STATUSES
+            ):
+                return []
+            with self._lock:
+                self.errors.append(f"{course_id}: {exc}")
+                self._incomplete.add(course_id)
+            return None
+
+    def _cached(self, course_id: str, key: str, fetch: Callable[[], Any]) -> Any:
+        data = self.course(course_id)
+        if data is not None and data.get(key) is not None:
+            self._count(hit=True)
+            return data[key]
+        self._count(hit=False)
+        value = fetch()
+        if data is not None:
+            with self._lock:
+                data[key] = value
+        return value
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @staticmethod
+    def _write_to_disk(directory: Path, course_data: dict[str, dict[str, Any]]) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        for course_id, data in course_data.items():
+            (directory / f"{course_id}.json").write_text(json.dumps(data))
@@ -0,0 +1,114 @@
+"""Local text extraction for course files, keyed by MIME type."""
+
+import re
+import zipfile
+from collections.abc import Callable
+from typing import IO
+from xml.etree import ElementTree
+
+DEFAULT_CHAR_BUDGET = 50_000
+
+PDF_MIME = "application/pdf"
+PPTX_MIME = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+_DRAWING_NS = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+Extractor = Callable[[IO[bytes]], list[str]]
+"""Returns one markdown section per page or slide."""
+
+_EXTRACTORS: dict[str, tuple[str, Extractor]] = {}
+
+
+def register_extractor(mime_type: str, section_label: str, extractor: Extractor) -> None:
+    _EXTRACTORS[mime_type.lower()] = (section_label, extractor)
+
+
+def get_extractor(mime_type: str) -> tuple[str, Extractor] | None:
+    return _EXTRACTORS.get(mime_type.split(";")[0].strip().lower())
+
+
+def extract_text(
+    mime_type: str, file: IO[bytes], char_budget: int = DEFAULT_CHAR_BUDGET
+) -> str | None:
+    """
+    Extract markdown with `## Page N`/`## Slide N` boundaries, cut at `char_budget`.
+    Returns None when no extractor is registered, its dependency is missing,
+    or the file cannot be parsed.
+    """
+    registered = get_extractor(mime_type)
+    if registered is None:
+        return None
+    section_label, extractor = registered
+    try:
+        sections = extractor(file)
+    except Exception:
+        return None
+
+    parts: list[str] = []
+    used = 0
+    for number, section in enumerate(sections, start=1):
+        if not section.strip():
+            continue
+        block = (
+            f"## {section_label} {number}\n\n{section.strip()}"
+            if section_label
+            else section.strip()
+        )
+        if used + len(block) > char_budget:
+            parts.append(block[: max(char_budget - used, 0)] + "\n\n[truncated]")
+            break
+        parts.append(block)
+        used += len(block) + 2
+    return "\n\n".join(parts)
+
+
+def extract_pdf(file: IO[bytes]) -> list[str]:
+    from pypdf import PdfReader
+
+    reader = PdfReader(file)
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+def extract_pptx(file: IO[bytes]) -> list[str]:
+    with zipfile.ZipFile(file) as archive:
+        slide_names = [
+            name
+            for name in archive.namelist()
+            if re.fullmatch(r"ppt/slides/slide\d+\.xml", name)
+        ]
+        slide_names.sort(key=lambda name: int(re.findall(r"\d+", name)[-1]))
+        slides: list[str] = []
+        for name in slide_names:
+            root = ElementTree.fromstring(archive.read(name))
+            lines = [
+                "".join(run.text or "" for run in paragraph.iter(f"{_DRAWING_NS}t"))
+                for paragraph in root.iter(f"{_DRAWING_NS}p")
+            ]
+            slides.append("\n".join(line for line in lines if line.strip()))
+        return slides
+
+
+def extract_docx(file: IO[bytes]) -> list[str]:
+    with zipfile.ZipFile(file) as archive:
+        root = ElementTree.fromstring(archive.read("word/document.xml"))
+    lines: list[str] = []
+    for paragraph in root.iter(f"{_WORD_NS}p"):
+        text = "".join(run.text or "" for run in paragraph.iter(f"{_WORD_NS}t"))
+        if not text.strip():
+            continue
+        style = paragraph.find(f"{_WORD_NS}pPr/{_WORD_NS}pStyle")
+        style_name = style.get(f"{_WORD_NS}val", "") if style is not None else ""
+        heading = re.fullmatch(r"Heading(\d)", style_name)
+        if heading:
+            text = f"{'#' * min(int(heading.group(1)) + 1, 6)} {text}"
+        elif style_name.startswith("List"):
+            text = f"- {text}"
+        lines.append(text)
+    return ["\n".join(lines)]
+
+
+register_extractor(PDF_MIME, "Page", extract_pdf)
+register_extractor(PPTX_MIME, "Slide", extract_pptx)
+register_extractor(DOCX_MIME, "", extract_docx)
@@ -0,0 +1,112 @@
+import base64
+import codecs
+import tempfile
+from typing import IO, Any
+
+from study_guide_agent.tools.extractors import DEFAULT_CHAR_BUDGET, extract_text
+
+DEFAULT_MAX_FILE_BYTES = 25 * 1024 * 1024
+DEFAULT_MAX_INLINE_BYTES = 256 * 1024
+SNIFF_BYTES = 8192
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+
+def looks_like_text(prefix: bytes) -> bool:
+    """Sniff a file prefix: UTF-8 decodable (allowing a cut-off final character) and NUL-free."""
+    if b"\x00" in prefix:
+        return False
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        decoder.decode(prefix, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+class FileDownload:
+    """
+    Size-capped copy of a streamed download, spooled to a temp file past
+    `SPOOL_MEMORY_BYTES`. Bytes beyond `max_bytes` are dropped and flagged as truncated.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_FILE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.truncated = False
+        self.prefix = b""
+        self._spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+
+    def write(self, chunk: bytes) -> bool:
+        """Append a chunk; returns False once the size cap has been reached."""
+        remaining = self.max_bytes - self.size
+        if len(chunk) > remaining:
+            chunk = chunk[:remaining]
+            self.truncated = True
+        if len(self.prefix) < SNIFF_BYTES:
+            self.prefix += chunk[: SNIFF_BYTES - len(self.prefix)]
+        self._spool.write(chunk)
+        self.size += len(chunk)
+        return not self.truncated
+
+    @property
+    def is_text(self) -> bool:
+        return looks_like_text(self.prefix)
+
+    def read(self) -> bytes:
+        return self.file().read()
+
+    def file(self) -> IO[bytes]:
+        self._spool.seek(0)
+        return self._spool
+
+    def close(self) -> None:
+        self._spool.close()
+
+    def __enter__(self) -> "FileDownload":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def build_file_result(
+    metadata: dict[str, Any],
+    file_id: str,
+    download: FileDownload,
+    max_inline_bytes: int = DEFAULT_MAX_INLINE_BYTES,
+    char_budget: int = DEFAULT_CHAR_BUDGET,
+) -> dict[str, Any]:
+    mime_type = metadata.get("content-type", "application/octet-stream")
+    name = metadata.get("display_name") or metadata.get("filename") or str(file_id)
+
+    truncated = download.truncated
+    extracted = None
+    if not download.truncated:
+        extracted = extract_text(mime_type, download.file(), char_budget)
+
+    if extracted is not None:
+        encoding = "extracted"
+        content = extracted
+    elif download.is_text:
+        encoding = "text"
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        content = decoder.decode(download.file().read(max_inline_bytes), final=False)
+        if download.size > max_inline_bytes:
+            content += "\n[truncated]"
+            truncated = True
+    elif download.size <= max_inline_bytes and not download.truncated:
+        encoding = "base64"
+        content = base64.b64encode(download.read()).decode("ascii")
+    else:
+        encoding = "omitted"
+        content = ""
+
+    return {
+        "id": str(metadata.get("id", file_id)),
+        "name": name,
+        "mime_type": mime_type,
+        "encoding": encoding,
+        "content": content,
+        "size_bytes": download.size,
+        "truncated": truncated,
+    }
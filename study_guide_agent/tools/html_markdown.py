@@ -0,0 +1,183 @@
+import re
+from functools import lru_cache
+from html.parser import HTMLParser
+from typing import Any
+
+HTML_FIELDS = ("body", "message", "description")
+
+SKIPPED_TAGS = frozenset({"script", "style", "iframe", "noscript", "head", "svg", "object"})
+BLOCK_TAGS = frozenset(
+    {"p", "div", "section", "article", "header", "footer", "blockquote", "figure", "hr"}
+)
+INLINE_MARKS = {"strong": "**", "b": "**", "em": "*", "i": "*"}
+VOID_TAGS = frozenset({"br", "img", "hr", "input", "meta", "link", "source", "wbr"})
+MARKUP_HINT = re.compile(r"<[a-zA-Z/!]|&[#a-zA-Z0-9]+;")
+
+
+class _MarkdownBuilder(HTMLParser):
+    """Streaming HTML → markdown conversion over `html.parser` events."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.out: list[str] = []
+        self._skip_depth = 0
+        self._lists: list[list[int | str]] = []
+        self._links: list[str | None] = []
+        self._pre = 0
+        self._table: list[list[str]] | None = None
+        self._row: list[str] | None = None
+        self._cell: list[str] | None = None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self._skip_depth or tag in SKIPPED_TAGS:
+            if tag not in VOID_TAGS:
+                self._skip_depth += 1
+            return
+        attributes = dict(attrs)
+        if re.fullmatch(r"h[1-6]", tag):
+            self._block()
+            self._emit("#" * int(tag[1]) + " ")
+        elif tag in BLOCK_TAGS:
+            self._block()
+        elif tag == "br":
+            self._emit("\n")
+        elif tag in ("ul", "ol"):
+            if not self._lists:
+                self._block()
+            self._lists.append([tag, 0])
+        elif tag == "li":
+            self._emit("\n")
+            depth = max(len(self._lists) - 1, 0)
+            marker = "- "
+            if self._lists and self._lists[-1][0] == "ol":
+                self._lists[-1][1] = int(self._lists[-1][1]) + 1
+                marker = f"{self._lists[-1][1]}. "
+            self._emit("  " * depth + marker)
+        elif tag in INLINE_MARKS:
+            self._emit(INLINE_MARKS[tag])
+        elif tag == "a":
+            href = attributes.get("href")
+            self._links.append(href if href and not href.startswith("javascript:") else None)
+            if self._links[-1]:
+                self._emit("[")
+        elif tag == "pre":
+            self._block()
+            self._emit("```\n")
+            self._pre += 1
+        elif tag == "code" and not self._pre:
+            self._emit("`")
+        elif tag == "img":
+            equation = attributes.get("data-equation-content")
+            if equation:
+                self._emit(f"${equation.strip()}$")
+            elif attributes.get("alt"):
+                self._emit(f"[image: {attributes['alt']}]")
+        elif tag == "table":
+            self._block()
+            self._table = []
+        elif tag == "tr" and self._table is not None:
+            self._row = []
+        elif tag in ("td", "th") and self._row is not None:
+            self._cell = []
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._skip_depth:
+            if tag in SKIPPED_TAGS or tag not in VOID_TAGS:
+                self._skip_depth -= 1
+            return
+        if re.fullmatch(r"h[1-6]", tag) or tag in BLOCK_TAGS:
+            self._block()
+        elif tag in ("ul", "ol"):
+            if self._lists:
+                self._lists.pop()
+            if not self._lists:
+                self._block()
+        elif tag in INLINE_MARKS:
+            self._emit(INLINE_MARKS[tag])
+        elif tag == "a":
+            href = self._links.pop() if self._links else None
+            if href:
+                self._emit(f"]({href})")
+        elif tag == "pre":
+            self._pre = max(self._pre - 1, 0)
+            self._emit("\n```")
+            self._block()
+        elif tag == "code" and not self._pre:
+            self._emit("`")
+        elif tag in ("td", "th") and self._cell is not None and self._row is not None:
+            self._row.append(" ".join("".join(self._cell).split()).replace("|", "\\|"))
+            self._cell = None
+        elif tag == "tr" and self._row is not None and self._table is not None:
+            self._table.append(self._row)
+            self._row = None
+        elif tag == "table" and self._table is not None:
+            rows, self._table = self._table, None
+            self._emit_table(rows)
+
+    def handle_data(self, data: str) -> None:
+        if self._skip_depth:
+            return
+        if self._pre:
+            self._emit(data)
+            return
+        text = re.sub(r"\s+", " ", data)
+        previous = self._cell if self._cell is not None else self.out
+        if not previous or previous[-1].endswith("\n"):
+            text = text.lstrip()
+        if text:
+            self._emit(text)
+
+    def _emit(self, text: str) -> None:
+        if self._cell is not None:
+            self._cell.append(text)
+        else:
+            self.out.append(text)
+
+    def _block(self) -> None:
+        if self._cell is None:
+            self.out.append("\n\n")
+
+    def _emit_table(self, rows: list[list[str]]) -> None:
+        rows = [row for row in rows if row]
+        if not rows:
+            return
+        width = max(len(row) for row in rows)
+        lines = []
+        for index, row in enumerate(rows):
+            cells = row + [""] * (width - len(row))
+            lines.append("| " + " | ".join(cells) + " |")
+            if index == 0:
+                lines.append("|" + " --- |" * width)
+        self.out.append("\n\n" + "\n".join(lines) + "\n\n")
+
+
+@lru_cache(maxsize=2048)
+def html_to_markdown(html: str) -> str:
+    """
+    Convert Canvas rich-content HTML to compact markdown, keeping headings, lists,
+    tables, links, emphasis, code and equations (`data-equation-content` images and
+    inline LaTeX text). Identical bodies are served from an LRU memo.
+    """
+    if not MARKUP_HINT.search(html):
+        return html.strip()
+    builder = _MarkdownBuilder()
+    builder.feed(html)
+    builder.close()
+    text = "".join(builder.out)
+    text = re.sub(r"[ \t]+\n", "\n", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def normalize_html_fields(value: Any, fields: tuple[str, ...] = HTML_FIELDS) -> Any:
+    """Return a copy of `value` with every string under one of `fields` converted."""
+    if isinstance(value, list):
+        return [normalize_html_fields(item, fields) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {
+        key: html_to_markdown(child)
+        if key in fields and isinstance(child, str)
+        else normalize_html_fields(child, fields)
+        for key, child in value.items()
+    }
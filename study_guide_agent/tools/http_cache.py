@@ -0,0 +1,231 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Protocol
+
+import httpx
+
+INDEX_NAME = "index.json"
+STORED_HEADERS = ("content-type", "link", "etag", "last-modified")
+
+
+class CacheBackend(Protocol):
+    """Byte store holding cache entries and the LRU index."""
+
+    def read(self, name: str) -> bytes | None:
+        ...
+
+    def write(self, name: str, data: bytes) -> None:
+        ...
+
+    def delete(self, name: str) -> None:
+        ...
+
+
+class LocalCacheBackend:
+    """Cache backend rooted at a local directory."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def read(self, name: str) -> bytes | None:
+        path = self.directory / name
+        return path.read_bytes() if path.exists() else None
+
+    def write(self, name: str, data: bytes) -> None:
+        (self.directory / name).write_bytes(data)
+
+    def delete(self, name: str) -> None:
+        (self.directory / name).unlink(missing_ok=True)
+
+
+class StorageCacheBackend:
+    """Cache backend stored as artifacts in the configured `StudyGuideStorage`."""
+
+    def __init__(self, storage: Any, prefix: str = "http-cache") -> None:
+        self.storage = storage
+        self.prefix = prefix.strip("/")
+
+    def read(self, name: str) -> bytes | None:
+        return self.storage.read_artifact(f"{self.prefix}/{name}")
+
+    def write(self, name: str, data: bytes) -> None:
+        self.storage.write_artifact(f"{self.prefix}/{name}", data)
+
+    def delete(self, name: str) -> None:
+        self.storage.delete_artifact(f"{self.prefix}/{name}")
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    headers: dict[str, str]
+    body: bytes
+
+    def validators(self) -> dict[str, str]:
+        validators: dict[str, str] = {}
+        if "etag" in self.headers:
+            validators["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            validators["If-Modified-Since"] = self.headers["last-modified"]
+        return validators
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(self.headers).encode("utf-8") + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CachedResponse":
+        header_line, _, body = data.partition(b"\n")
+        return cls(headers=json.loads(header_line), body=body)
+
+
+class HttpCache:
+    """
+    Conditional-request cache for Canvas GET responses.
+    Bodies are stored with their ETag/Last-Modified validators and evicted in LRU
+    order once the stored bytes exceed `max_bytes`. The LRU index is written back
+    on `flush()`. Backend failures never fail a request: they are counted in
+    `backend_errors`, a failed read is a miss and a failed write is skipped.
+    """
+
+    def __init__(self, backend: CacheBackend, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.backend = backend
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: OrderedDict[str, int] | None = None
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.backend_errors = 0
+        self._index_readable = True
+
+    @staticmethod
+    def key(method: str, url: str, params: dict[str, Any] | None, token: str) -> str:
+        request_url = str(httpx.URL(url, params=params))
+        token_digest = hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+        material = f"{method.upper()} {request_url} {token_digest}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                return None
+            index.move_to_end(key)
+            self._dirty = True
+        data = self._read(key)
+        if data is None:
+            with self._lock:
+                self._forget(key)
+            return None
+        return CachedResponse.from_bytes(data)
+
+    def resolve(
+        self, key: str, entry: CachedResponse | None, response: httpx.Response
+    ) -> httpx.Response:
+        """Turn a 304 into the cached body and store fresh validated responses."""
+        if entry is not None and response.status_code == 304:
+            with self._lock:
+                self.hits += 1
+                self.bytes_saved += len(entry.body)
+            return httpx.Response(
+                200, headers=entry.headers, content=entry.body, request=response.request
+            )
+        if response.status_code == 200:
+            with self._lock:
+                self.misses += 1
+            self.store(key, response.headers, response.content)
+        return response
+
+    def store(self, key: str, headers: httpx.Headers, body: bytes) -> None:
+        kept = {name: headers[name] for name in STORED_HEADERS if name in headers}
+        if "etag" not in kept and "last-modified" not in kept:
+            return
+        data = CachedResponse(headers=kept, body=body).to_bytes()
+        if len(data) > self.max_bytes:
+            return
+        if not self._write(key, data):
+            return
+        with self._lock:
+            index = self._load_index()
+            index[key] = len(data)
+            index.move_to_end(key)
+            self._dirty = True
+            evicted = self._evict(index)
+        for evicted_key in evicted:
+            self._delete(evicted_key)
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._dirty or self._index is None or not self._index_readable:
+                return
+            payload = json.dumps(list(self._index.items())).encode("utf-8")
+            self._dirty = False
+        self._write(INDEX_NAME, payload)
+
+    def metrics(self) -> dict[str, int]:
+        with self._lock:
+            index = self._load_index()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes_saved": self.bytes_saved,
+                "entries": len(index),
+                "stored_bytes": sum(index.values()),
+                "backend_errors": self.backend_errors,
+            }
+
+    def _load_index(self) -> OrderedDict[str, int]:
+        if self._index is None:
+            try:
+                raw = self.backend.read(INDEX_NAME)
+                entries = json.loads(raw) if raw else []
+            except Exception:
+                # Never overwrite an index that exists but could not be read.
+                self.backend_errors += 1
+                self._index_readable = False
+                entries = []
+            self._index = OrderedDict((str(k), int(size)) for k, size in entries)
+        return self._index
+
+    def _read(self, name: str) -> bytes | None:
+        try:
+            return self.backend.read(name)
+        except Exception:
+            self._record_backend_error()
+            return None
+
+    def _write(self, name: str, data: bytes) -> bool:
+        try:
+            self.backend.write(name, data)
+        except Exception:
+            self._record_backend_error()
+            return False
+        return True
+
+    def _delete(self, name: str) -> None:
+        try:
+            self.backend.delete(name)
+        except Exception:
+            self._record_backend_error()
+
+    def _record_backend_error(self) -> None:
+        with self._lock:
+            self.backend_errors += 1
+
+    def _forget(self, key: str) -> None:
+        if self._load_index().pop(key, None) is not None:
+            self._dirty = True
+
+    def _evict(self, index: OrderedDict[str, int]) -> list[str]:
+        evicted: list[str] = []
+        total = sum(index.values())
+        while total > self.max_bytes and index:
+            evicted_key, size = index.popitem(last=False)
+            total -= size
+            evicted.append(evicted_key)
+        return evicted
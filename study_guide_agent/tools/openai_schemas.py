@@ -11,6 +11,26 @@ def get_openai_tool_definitions() -> list[dict]:
                 "parameters": {"type": "object", "properties": {}, "required": []},
             },
         },
+        {
+            "type": "function",
+            "function": {
+                "name": "get_course_bundle",
+                "description": (
+                    "Fetch a whole course in one call: modules with items, page bodies "
+                    "(up to page_char_budget characters in total), assignments and recent "
+                    "announcements. Prefer this over list_modules, get_module_items and "
+                    "get_page_content; use those only for pages marked truncated."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "course_id": {"type": "string"},
+                        "page_char_budget": {"type": "integer"},
+                    },
+                    "required": ["course_id"],
+                },
+            },
+        },
         {
             "type": "function",
             "function": {
@@ -0,0 +1,128 @@
+import json
+import threading
+from typing import Any
+
+MODULE_ITEM_FIELDS = ["id", "title", "type", "page_url", "content_id", "position", "indent"]
+
+DEFAULT_FIELD_ALLOWLISTS: dict[str, list[str] | None] = {
+    "list_my_courses": ["id", "name", "course_code", "start_at", "end_at"],
+    "list_modules": ["id", "name", "position", *(f"items.{f}" for f in MODULE_ITEM_FIELDS)],
+    "get_module_items": MODULE_ITEM_FIELDS,
+    "list_pages": ["url", "title", "updated_at"],
+    "get_page_content": ["url", "title", "body", "updated_at"],
+    "list_announcements": ["id", "title", "posted_at", "message", "context_code"],
+    "list_assignments": [
+        "id",
+        "name",
+        "description",
+        "due_at",
+        "points_possible",
+        "submission_types",
+    ],
+    "get_course_bundle": [
+        "course_id",
+        "modules.id",
+        "modules.name",
+        "modules.position",
+        *(f"modules.items.{f}" for f in MODULE_ITEM_FIELDS),
+        "pages",
+        "assignments",
+        "announcements",
+    ],
+    "get_file_content": None,
+}
+
+
+def field_tree(fields: list[str]) -> dict[str, Any]:
+    """Turn dotted paths into a nested dict; a leaf `True` keeps the whole value."""
+    tree: dict[str, Any] = {}
+    for path in fields:
+        node = tree
+        parts = path.split(".")
+        for part in parts[:-1]:
+            child = node.get(part)
+            if child is True:
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = True
+    return tree
+
+
+def project(value: Any, tree: dict[str, Any]) -> Any:
+    """Keep only allowlisted keys; lists are projected element by element."""
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    projected = {}
+    for key, subtree in tree.items():
+        if key in value:
+            projected[key] = value[key] if subtree is True else project(value[key], subtree)
+    return projected
+
+
+def columnar(value: Any) -> Any:
+    """Encode lists of dicts sharing one key set as `{"columns": [...], "rows": [...]}`."""
+    if isinstance(value, dict):
+        return {key: columnar(child) for key, child in value.items()}
+    if not isinstance(value, list):
+        return value
+    items = [columnar(item) for item in value]
+    if len(items) < 2 or not all(isinstance(item, dict) for item in items):
+        return items
+    columns = list(items[0])
+    if any(list(item) != columns for item in items[1:]):
+        return items
+    return {"columns": columns, "rows": [[item[column] for column in columns] for item in items]}
+
+
+def compact_dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class ToolResultProjector:
+    """
+    Serializes tool results for the model: allowlisted fields only, no whitespace and,
+    optionally, columnar lists. Tools missing from `allowlists` (or mapped to `None`)
+    keep every field. Bytes saved against plain `json.dumps` are tracked per tool.
+    """
+
+    def __init__(
+        self,
+        allowlists: dict[str, list[str] | None] | None = None,
+        use_columnar: bool = False,
+    ) -> None:
+        source = DEFAULT_FIELD_ALLOWLISTS if allowlists is None else allowlists
+        self.trees = {
+            name: field_tree(fields) for name, fields in source.items() if fields is not None
+        }
+        self.use_columnar = use_columnar
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def serialize(self, tool_name: str, result: Any) -> str:
+        if isinstance(result, str):
+            return result
+        tree = self.trees.get(tool_name)
+        value = project(result, tree) if tree is not None else result
+        if self.use_columnar:
+            value = columnar(value)
+        serialized = compact_dumps(value)
+        raw_bytes = len(json.dumps(result, default=str).encode("utf-8"))
+        projected_bytes = len(serialized.encode("utf-8"))
+        with self._lock:
+            stats = self._stats.setdefault(
+                tool_name, {"calls": 0, "raw_bytes": 0, "projected_bytes": 0}
+            )
+            stats["calls"] += 1
+            stats["raw_bytes"] += raw_bytes
+            stats["projected_bytes"] += projected_bytes
+        return serialized
+
+    def metrics(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {
+                name: {**stats, "bytes_saved": stats["raw_bytes"] - stats["projected_bytes"]}
+                for name, stats in self._stats.items()
+            }
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+CANVAS_BUCKET_CAPACITY = 700.0
+CANVAS_REFILL_PER_SECOND = 10.0
+
+
+def parse_retry_after(value: str | None, now: datetime | None = None) -> float | None:
+    """Parse a `Retry-After` header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    current = now or datetime.now(tz=UTC)
+    return max((retry_at - current).total_seconds(), 0.0)
+
+
+def is_rate_limited(response: httpx.Response) -> bool:
+    """Canvas throttles with 429, and with 403 once the bucket is empty."""
+    if response.status_code == 429:
+        return True
+    remaining = response.headers.get("X-Rate-Limit-Remaining")
+    if response.status_code != 403 or remaining is None:
+        return False
+    try:
+        return float(remaining) <= 0
+    except ValueError:
+        return False
+
+
+class CanvasRateLimiter:
+    """
+    Token bucket mirroring Canvas's per-user throttle, shared by every thread and
+    async task issuing Canvas requests.
+
+    The bucket estimate is reset from `X-Rate-Limit-Remaining`, request cost is
+    tracked from `X-Request-Cost`, and callers are paced once the estimate would
+    drop below `low_watermark`. A `Retry-After` blocks all callers until it expires.
+    """
+
+    def __init__(
+        self,
+        capacity: float = CANVAS_BUCKET_CAPACITY,
+        refill_per_second: float = CANVAS_REFILL_PER_SECOND,
+        low_watermark: float = 150.0,
+        initial_cost: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if refill_per_second <= 0:
+            raise ValueError("refill_per_second must be positive")
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.low_watermark = low_watermark
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._remaining = capacity
+        self._updated_at = clock()
+        self._avg_cost = initial_cost
+        self._blocked_until = 0.0
+        self.requests = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.throttled = 0
+
+    def reserve(self) -> float:
+        """Reserve budget for one request and return how long to wait before sending it."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            cost = self._avg_cost
+            wait = max(self._blocked_until - now, 0.0)
+            deficit = self.low_watermark + cost - self._remaining
+            if deficit > 0:
+                wait = max(wait, deficit / self.refill_per_second)
+            self._remaining -= cost
+            self.requests += 1
+            if wait > 0:
+                self.waits += 1
+                self.wait_seconds += wait
+            return wait
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def observe(self, response: httpx.Response) -> None:
+        headers = response.headers
+        with self._lock:
+            now = self._clock()
+            remaining = _header_float(headers, "X-Rate-Limit-Remaining")
+            if remaining is not None:
+                self._remaining = remaining
+                self._updated_at = now
+            cost = _header_float(headers, "X-Request-Cost")
+            if cost is not None:
+                self._avg_cost = 0.8 * self._avg_cost + 0.2 * cost
+            if is_rate_limited(response):
+                self.throttled += 1
+                retry_after = parse_retry_after(headers.get("Retry-After"))
+                if retry_after is not None:
+                    self._blocked_until = max(self._blocked_until, now + retry_after)
+                elif remaining is None:
+                    self._remaining = 0.0
+                    self._updated_at = now
+
+    def metrics(self) -> dict[str, float | int]:
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            deficit = self.low_watermark + self._avg_cost - self._remaining
+            next_wait = max(
+                self._blocked_until - now,
+                deficit / self.refill_per_second if deficit > 0 else 0.0,
+                0.0,
+            )
+            return {
+                "remaining": round(self._remaining, 2),
+                "avg_request_cost": round(self._avg_cost, 3),
+                "next_wait_seconds": round(next_wait, 3),
+                "requests": self.requests,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 3),
+                "throttled": self.throttled,
+            }
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(now - self._updated_at, 0.0)
+        self._remaining = min(
+            self.capacity, self._remaining + elapsed * self.refill_per_second
+        )
+        self._updated_at = now
+
+
+def _header_float(headers: httpx.Headers, name: str) -> float | None:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
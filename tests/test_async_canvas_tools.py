@@ -0,0 +1,120 @@
+import asyncio
+import threading
+
+import httpx
+
+from study_guide_agent.orchestrators import build_study_guide_tools
+from study_guide_agent.tools.async_canvas_tools import (
+    AsyncCanvasTools,
+    BlockingCanvasTools,
+    expand_page_urls,
+)
+from study_guide_agent.tools.http_cache import HttpCache
+
+
+def _paged_handler(pages: dict[int, list[dict]], seen: list[str]):
+    last = max(pages)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(str(request.url))
+        page = int(request.url.params.get("page", "1"))
+        headers = {}
+        if page < last:
+            base = "https://quercus.example/api/v1/courses/42/assignments"
+            headers["Link"] = (
+                f'<{base}?page={page + 1}&per_page=10>; rel="next", '
+                f'<{base}?page={last}&per_page=10>; rel="last"'
+            )
+        return httpx.Response(200, json=pages[page], headers=headers)
+
+    return handler
+
+
+def test_expand_page_urls_builds_remaining_pages():
+    urls = expand_page_urls("https://quercus.example/api/v1/x?page=3&per_page=10")
+    assert urls == [
+        "https://quercus.example/api/v1/x?page=2&per_page=10",
+        "https://quercus.example/api/v1/x?page=3&per_page=10",
+    ]
+    assert expand_page_urls("https://quercus.example/api/v1/x?page=bookmark:abc") is None
+
+
+def test_async_paginated_fetches_remaining_pages_concurrently_in_order():
+    pages = {n: [{"id": f"a{n}"}] for n in range(1, 6)}
+    seen: list[str] = []
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_paged_handler(pages, seen)))
+    tools = AsyncCanvasTools(
+        base_url="https://quercus.example", token="t", client=client, max_concurrency=3
+    )
+
+    result = asyncio.run(tools.list_assignments(course_id="42"))
+
+    assert [a["id"] for a in result] == ["a1", "a2", "a3", "a4", "a5"]
+    assert len(seen) == 5
+
+
+def test_async_paginated_falls_back_to_next_links_without_last():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "page=2" in str(request.url):
+            return httpx.Response(200, json=[{"id": 3}])
+        link = '<https://quercus.example/api/v1/courses?page=2>; rel="next"'
+        return httpx.Response(200, json=[{"id": 1}, {"id": 2}], headers={"Link": link})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    tools = AsyncCanvasTools(base_url="https://quercus.example", token="t", client=client)
+
+    courses = asyncio.run(tools.list_my_courses())
+
+    assert [c["id"] for c in courses] == [1, 2, 3]
+
+
+def test_async_request_runs_cache_io_off_the_event_loop():
+    class RecordingBackend:
+        def __init__(self):
+            self.objects = {}
+            self.threads = set()
+
+        def read(self, name):
+            self.threads.add(threading.get_ident())
+            return self.objects.get(name)
+
+        def write(self, name, data):
+            self.threads.add(threading.get_ident())
+            self.objects[name] = data
+
+        def delete(self, name):
+            self.objects.pop(name, None)
+
+    backend = RecordingBackend()
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=[{"id": "a1"}], headers={"ETag": '"v1"'})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    tools = AsyncCanvasTools(
+        base_url="https://quercus.example", token="t", client=client, cache=HttpCache(backend)
+    )
+
+    async def run():
+        loop_thread = threading.get_ident()
+        result = await tools.list_assignments(course_id="42")
+        await tools.aclose()
+        return loop_thread, result
+
+    loop_thread, result = asyncio.run(run())
+
+    assert result == [{"id": "a1"}]
+    assert backend.objects
+    assert loop_thread not in backend.threads
+
+
+def test_blocking_facade_backs_study_guide_tools():
+    pages = {1: [{"id": "a1"}], 2: [{"id": "a2"}]}
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_paged_handler(pages, [])))
+    facade = BlockingCanvasTools(
+        AsyncCanvasTools(base_url="https://quercus.example", token="t", client=client)
+    )
+    try:
+        tools = build_study_guide_tools(canvas_tools=facade, storage=object())
+        assert tools["list_assignments"]("42") == [{"id": "a1"}, {"id": "a2"}]
+    finally:
+        facade.close()
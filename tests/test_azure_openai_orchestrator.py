@@ -1,8 +1,13 @@
 import json
+import threading
 from types import SimpleNamespace
 
-from study_guide_agent.models import StudyGuideConfig
+from study_guide_agent.models import GuideWriteResult, StudyGuideConfig
+from study_guide_agent.orchestrators import build_study_guide_tools
 from study_guide_agent.orchestrators.azure_openai import AzureOpenAIOrchestrator
+from study_guide_agent.orchestrators.completion_cache import CompletionCache
+from study_guide_agent.tools.http_cache import LocalCacheBackend
+from study_guide_agent.tools.projection import ToolResultProjector
 
 
 class FakeCompletions:
@@ -84,3 +89,587 @@ def test_orchestrator_invokes_tools_and_infers_course_results():
     assert outcome.course_results[0].course_id == "1"
     assert outcome.course_results[0].guide_path == "/tmp/1/study-guide.md"
     assert outcome.metrics["provider"] == "azure_openai"
+
+
+def test_orchestrator_reports_byte_identical_guides_as_unchanged():
+    statuses = iter(["unchanged", "written", "unchanged"])
+
+    def write_study_guide(course_id, content, slug="", meta=None):
+        return {"path": f"/tmp/{course_id}/study-guide.md", "status": next(statuses)}
+
+    def write(call_id, course_id):
+        return _tool_call(call_id, "write_study_guide", {"course_id": course_id, "content": "#"})
+
+    client = FakeClient(
+        [
+            _response_with_tool_calls(write("tc1", "1")),
+            _response_with_tool_calls(write("tc2", "2")),
+            _response_with_tool_calls(write("tc3", "2")),
+            _response_final("Done."),
+        ]
+    )
+    orchestrator = AzureOpenAIOrchestrator(
+        openai_client=client,
+        model="kimi-k2.5",
+        tools={"write_study_guide": write_study_guide},
+    )
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+
+    outcome = orchestrator.invoke("Sync", config)
+
+    assert [(result.course_id, result.status) for result in outcome.course_results] == [
+        ("1", "unchanged"),
+        ("2", "updated"),
+    ]
+
+
+def test_orchestrator_memoizes_repeated_tool_calls_as_back_references():
+    calls = []
+
+    def list_modules(course_id):
+        calls.append(course_id)
+        return [{"id": "m1"}]
+
+    client = FakeClient(
+        [
+            _response_with_tool_calls(_tool_call("tc1", "list_modules", {"course_id": "42"})),
+            _response_with_tool_calls(_tool_call("tc2", "list_modules", {"course_id": 42})),
+            _response_final("Done."),
+        ]
+    )
+    orchestrator = AzureOpenAIOrchestrator(
+        openai_client=client, model="m", tools={"list_modules": list_modules}
+    )
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+
+    outcome = orchestrator.invoke("Sync", config)
+
+    assert calls == ["42"]
+    last_messages = client.chat.completions.calls[-1]["messages"]
+    tool_messages = [m for m in last_messages if m["role"] == "tool"]
+    assert json.loads(tool_messages[0]["content"]) == [{"id": "m1"}]
+    assert json.loads(tool_messages[1]["content"]) == {"same_result_as_tool_call_id": "tc1"}
+    assert outcome.metrics["tool_memo"] == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_orchestrator_runs_step_tool_calls_concurrently_in_order():
+    all_running = threading.Barrier(3, timeout=2)
+
+    def get_page_content(course_id, page_url):
+        all_running.wait()
+        if page_url == "broken":
+            raise RuntimeError("page gone")
+        return {"url": page_url}
+
+    client = FakeClient(
+        [
+            _response_with_tool_calls(
+                *[
+                    _tool_call(f"tc{i}", "get_page_content", {"course_id": "1", "page_url": url})
+                    for i, url in enumerate(["a", "broken", "c"])
+                ]
+            ),
+            _response_final("Done."),
+        ]
+    )
+    orchestrator = AzureOpenAIOrchestrator(
+        openai_client=client,
+        model="m",
+        tools={"get_page_content": get_page_content},
+        max_tool_workers=3,
+    )
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+
+    outcome = orchestrator.invoke("Sync", config)
+
+    tool_messages = [m for m in client.chat.completions.calls[-1]["messages"] if m["role"] == "tool"]
+    assert [m["tool_call_id"] for m in tool_messages] == ["tc0", "tc1", "tc2"]
+    assert json.loads(tool_messages[0]["content"]) == {"url": "a"}
+    assert "page gone" in json.loads(tool_messages[1]["content"])["error"]
+    assert json.loads(tool_messages[2]["content"]) == {"url": "c"}
+    assert outcome.metrics["tool_errors"] == 1
+
+
+def test_orchestrator_times_out_slow_tool_calls():
+    release = threading.Event()
+
+    def list_modules(course_id):
+        release.wait(2)
+        return []
+
+    client = FakeClient(
+        [
+            _response_with_tool_calls(_tool_call("tc1", "list_modules", {"course_id": "1"})),
+            _response_final("Done."),
+        ]
+    )
+    orchestrator = AzureOpenAIOrchestrator(
+        openai_client=client,
+        model="m",
+        tools={"list_modules": list_modules},
+        tool_timeout_seconds=0.05,
+    )
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+
+    try:
+        outcome = orchestrator.invoke("Sync", config)
+    finally:
+        release.set()
+
+    tool_message = client.chat.completions.calls[-1]["messages"][-1]
+    assert "timed out" in json.loads(tool_message["content"])["error"]
+    assert outcome.metrics["tool_errors"] == 1
+
+
+def test_orchestrator_waits_for_slow_writes_and_fails_courses_whose_write_failed():
+    release = threading.Event()
+
+    def write_study_guide(course_id, content, slug="", meta=None):
+        if course_id == "2":
+            raise OSError("storage unavailable")
+        release.wait(2)
+        return {"path": f"/guides/{course_id}/study-guide.md"}
+
+    client = FakeClient(
+        [
+            _response_with_tool_calls(
+                _tool_call("tc1", "write_study_guide", {"course_id": "1", "content": "# A"}),
+                _tool_call("tc2", "write_study_guide", {"course_id": "2", "content": "# B"}),
+            ),
+            _response_final("Done."),
+        ]
+    )
+    orchestrator = AzureOpenAIOrchestrator(
+        openai_client=client,
+        model="m",
+        tools={"write_study_guide": write_study_guide},
+        tool_timeout_seconds=0.05,
+    )
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+
+    timer = threading.Timer(0.2, release.set)
+    timer.start()
+    try:
+        outcome = orchestrator.invoke("Sync", config)
+    finally:
+        timer.cancel()
+        release.set()
+
+    results = {r.course_id: r for r in outcome.course_results}
+    assert results["1"].guide_path == "/guides/1/study-guide.md"
+    assert results["2"].status == "failed"
+    assert "storage unavailable" in results["2"].error
+    assert outcome.success is False
+
+
+class RoutingCompletions:
+    """Answers each conversation based on the course named in its first message."""
+
+    def __init__(self):
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        messages = kwargs["messages"]
+        prompt = messages[0]["content"]
+        course_id = "2" if "course_id 2" in prompt else "1"
+        if course_id == "2":
+            raise RuntimeError("model unavailable")
+        if messages[-1]["role"] == "tool":
+            return _response_final("Done.")
+        return _response_with_tool_calls(
+            _tool_call(
+                f"w{course_id}",
+                "write_study_guide",
+                {"course_id": course_id, "content": "# Guide"},
+            )
+        )
+
+
+def test_per_course_mode_isolates_conversations_and_failures():
+    client = SimpleNamespace(chat=SimpleNamespace(completions=RoutingCompletions()))
+    orchestrator = AzureOpenAIOrchestrator(
+        openai_client=client,
+        model="m",
+        tools={
+            "list_my_courses": lambda: [
+                {"id": "1", "name": "A"},
+                {"id": "2", "name": "B"},
+                {"id": "3", "name": "Filtered out"},
+            ],
+            "write_study_guide": lambda course_id, content, slug="", meta=None: {
+                "path": f"/tmp/{course_id}/study-guide.md"
+            },
+        },
+        orchestration_mode="per_course",
+        max_course_workers=2,
+    )
+    config = StudyGuideConfig(
+        agent_provider="azure_openai",
+        storage_provider="azure",
+        task_prompt="sync",
+        course_filter="1,2",
+    )
+
+    outcome = orchestrator.invoke("Sync", config)
+
+    by_course = {r.course_id: r for r in outcome.course_results}
+    assert set(by_course) == {"1", "2"}
+    assert by_course["1"].status == "updated"
+    assert by_course["1"].guide_path == "/tmp/1/study-guide.md"
+    assert by_course["2"].status == "failed"
+    assert "model unavailable" in by_course["2"].error
+    assert outcome.success is False
+    assert outcome.metrics["courses"]["1"]["steps"] == 2
+    assert "seconds" in outcome.metrics["courses"]["2"]
+
+
+class CrossWritingCompletions:
+    """Course 1's conversation also writes a guide for course 2."""
+
+    def create(self, **kwargs):
+        messages = kwargs["messages"]
+        if messages[-1]["role"] == "tool":
+            return _response_final("Done.")
+        if "course_id 2" in messages[0]["content"]:
+            return _response_with_tool_calls(
+                _tool_call("w2", "write_study_guide", {"course_id": "2", "content": "# Own"})
+            )
+        return _response_with_tool_calls(
+            _tool_call("w1", "write_study_guide", {"course_id": "1", "content": "# Guide"}),
+            _tool_call("x2", "write_study_guide", {"course_id": "2", "content": "# Stray"}),
+        )
+
+
+def test_per_course_mode_reports_each_course_once():
+    def write_study_guide(course_id, content, slug="", meta=None):
+        return {"path": f"/tmp/{course_id}/{content.strip('# ').lower()}.md"}
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=CrossWritingCompletions()))
+    orchestrator = AzureOpenAIOrchestrator(
+        openai_client=client,
+        model="m",
+        tools={
+            "list_my_courses": lambda: [{"id": "1", "name": "A"}, {"id": "2", "name": "B"}],
+            "write_study_guide": write_study_guide,
+        },
+        orchestration_mode="per_course",
+        max_course_workers=2,
+    )
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+
+    outcome = orchestrator.invoke("Sync", config)
+
+    assert [r.course_id for r in outcome.course_results] == ["1", "2"]
+    assert outcome.course_results[1].guide_path == "/tmp/2/own.md"
+
+
+def test_orchestrator_evicts_old_tool_results_over_context_budget():
+    calls = []
+
+    def get_page_content(course_id, page_url):
+        calls.append(page_url)
+        return {"body": page_url * 2000}
+
+    client = FakeClient(
+        [
+            *[
+                _response_with_tool_calls(
+                    _tool_call(f"tc{i}", "get_page_content", {"course_id": "1", "page_url": url})
+                )
+                for i, url in enumerate(["a", "b", "c", "d", "e", "a"])
+            ],
+            _response_final("Done."),
+        ]
+    )
+    orchestrator = AzureOpenAIOrchestrator(
+        openai_client=client,
+        model="m",
+        tools={"get_page_content": get_page_content},
+        context_budget_tokens=2000,
+    )
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+
+    outcome = orchestrator.invoke("Sync", config)
+
+    assert calls == ["a", "b", "c", "d", "e", "a"]
+    assert outcome.metrics["context_evictions"] >= 1
+    assert len(outcome.metrics["prompt_tokens_per_step"]) == 7
+    assert max(outcome.metrics["prompt_tokens_per_step"]) <= 2000 + 1000
+    first_tool = next(
+        m for m in client.chat.completions.calls[-1]["messages"] if m["role"] == "tool"
+    )
+    assert json.loads(first_tool["content"])["evicted"] is True
+
+
+def _stream(*chunks):
+    return iter(chunks)
+
+
+def _delta_chunk(content=None, tool_calls=None):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+
+
+def test_streaming_mode_starts_tools_before_the_stream_ends():
+    first_started = threading.Event()
+
+    def list_pages(course_id):
+        first_started.set()
+        return [{"url": "intro"}]
+
+    def slow_stream():
+        yield _delta_chunk(
+            tool_calls=[
+                SimpleNamespace(
+                    index=0,
+                    id="tc0",
+                    function=SimpleNamespace(name="list_pages", arguments='{"course_id": "1"}'),
+                )
+            ]
+        )
+        yield _delta_chunk(
+            tool_calls=[
+                SimpleNamespace(
+                    index=1,
+                    id="tc1",
+                    function=SimpleNamespace(name="list_pages", arguments='{"course_id": "2"}'),
+                )
+            ]
+        )
+        assert first_started.wait(timeout=2)
+        yield SimpleNamespace(choices=[], usage=SimpleNamespace(completion_tokens=20))
+
+    client = FakeClient(
+        [slow_stream(), _stream(_delta_chunk(content="Do"), _delta_chunk(content="ne."))]
+    )
+    orchestrator = AzureOpenAIOrchestrator(
+        openai_client=client,
+        model="m",
+        tools={"list_pages": list_pages},
+        stream=True,
+    )
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+
+    outcome = orchestrator.invoke("Sync", config)
+
+    assert client.chat.completions.calls[0]["stream"] is True
+    assert outcome.metrics["output_text_length"] == len("Done.")
+    tool_messages = [
+        m for m in client.chat.completions.calls[-1]["messages"] if m["role"] == "tool"
+    ]
+    assert [m["tool_call_id"] for m in tool_messages] == ["tc0", "tc1"]
+    timings = outcome.metrics["step_timings"]
+    assert len(timings) == 2
+    assert timings[0]["completion_tokens"] == 20
+    assert timings[0]["ttft_seconds"] is not None
+    assert outcome.metrics["model_latency"]["steps"] == 2
+
+
+def test_replayed_run_makes_no_model_calls(tmp_path):
+    def list_my_courses():
+        return [{"id": "1"}]
+
+    def responses():
+        return [
+            _response_with_tool_calls(_tool_call("tc1", "list_my_courses", {})),
+            _response_final("Done."),
+        ]
+
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+    backend = LocalCacheBackend(str(tmp_path))
+    live = FakeClient(responses())
+    AzureOpenAIOrchestrator(
+        openai_client=CompletionCache(live, backend, mode="record"),
+        model="m",
+        tools={"list_my_courses": list_my_courses},
+    ).invoke("Sync", config)
+
+    offline = FakeClient([])
+    replay = CompletionCache(offline, backend, mode="replay")
+    outcome = AzureOpenAIOrchestrator(
+        openai_client=replay, model="m", tools={"list_my_courses": list_my_courses}
+    ).invoke("Sync", config)
+
+    assert offline.chat.completions.calls == []
+    assert outcome.success is True
+    assert replay.metrics()["hits"] == 2
+
+
+def test_map_reduce_mode_writes_one_guide_per_course_and_isolates_failures():
+    written = []
+
+    def list_modules(course_id):
+        if course_id == "2":
+            raise RuntimeError("modules unavailable")
+        return []
+
+    def write_study_guide(course_id, content, slug="", meta=None):
+        written.append(course_id)
+        return {"path": f"/guides/{course_id}/study-guide.md"}
+
+    client = FakeClient([_response_final("summary"), _response_final("# Guide")])
+    orchestrator = AzureOpenAIOrchestrator(
+        openai_client=client,
+        model="m",
+        tools={
+            "list_my_courses": lambda: [{"id": "1"}, {"id": "2"}],
+            "list_modules": list_modules,
+            "list_pages": lambda course_id: [{"url": "p", "title": "P"}],
+            "get_page_content": lambda course_id, page_url: {"body": "text"},
+            "list_assignments": lambda course_id: [],
+            "list_announcements": lambda context_codes: [],
+            "write_study_guide": write_study_guide,
+        },
+        orchestration_mode="map_reduce",
+    )
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+
+    outcome = orchestrator.invoke("Sync", config)
+
+    assert written == ["1"]
+    statuses = {r.course_id: (r.status, r.guide_path) for r in outcome.course_results}
+    assert statuses["1"] == ("updated", "/guides/1/study-guide.md")
+    assert statuses["2"][0] == "failed"
+    assert outcome.success is False
+    assert outcome.metrics["summaries"] == {"summarized": 1, "cached": 0}
+
+
+def test_map_reduce_mode_runs_against_the_production_tool_set():
+    class FakeCanvas:
+        def list_my_courses(self):
+            return [{"id": 7, "name": "Physics"}]
+
+        def list_modules(self, course_id):
+            return [{"id": 1, "name": "Week 1"}]
+
+        def get_module_items(self, course_id, module_id):
+            return [{"type": "Page", "page_url": "kinematics"}]
+
+        def list_pages(self, course_id):
+            return [{"url": "kinematics", "title": "Kinematics"}, {"url": "faq", "title": "FAQ"}]
+
+        def get_page_content(self, course_id, page_url):
+            return {"url": page_url, "body": f"<p>{page_url} notes</p>"}
+
+        def list_assignments(self, course_id):
+            return [{"name": "PS1", "due_at": None, "description": "<p>Do it</p>"}]
+
+        def list_announcements(self, context_codes):
+            return []
+
+    class FakeStorage:
+        def __init__(self):
+            self.writes = []
+
+        def write_study_guide(self, course_id, slug, content, meta):
+            self.writes.append((course_id, content))
+            return GuideWriteResult(path=f"/guides/{course_id}/study-guide.md")
+
+    storage = FakeStorage()
+    summaries = [_response_final(f"summary {i}") for i in range(3)]
+    client = FakeClient([*summaries, _response_final("# Guide")])
+    orchestrator = AzureOpenAIOrchestrator(
+        openai_client=client,
+        model="m",
+        tools=build_study_guide_tools(FakeCanvas(), storage),
+        orchestration_mode="map_reduce",
+    )
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+
+    outcome = orchestrator.invoke("Sync", config)
+
+    assert outcome.success is True
+    assert [r.status for r in outcome.course_results] == ["updated"]
+    assert storage.writes == [("7", "# Guide")]
+    assert "faq notes" in json.dumps(client.chat.completions.calls)
+
+
+def test_orchestrator_accounts_usage_per_course_and_tool():
+    def response(message, prompt_tokens):
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message)],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens, completion_tokens=10, prompt_tokens_details=None
+            ),
+        )
+
+    client = FakeClient(
+        [
+            response(
+                SimpleNamespace(
+                    tool_calls=[_tool_call("tc1", "list_modules", {"course_id": "1"})],
+                    content=None,
+                ),
+                100,
+            ),
+            response(SimpleNamespace(tool_calls=None, content="Done."), 150),
+        ]
+    )
+    orchestrator = AzureOpenAIOrchestrator(
+        openai_client=client,
+        model="m",
+        tools={
+            "list_my_courses": lambda: [{"id": "1"}],
+            "list_modules": lambda course_id: [{"id": "m1"}],
+        },
+        orchestration_mode="per_course",
+    )
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+
+    usage = orchestrator.invoke("Sync", config).metrics["usage"]
+
+    assert usage["courses"]["1"]["prompt_tokens"] == 250
+    assert usage["courses"]["1"]["completions"] == 2
+    assert usage["totals"]["completion_tokens"] == 20
+    assert usage["tools"]["list_modules"]["calls"] == 1
+    assert usage["tools"]["list_modules"]["result_bytes"] == len('[{"id": "m1"}]')
+
+
+def test_orchestrator_serializes_tool_results_through_projector():
+    client = FakeClient(
+        [
+            _response_with_tool_calls(_tool_call("tc1", "list_pages", {"course_id": "1"})),
+            _response_final("Done."),
+        ]
+    )
+    projector = ToolResultProjector({"list_pages": ["url"]})
+    orchestrator = AzureOpenAIOrchestrator(
+        openai_client=client,
+        model="m",
+        tools={"list_pages": lambda course_id: [{"url": "intro", "html_url": "https://x"}]},
+        result_projector=projector,
+    )
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+
+    orchestrator.invoke("Sync", config)
+
+    tool_message = client.chat.completions.calls[-1]["messages"][-1]
+    assert tool_message["content"] == '[{"url":"intro"}]'
+    assert projector.metrics()["list_pages"]["calls"] == 1
@@ -0,0 +1,214 @@
+import json
+
+from study_guide_agent.models import GuideWriteResult, StudyGuideConfig
+from study_guide_agent.orchestrators.azure_openai import AzureOpenAIOrchestrator
+from study_guide_agent.orchestrators.batch import LocalBatchServer, parse_batch_output
+from study_guide_agent.runner import StudyGuideRunner
+from study_guide_agent.tools.http_cache import LocalCacheBackend
+
+
+def _complete(body):
+    prompt = body["messages"][0]["content"]
+    if "Broken" in prompt:
+        raise RuntimeError("content filter")
+    return {
+        "choices": [{"message": {"role": "assistant", "content": f"# Guide ({len(prompt)})"}}],
+        "usage": {"prompt_tokens": 100, "completion_tokens": 10},
+    }
+
+
+def _orchestrator(server, store, written):
+    def write_study_guide(course_id, content, slug="", meta=None):
+        written.append((course_id, content, meta))
+        return {"path": f"/guides/{course_id}/study-guide.md"}
+
+    return AzureOpenAIOrchestrator(
+        openai_client=object(),
+        model="batch-model",
+        tools={
+            "list_my_courses": lambda: [
+                {"id": "1", "name": "Algebra", "course_code": "MAT100"},
+                {"id": "2", "name": "Broken"},
+            ],
+            "list_modules": lambda course_id: [],
+            "list_pages": lambda course_id: [{"url": "p", "title": "Notes"}],
+            "get_page_content": lambda course_id, page_url: {"body": "Vectors"},
+            "list_assignments": lambda course_id: [],
+            "list_announcements": lambda context_codes: [],
+            "write_study_guide": write_study_guide,
+        },
+        orchestration_mode="batch",
+        batch_backend=server,
+        batch_store=store,
+    )
+
+
+def test_parse_batch_output_separates_content_and_errors():
+    output = b"\n".join(
+        [
+            json.dumps(
+                {
+                    "custom_id": "course-1",
+                    "response": {
+                        "status_code": 200,
+                        "body": {
+                            "choices": [{"message": {"content": "# G"}}],
+                            "usage": {"prompt_tokens": 3},
+                        },
+                    },
+                }
+            ).encode(),
+            json.dumps(
+                {"custom_id": "course-2", "response": {"status_code": 500, "body": {}}}
+            ).encode(),
+        ]
+    )
+
+    parsed = parse_batch_output(output)
+
+    assert parsed["course-1"] == {"content": "# G", "error": None, "usage": {"prompt_tokens": 3}}
+    assert parsed["course-2"]["content"] is None
+    assert "500" in parsed["course-2"]["error"]
+
+
+def test_batch_mode_submits_then_collects_on_a_later_run(tmp_path):
+    server = LocalBatchServer(_complete, polls_until_complete=1)
+    store = LocalCacheBackend(str(tmp_path))
+    written = []
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+
+    submitted = _orchestrator(server, store, written).invoke("Sync", config)
+
+    assert {r.status for r in submitted.course_results} == {"submitted"}
+    assert submitted.metrics["batch"] == {"submitted_batch_id": "batch_1", "submitted_requests": 2}
+    requests = server.batches["batch_1"]["requests"]
+    assert [r["custom_id"] for r in requests] == ["course-1", "course-2"]
+    assert "Vectors" in requests[0]["body"]["messages"][0]["content"]
+    assert json.loads((tmp_path / "pending.json").read_text())["batch_id"] == "batch_1"
+
+    still_running = _orchestrator(server, store, written).invoke("Sync", config)
+
+    assert {r.status for r in still_running.course_results} == {"pending"}
+    assert len(server.batches) == 1
+    assert written == []
+
+    collected = _orchestrator(server, store, written).invoke("Sync", config)
+
+    statuses = [(r.course_id, r.status) for r in collected.course_results]
+    assert statuses == [("1", "updated"), ("2", "failed")]
+    assert written[0][0] == "1"
+    assert written[0][2]["batch_id"] == "batch_1"
+    assert collected.metrics["batch"]["collected_status"] == "completed"
+    assert "submitted_batch_id" not in collected.metrics["batch"]
+    assert collected.metrics["usage"]["courses"]["1"]["prompt_tokens"] == 100
+    assert collected.success is False
+    assert not (tmp_path / "pending.json").exists()
+    assert len(server.batches) == 1
+
+
+def test_batch_mode_reports_source_failures_and_uses_the_backend_endpoint(tmp_path):
+    server = LocalBatchServer(_complete)
+    server.endpoint = "/v1/chat/completions"
+    store = LocalCacheBackend(str(tmp_path))
+    orchestrator = _orchestrator(server, store, [])
+
+    def list_pages(course_id):
+        if course_id == "2":
+            raise RuntimeError("pages unavailable")
+        return [{"url": "p", "title": "Notes"}]
+
+    orchestrator.tools["list_pages"] = list_pages
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+
+    outcome = orchestrator.invoke("Sync", config)
+
+    statuses = {r.course_id: r.status for r in outcome.course_results}
+    assert statuses == {"1": "submitted", "2": "failed"}
+    assert outcome.success is False
+    requests = server.batches["batch_1"]["requests"]
+    assert [(r["custom_id"], r["url"]) for r in requests] == [("course-1", "/v1/chat/completions")]
+    assert list(json.loads((tmp_path / "pending.json").read_text())["courses"]) == ["1"]
+
+
+class OneCoursePrefetcher:
+    def __init__(self, course: dict) -> None:
+        self.data = course
+
+    def prefetch(self, course_filter=None):
+        return {"1": self.data}
+
+    def course_ids(self):
+        return ["1"]
+
+    def course(self, course_id):
+        return self.data
+
+    def is_complete(self, course_id):
+        return True
+
+    def restrict(self, course_ids):
+        pass
+
+
+class RunnerStorage:
+    def __init__(self) -> None:
+        self.fingerprints = {}
+        self.guides = []
+
+    def read_config(self):
+        return "", ""
+
+    def write_study_guide(self, course_id, slug, content, meta):
+        self.guides.append(course_id)
+        return GuideWriteResult(path=f"/guides/{course_id}/study-guide.md")
+
+    def read_course_fingerprint(self, course_id):
+        return self.fingerprints.get(course_id)
+
+    def write_course_fingerprint(self, course_id, record):
+        self.fingerprints[course_id] = record
+        return f"/guides/{course_id}/fingerprint.json"
+
+    def write_run_history(self, run_id, summary):
+        return f"/runs/{run_id}.json"
+
+
+def test_batch_mode_with_skip_unchanged_generates_each_course_once(tmp_path):
+    server = LocalBatchServer(_complete)
+    store = LocalCacheBackend(str(tmp_path))
+    storage = RunnerStorage()
+    course = {"assignments": [{"id": "a", "updated_at": "2024-01-01"}]}
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+
+    def write_study_guide(course_id, content, slug="", meta=None):
+        written = storage.write_study_guide(course_id, slug, content, meta)
+        return {"path": written.path, "status": written.status}
+
+    def nightly_run():
+        orchestrator = _orchestrator(server, store, [])
+        orchestrator.tools["list_my_courses"] = lambda: [{"id": "1", "name": "Algebra"}]
+        orchestrator.tools["write_study_guide"] = write_study_guide
+        orchestrator.prefetcher = OneCoursePrefetcher(course)
+        outcome = StudyGuideRunner(orchestrator=orchestrator, storage=storage).run(config)
+        return [(r.course_id, r.status) for r in outcome.course_results]
+
+    assert nightly_run() == [("1", "submitted")]
+    submitted_fingerprint = json.loads((tmp_path / "pending.json").read_text())["courses"]["1"][
+        "fingerprint"
+    ]
+    course["assignments"][0]["updated_at"] = "2024-02-01"
+
+    assert nightly_run() == [("1", "updated")]
+    assert storage.fingerprints["1"]["fingerprint"] == submitted_fingerprint
+    assert nightly_run() == [("1", "submitted")]
+    assert nightly_run() == [("1", "updated")]
+    assert nightly_run() == [("1", "unchanged")]
+    assert len(server.batches) == 2
+    assert storage.guides == ["1", "1"]
+    assert not (tmp_path / "pending.json").exists()
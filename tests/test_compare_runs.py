@@ -0,0 +1,37 @@
+import json
+
+from study_guide_agent.compare_runs import compare, flatten_numbers, main
+
+
+class FakeStorage:
+    def __init__(self, runs):
+        self.runs = runs
+
+    def read_run_history(self, run_id):
+        return self.runs.get(run_id)
+
+
+def test_flatten_numbers_skips_booleans_and_strings():
+    flat = flatten_numbers(
+        {"success": True, "provider": "azure_openai", "usage": {"totals": {"prompt_tokens": 10}}}
+    )
+
+    assert flat == {"usage.totals.prompt_tokens": 10.0}
+
+
+def test_compare_pairs_metrics_missing_from_either_run():
+    rows = compare({"duration_seconds": 10, "a": 1}, {"duration_seconds": 5, "b": 2})
+
+    assert rows == [("a", 1.0, None), ("b", None, 2.0), ("duration_seconds", 10.0, 5.0)]
+
+
+def test_main_prints_change_for_runs_from_storage_and_files(tmp_path, capsys):
+    path = tmp_path / "candidate.json"
+    path.write_text(json.dumps({"duration_seconds": 5.0}))
+    storage = FakeStorage({"base": {"duration_seconds": 10.0}})
+
+    assert main(["base", str(path)], storage=storage) == 0
+
+    output = capsys.readouterr().out
+    assert "duration_seconds" in output
+    assert "-50.0%" in output
@@ -0,0 +1,95 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from study_guide_agent.orchestrators.completion_cache import (
+    CompletionCache,
+    CompletionCacheMiss,
+    completion_key,
+)
+from study_guide_agent.tools.http_cache import LocalCacheBackend
+
+
+class CountingCompletions:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if kwargs.get("stream"):
+            return iter(
+                [
+                    SimpleNamespace(
+                        choices=[SimpleNamespace(delta=SimpleNamespace(content="Hi", tool_calls=None))],
+                        usage=None,
+                    )
+                ]
+            )
+        message = SimpleNamespace(content=f"answer {self.calls}", tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _client():
+    completions = CountingCompletions()
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions)), completions
+
+
+def _request(**overrides):
+    return {
+        "model": "m",
+        "messages": [{"role": "user", "content": "Sync"}],
+        "tools": [{"type": "function", "function": {"name": "list_my_courses"}}],
+        **overrides,
+    }
+
+
+def test_completion_key_depends_on_messages_and_tools():
+    base = completion_key("m", [{"role": "user", "content": "a"}], [], False)
+
+    assert base == completion_key("m", [{"content": "a", "role": "user"}], [], False)
+    assert base != completion_key("m", [{"role": "user", "content": "b"}], [], False)
+    assert base != completion_key("m", [{"role": "user", "content": "a"}], [{}], False)
+    assert base != completion_key("m", [{"role": "user", "content": "a"}], [], True)
+
+
+def test_read_through_records_misses_and_serves_hits(tmp_path):
+    client, completions = _client()
+    cache = CompletionCache(client, LocalCacheBackend(str(tmp_path)), mode="read_through")
+
+    first = cache.chat.completions.create(**_request())
+    second = cache.chat.completions.create(**_request())
+
+    assert completions.calls == 1
+    assert first.choices[0].message.content == "answer 1"
+    assert second.choices[0].message.content == "answer 1"
+    assert cache.metrics() == {"mode": "read_through", "hits": 1, "misses": 1, "recorded": 1}
+
+
+def test_replay_serves_recordings_and_rejects_unknown_requests(tmp_path):
+    client, completions = _client()
+    backend = LocalCacheBackend(str(tmp_path))
+    CompletionCache(client, backend, mode="record").chat.completions.create(**_request())
+
+    replay = CompletionCache(client, backend, mode="replay")
+    response = replay.chat.completions.create(**_request())
+
+    assert response.choices[0].message.content == "answer 1"
+    with pytest.raises(CompletionCacheMiss):
+        replay.chat.completions.create(**_request(model="other"))
+    assert completions.calls == 1
+
+
+def test_streamed_chunks_are_recorded_after_the_stream_is_consumed(tmp_path):
+    client, completions = _client()
+    backend = LocalCacheBackend(str(tmp_path))
+    cache = CompletionCache(client, backend, mode="read_through")
+
+    chunks = list(cache.chat.completions.create(**_request(stream=True)))
+    replayed = list(cache.chat.completions.create(**_request(stream=True)))
+
+    assert completions.calls == 1
+    assert chunks[0].choices[0].delta.content == "Hi"
+    assert replayed[0].choices[0].delta.content == "Hi"
+    stored = json.loads(next(tmp_path.iterdir()).read_text())
+    assert len(stored["chunks"]) == 1
@@ -0,0 +1,52 @@
+import gzip
+
+import pytest
+
+from study_guide_agent.storage.compression import (
+    GZIP,
+    ZSTD,
+    decode,
+    read_local,
+    resolve_codec,
+    write_local,
+    zstd_available,
+)
+
+
+def test_resolve_codec_modes():
+    assert resolve_codec("off") is None
+    assert resolve_codec(None) is None
+    assert resolve_codec("GZIP") is GZIP
+    assert resolve_codec("auto") is (ZSTD if zstd_available() else GZIP)
+    with pytest.raises(ValueError):
+        resolve_codec("brotli")
+
+
+def test_gzip_output_is_deterministic_for_identical_content():
+    data = b"# Guide\n" * 50
+
+    assert GZIP.compress(data) == GZIP.compress(data)
+    assert GZIP.decompress(GZIP.compress(data)) == data
+
+
+def test_decode_handles_identity_and_known_encodings():
+    assert decode(b"plain", None) == b"plain"
+    assert decode(b"plain", "identity") == b"plain"
+    assert decode(gzip.compress(b"zipped"), "gzip") == b"zipped"
+    with pytest.raises(ValueError):
+        decode(b"x", "br")
+
+
+def test_write_local_replaces_other_variants(tmp_path):
+    path = tmp_path / "runs" / "run-1.json"
+
+    assert write_local(path, b"one", None) == path
+    compressed = write_local(path, b"two", GZIP)
+
+    assert compressed.name == "run-1.json.gz"
+    assert not path.exists()
+    assert read_local(path) == b"two"
+    assert write_local(path, b"three", None) == path
+    assert not compressed.exists()
+    assert read_local(path) == b"three"
+    assert read_local(tmp_path / "missing.json") is None
@@ -0,0 +1,83 @@
+import json
+
+from study_guide_agent.orchestrators.context_budget import ContextBudget, estimate_tokens
+from study_guide_agent.orchestrators.tool_memo import back_reference
+
+
+def _conversation(payload_chars: int, tool_calls: int) -> list[dict]:
+    messages = [{"role": "user", "content": "Sync"}]
+    for i in range(tool_calls):
+        call_id = f"tc{i}"
+        messages.append(
+            {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": call_id,
+                        "type": "function",
+                        "function": {"name": "get_page_content", "arguments": f'{{"page_url": "p{i}"}}'},
+                    }
+                ],
+            }
+        )
+        messages.append({"role": "tool", "tool_call_id": call_id, "content": "x" * payload_chars})
+    return messages
+
+
+def test_estimate_tokens_rounds_up():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_compact_without_budget_only_measures():
+    messages = _conversation(4000, 6)
+    budget = ContextBudget(max_tokens=None)
+
+    assert budget.compact(messages) == []
+    assert budget.measure(messages) > 6000
+
+
+def test_compact_evicts_oldest_tool_results_and_keeps_recent():
+    messages = _conversation(4000, 6)
+    budget = ContextBudget(max_tokens=3000, keep_recent=2)
+
+    evicted = budget.compact(messages)
+
+    assert evicted == ["tc0", "tc1", "tc2", "tc3"]
+    assert budget.evictions == 4
+    stub = json.loads(messages[2]["content"])
+    assert stub["evicted"] is True
+    assert stub["tool"] == "get_page_content"
+    assert stub["arguments"] == '{"page_url": "p0"}'
+    assert set(messages[2]) == {"role", "tool_call_id", "content"}
+    assert messages[-1]["content"] == "x" * 4000
+    assert budget.compact(messages) == []
+    assert budget.evictions == 4
+
+
+def test_compact_stops_once_under_budget():
+    messages = _conversation(4000, 6)
+    budget = ContextBudget(max_tokens=budget_for(messages) - 500, keep_recent=2)
+
+    assert budget.compact(messages) == ["tc0"]
+
+
+def test_compact_inlines_evicted_results_into_back_references():
+    messages = _conversation(4000, 6)
+    messages[8]["content"] = back_reference("tc0")
+    messages[10]["content"] = back_reference("tc0")
+    budget = ContextBudget(max_tokens=3000, keep_recent=2)
+
+    evicted = budget.compact(messages)
+
+    assert "tc0" in evicted
+    assert messages[8]["content"] == "x" * 4000
+    assert messages[10]["content"] == back_reference("tc3")
+    assert len(budget._estimates) == len(messages)
+    assert budget.measure(messages) == budget_for(messages)
+
+
+def budget_for(messages: list[dict]) -> int:
+    return ContextBudget().measure(messages)
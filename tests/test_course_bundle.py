@@ -0,0 +1,140 @@
+import threading
+import time
+
+from study_guide_agent.tools.course_bundle import build_course_bundle
+from study_guide_agent.tools.html_markdown import normalize_html_fields
+
+
+class FakeCanvasTools:
+    def __init__(self) -> None:
+        self.page_calls = []
+        self._lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def _track(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self._lock:
+            self.active -= 1
+
+    def list_modules(self, course_id):
+        self._track()
+        return [
+            {"id": "m1", "name": "Week 1", "items": [{"type": "Page", "page_url": "intro"}]},
+            {"id": "m2", "name": "Week 2"},
+        ]
+
+    def get_module_items(self, course_id, module_id):
+        return [{"type": "Page", "page_url": "vectors"}]
+
+    def list_pages(self, course_id):
+        self._track()
+        return [
+            {"url": "syllabus", "title": "Syllabus"},
+            {"url": "vectors", "title": "Vectors"},
+            {"url": "intro", "title": "Intro"},
+        ]
+
+    def get_page_content(self, course_id, page_url):
+        self.page_calls.append(page_url)
+        return {"body": {"intro": "a" * 10, "vectors": "b" * 10, "syllabus": "c" * 10}[page_url]}
+
+    def list_assignments(self, course_id):
+        self._track()
+        return [{"id": 1, "name": "A1", "due_at": None, "description": "d" * 5000, "rubric": []}]
+
+    def list_announcements(self, context_codes):
+        self._track()
+        return [
+            {"id": i, "title": f"N{i}", "posted_at": f"2026-01-{i:02d}", "message": "m"}
+            for i in range(1, 15)
+        ]
+
+
+def test_bundle_fetches_listings_in_parallel_and_fills_missing_items():
+    tools = FakeCanvasTools()
+
+    bundle = build_course_bundle(tools, "1")
+
+    assert tools.peak > 1
+    assert bundle["modules"][1]["items"] == [{"type": "Page", "page_url": "vectors"}]
+    assert [page["url"] for page in bundle["pages"]] == ["intro", "vectors", "syllabus"]
+    assert set(bundle["assignments"][0]) == {
+        "id",
+        "name",
+        "due_at",
+        "points_possible",
+        "description",
+    }
+    assert len(bundle["assignments"][0]["description"]) == 2000
+    assert [a["id"] for a in bundle["announcements"]][:2] == [14, 13]
+    assert len(bundle["announcements"]) == 10
+
+
+def test_bundle_truncates_page_bodies_at_the_budget():
+    bundle = build_course_bundle(FakeCanvasTools(), "1", page_char_budget=15)
+
+    assert [(p["body"], p["truncated"]) for p in bundle["pages"]] == [
+        ("a" * 10, False),
+        ("b" * 5, True),
+        (None, True),
+    ]
+
+
+def test_bundle_reports_failed_pages_and_leaves_shared_modules_untouched():
+    shared_modules = [{"id": "m2", "name": "Week 2"}]
+
+    class LockedPageTools(FakeCanvasTools):
+        def list_modules(self, course_id):
+            return shared_modules
+
+        def get_page_content(self, course_id, page_url):
+            if page_url == "vectors":
+                raise PermissionError("401 Unauthorized")
+            return super().get_page_content(course_id, page_url)
+
+    bundle = build_course_bundle(LockedPageTools(), "1")
+
+    pages = {page["url"]: page for page in bundle["pages"]}
+    assert pages["vectors"]["body"] is None
+    assert pages["vectors"]["error"] == "PermissionError: 401 Unauthorized"
+    assert pages["syllabus"]["body"] == "c" * 10
+    assert bundle["modules"][0]["items"] == [{"type": "Page", "page_url": "vectors"}]
+    assert shared_modules == [{"id": "m2", "name": "Week 2"}]
+
+
+def test_bundle_normalizes_bodies_before_spending_the_budget():
+    class HtmlPageTools(FakeCanvasTools):
+        def get_page_content(self, course_id, page_url):
+            styled = '<p style="line-height: 1.5; font-family: Lato">'
+            return {"body": f"{styled}{page_url[0] * 10}</p>{styled}{page_url[0] * 10}</p>"}
+
+    bundle = build_course_bundle(
+        HtmlPageTools(), "1", page_char_budget=40, normalize=normalize_html_fields
+    )
+
+    bodies = [(page["body"], page["truncated"]) for page in bundle["pages"]]
+    assert bodies[0] == ("i" * 10 + "\n\n" + "i" * 10, False)
+    assert bodies[1] == ("v" * 10 + "\n\n" + "v" * 6, True)
+    assert bodies[2] == (None, True)
+
+
+def test_bundle_stops_fetching_pages_once_the_budget_is_spent():
+    class ManyPagesTools(FakeCanvasTools):
+        def list_pages(self, course_id):
+            return [{"url": f"p{index}", "title": f"P{index}"} for index in range(200)]
+
+        def get_page_content(self, course_id, page_url):
+            self.page_calls.append(page_url)
+            return {"body": "x" * 100}
+
+    tools = ManyPagesTools()
+    bundle = build_course_bundle(tools, "1", page_char_budget=1_000, max_workers=4)
+
+    assert len(bundle["pages"]) == 202
+    assert len(tools.page_calls) == 12
+    assert sum(len(page["body"] or "") for page in bundle["pages"]) == 1_000
+    assert bundle["pages"][-1] == {"url": "p199", "title": "P199", "body": None, "truncated": True}
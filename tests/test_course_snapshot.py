@@ -0,0 +1,118 @@
+import json
+from pathlib import Path
+
+import httpx
+
+from study_guide_agent.tools.course_snapshot import CourseSnapshot, matches_course_filter
+
+
+class FakeCanvasTools:
+    def __init__(self) -> None:
+        self.calls: list[tuple] = []
+
+    def list_my_courses(self):
+        self.calls.append(("list_my_courses",))
+        return [
+            {"id": "1", "course_code": "CSC108", "name": "Intro"},
+            {"id": "2", "course_code": "MAT137", "name": "Calculus"},
+        ]
+
+    def list_modules(self, course_id):
+        self.calls.append(("list_modules", course_id))
+        return [{"id": "m1", "items": [{"id": "i1", "page_url": "week-1"}]}]
+
+    def get_module_items(self, course_id, module_id):
+        self.calls.append(("get_module_items", course_id, module_id))
+        return [{"id": "live"}]
+
+    def list_pages(self, course_id):
+        self.calls.append(("list_pages", course_id))
+        return [{"url": "week-1"}]
+
+    def get_page_content(self, course_id, page_url):
+        self.calls.append(("get_page_content", course_id, page_url))
+        return {"url": page_url, "body": f"<p>{course_id}</p>"}
+
+    def list_assignments(self, course_id):
+        self.calls.append(("list_assignments", course_id))
+        if course_id == "2":
+            raise RuntimeError("boom")
+        return [{"id": "a1"}]
+
+    def list_files(self, course_id):
+        self.calls.append(("list_files", course_id))
+        return [{"id": "f1", "updated_at": "2024-01-01T00:00:00Z"}]
+
+    def list_announcements(self, context_codes):
+        self.calls.append(("list_announcements", tuple(context_codes)))
+        return [{"id": f"n-{code}"} for code in context_codes]
+
+
+def test_matches_course_filter_by_id_code_or_name():
+    course = {"id": "1", "course_code": "CSC108H1", "name": "Intro to Programming"}
+    assert matches_course_filter(course, None)
+    assert matches_course_filter(course, "1")
+    assert matches_course_filter(course, "mat137, csc108")
+    assert matches_course_filter(course, "programming")
+    assert not matches_course_filter(course, "11,MAT")
+
+
+def test_prefetch_serves_tools_from_snapshot(tmp_path: Path):
+    canvas = FakeCanvasTools()
+    snapshot = CourseSnapshot(canvas, directory=str(tmp_path))
+
+    metrics = snapshot.prefetch()
+    fetched = len(canvas.calls)
+
+    assert metrics["courses"] == 2
+    assert metrics["pages"] == 2
+    assert snapshot.list_modules("1")[0]["id"] == "m1"
+    assert snapshot.get_module_items("1", "m1") == [{"id": "i1", "page_url": "week-1"}]
+    assert snapshot.get_page_content("2", "week-1")["body"] == "<p>2</p>"
+    assert snapshot.list_announcements(["course_1", "course_2"]) == [
+        {"id": "n-course_1"},
+        {"id": "n-course_2"},
+    ]
+    assert len(canvas.calls) == fetched
+    assert json.loads((tmp_path / "1.json").read_text())["assignments"] == [{"id": "a1"}]
+
+
+def test_snapshot_falls_back_to_live_canvas_on_miss():
+    canvas = FakeCanvasTools()
+    snapshot = CourseSnapshot(canvas)
+    snapshot.prefetch(course_filter="MAT137")
+
+    assert [c["id"] for c in snapshot.list_my_courses()] == ["2"]
+    assert snapshot.metrics()["errors"] == ["2: boom"]
+    assert snapshot.get_module_items("2", "other") == [{"id": "live"}]
+    assert snapshot.get_page_content("1", "week-1")["body"] == "<p>1</p>"
+    assert snapshot.metrics()["misses"] >= 2
+
+
+def _status_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://quercus.example/api/v1/courses/1/files")
+    return httpx.HTTPStatusError(
+        "error", request=request, response=httpx.Response(status_code, request=request)
+    )
+
+
+def test_hidden_optional_listings_read_as_empty_without_marking_incomplete():
+    class HiddenTabsCanvas(FakeCanvasTools):
+        def list_files(self, course_id):
+            raise _status_error(403 if course_id == "1" else 503)
+
+        def list_announcements(self, context_codes):
+            raise _status_error(404)
+
+    snapshot = CourseSnapshot(HiddenTabsCanvas())
+    snapshot.prefetch(course_filter="CSC108")
+
+    assert snapshot.is_complete("1")
+    assert snapshot.course("1")["files"] == []
+    assert snapshot.course("1")["announcements"] == []
+    assert snapshot.metrics()["errors"] == []
+
+    snapshot.prefetch(course_filter="Calculus")
+
+    assert not snapshot.is_complete("2")
+    assert sorted(snapshot.metrics()["errors"]) == ["2: boom", "2: error"]
@@ -0,0 +1,122 @@
+import io
+import zipfile
+
+import httpx
+import pytest
+
+from study_guide_agent.tools import extractors
+from study_guide_agent.tools.canvas_tools import CanvasTools
+from study_guide_agent.tools.extractors import (
+    DOCX_MIME,
+    PDF_MIME,
+    PPTX_MIME,
+    extract_text,
+)
+
+_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def _pptx(*slides: list[str]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for number, lines in enumerate(slides, start=1):
+            paragraphs = "".join(f"<a:p><a:r><a:t>{line}</a:t></a:r></a:p>" for line in lines)
+            archive.writestr(
+                f"ppt/slides/slide{number}.xml",
+                f'<p:sld xmlns:a="{_A}" xmlns:p="p"><a:txBody>{paragraphs}</a:txBody></p:sld>',
+            )
+    return buffer.getvalue()
+
+
+def _docx(*paragraphs: tuple[str, str]) -> bytes:
+    body = ""
+    for style, text in paragraphs:
+        props = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+        body += f"<w:p>{props}<w:r><w:t>{text}</w:t></w:r></w:p>"
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr(
+            "word/document.xml", f'<w:document xmlns:w="{_W}"><w:body>{body}</w:body></w:document>'
+        )
+    return buffer.getvalue()
+
+
+def _pdf(*pages: str) -> bytes:
+    """Smallest valid PDF with one Helvetica text line per page."""
+    count = len(pages)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids ["
+        + b" ".join(f"{4 + 2 * i} 0 R".encode() for i in range(count))
+        + f"] /Count {count} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for index, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * index} 0 R >>".encode()
+        )
+        objects.append(
+            f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream"
+        )
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def test_extract_pdf_marks_page_boundaries_in_order():
+    pytest.importorskip("pypdf")
+    text = extract_text(PDF_MIME, io.BytesIO(_pdf("Limits", "Derivatives")))
+    assert text == "## Page 1\n\nLimits\n\n## Page 2\n\nDerivatives"
+
+
+def test_extract_pptx_marks_slide_boundaries_in_order():
+    data = _pptx(["Intro", "Agenda"], ["Sorting"])
+    text = extract_text(PPTX_MIME, io.BytesIO(data))
+    assert text == "## Slide 1\n\nIntro\nAgenda\n\n## Slide 2\n\nSorting"
+
+
+def test_extract_docx_keeps_headings_and_lists():
+    data = _docx(("Heading1", "Week 1"), ("", "Body text"), ("ListParagraph", "Point"))
+    text = extract_text(DOCX_MIME, io.BytesIO(data))
+    assert text == "## Week 1\nBody text\n- Point"
+
+
+def test_extract_text_respects_char_budget_and_unknown_types():
+    data = _pptx(["a" * 50], ["b" * 50])
+    text = extract_text(PPTX_MIME, io.BytesIO(data), char_budget=70)
+    assert text is not None
+    assert text.endswith("[truncated]")
+    assert "b" * 50 not in text
+    assert extract_text("video/mp4", io.BytesIO(b"\x00")) is None
+
+
+def test_registered_extractor_replaces_base64_in_file_content(monkeypatch):
+    monkeypatch.setitem(
+        extractors._EXTRACTORS,
+        "application/x-test-slides",
+        ("Slide", lambda f: [f.read()[1:].decode()]),
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/v1/files/5":
+            return httpx.Response(
+                200,
+                json={"id": "5", "content-type": "application/x-test-slides", "url": "/dl/5"},
+            )
+        return httpx.Response(200, content=b"\xffhello")
+
+    tools = CanvasTools(token="t", client=httpx.Client(transport=httpx.MockTransport(handler)))
+    result = tools.get_file_content(file_id="5")
+
+    assert result["encoding"] == "extracted"
+    assert result["content"] == "## Slide 1\n\nhello"
@@ -0,0 +1,133 @@
+import asyncio
+
+import httpx
+import pytest
+
+from study_guide_agent.tools import async_canvas_tools, canvas_tools
+from study_guide_agent.tools.async_canvas_tools import AsyncCanvasTools
+from study_guide_agent.tools.canvas_tools import CanvasTools
+from study_guide_agent.tools.file_download import FileDownload, looks_like_text
+
+
+def _file_handler(body: bytes, content_type: str = "application/octet-stream"):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/v1/files/7":
+            return httpx.Response(
+                200,
+                json={
+                    "id": "7",
+                    "display_name": "lecture.bin",
+                    "content-type": content_type,
+                    "url": "/files/7/download",
+                },
+            )
+        return httpx.Response(200, content=body)
+
+    return handler
+
+
+def test_looks_like_text_allows_cut_off_multibyte_character():
+    assert looks_like_text("héllo".encode("utf-8")[:2])
+    assert not looks_like_text(b"\xff\xfe")
+    assert not looks_like_text(b"abc\x00def")
+
+
+def test_file_download_caps_bytes_and_flags_truncation():
+    download = FileDownload(max_bytes=5)
+    assert download.write(b"abc") is True
+    assert download.write(b"defgh") is False
+    assert download.read() == b"abcde"
+    assert download.size == 5
+    assert download.truncated is True
+    download.close()
+
+
+def test_get_file_content_truncates_text_past_max_bytes():
+    client = httpx.Client(transport=httpx.MockTransport(_file_handler(b"x" * 100, "text/plain")))
+    tools = CanvasTools(token="t", client=client, max_file_bytes=10)
+
+    result = tools.get_file_content(file_id="7")
+
+    assert result["encoding"] == "text"
+    assert result["content"] == "x" * 10
+    assert result["truncated"] is True
+
+
+def test_get_file_content_omits_large_binary_instead_of_base64():
+    body = b"\xff\x00" * 1024
+    client = httpx.Client(transport=httpx.MockTransport(_file_handler(body)))
+    tools = CanvasTools(token="t", client=client, max_inline_bytes=512)
+
+    result = tools.get_file_content(file_id="7")
+
+    assert result["encoding"] == "omitted"
+    assert result["content"] == ""
+    assert result["size_bytes"] == len(body)
+    assert result["truncated"] is False
+
+
+def test_get_file_content_caps_inlined_text_at_max_inline_bytes():
+    body = "é" * 600
+    client = httpx.Client(
+        transport=httpx.MockTransport(_file_handler(body.encode("utf-8"), "text/plain"))
+    )
+    tools = CanvasTools(token="t", client=client, max_inline_bytes=101)
+
+    result = tools.get_file_content(file_id="7")
+
+    assert result["encoding"] == "text"
+    assert result["content"] == "é" * 50 + "\n[truncated]"
+    assert result["truncated"] is True
+    assert result["size_bytes"] == 1200
+
+
+class _BrokenStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    def __iter__(self):
+        yield b"partial"
+        raise httpx.ReadError("connection reset")
+
+    async def __aiter__(self):
+        yield b"partial"
+        raise httpx.ReadError("connection reset")
+
+
+def _broken_download_handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/api/v1/files/7":
+        return _file_handler(b"")(request)
+    return httpx.Response(200, stream=_BrokenStream())
+
+
+def _record_downloads(monkeypatch, module) -> list[FileDownload]:
+    downloads: list[FileDownload] = []
+
+    class RecordingDownload(FileDownload):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            downloads.append(self)
+
+    monkeypatch.setattr(module, "FileDownload", RecordingDownload)
+    return downloads
+
+
+def test_download_spool_is_closed_when_the_stream_breaks(monkeypatch):
+    downloads = _record_downloads(monkeypatch, canvas_tools)
+    client = httpx.Client(transport=httpx.MockTransport(_broken_download_handler))
+    tools = CanvasTools(token="t", client=client, max_retries=0)
+
+    with pytest.raises(httpx.ReadError):
+        tools.get_file_content(file_id="7")
+
+    assert len(downloads) == 1
+    assert downloads[0]._spool.closed
+
+
+def test_async_download_spool_is_closed_when_the_stream_breaks(monkeypatch):
+    downloads = _record_downloads(monkeypatch, async_canvas_tools)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_broken_download_handler))
+    tools = AsyncCanvasTools(token="t", client=client, max_retries=0)
+
+    with pytest.raises(httpx.ReadError):
+        asyncio.run(tools.get_file_content(file_id="7"))
+
+    assert len(downloads) == 1
+    assert downloads[0]._spool.closed
@@ -0,0 +1,182 @@
+import base64
+import hashlib
+import threading
+import time
+
+from study_guide_agent.storage.compression import GZIP
+from study_guide_agent.storage.gcs import GCSStorage
+
+
+class FakeBlob:
+    """In-process stand-in for `google.cloud.storage.Blob`."""
+
+    def __init__(self, bucket: "FakeBucket", name: str) -> None:
+        self.bucket = bucket
+        self.name = name
+        self.metadata = None
+        self.content_encoding = None
+        self.content_type = None
+        self.chunk_size = None
+        self.md5_hash = None
+
+    def upload_from_string(self, data, content_type=None):
+        with self.bucket.lock:
+            self.bucket.in_flight += 1
+            self.bucket.max_in_flight = max(self.bucket.max_in_flight, self.bucket.in_flight)
+        time.sleep(0.01)
+        with self.bucket.lock:
+            self.bucket.in_flight -= 1
+            self.bucket.uploads.append((self.name, self.chunk_size))
+            self._store(bytes(data))
+
+    def compose(self, sources):
+        self.bucket.composed.append([source.name for source in sources])
+        self._store(b"".join(self.bucket.objects[source.name]["data"] for source in sources))
+
+    def delete(self):
+        if self.bucket.client.batching:
+            self.bucket.client.batched_deletes.append(self.name)
+        self.bucket.objects.pop(self.name)
+
+    def download_as_bytes(self, raw_download=False):
+        self.bucket.downloads += 1
+        return self.bucket.objects[self.name]["data"]
+
+    def _store(self, data: bytes) -> None:
+        self.bucket.objects[self.name] = {
+            "data": data,
+            "metadata": dict(self.metadata or {}),
+            "content_encoding": self.content_encoding,
+            "md5_hash": base64.b64encode(hashlib.md5(data).digest()).decode("ascii"),
+        }
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.batching = False
+        self.batched_deletes: list[str] = []
+
+    def batch(self):
+        client = self
+
+        class Batch:
+            def __enter__(self):
+                client.batching = True
+
+            def __exit__(self, *exc):
+                client.batching = False
+
+        return Batch()
+
+
+class FakeBucket:
+    def __init__(self) -> None:
+        self.client = FakeClient()
+        self.objects: dict[str, dict] = {}
+        self.uploads: list[tuple[str, int | None]] = []
+        self.composed: list[list[str]] = []
+        self.metadata_reads = 0
+        self.downloads = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+    def get_blob(self, name):
+        self.metadata_reads += 1
+        stored = self.objects.get(name)
+        if stored is None:
+            return None
+        blob = FakeBlob(self, name)
+        blob.metadata = stored["metadata"]
+        blob.content_encoding = stored["content_encoding"]
+        blob.md5_hash = stored["md5_hash"]
+        return blob
+
+
+def test_gcs_storage_writes_guides_in_parallel_and_skips_unchanged():
+    bucket = FakeBucket()
+    storage = GCSStorage(bucket=bucket, upload_workers=8)
+
+    results = storage.write_study_guides(
+        [
+            {"course_id": str(course_id), "slug": "", "content": f"# {course_id}", "meta": {}}
+            for course_id in range(4)
+        ]
+    )
+    again = storage.write_study_guide("0", "", "# 0", {})
+
+    assert [result.path for result in results] == [
+        f"study-guides/{course_id}/study-guide.md" for course_id in range(4)
+    ]
+    assert {result.status for result in results} == {"written"}
+    assert again.status == "unchanged"
+    assert bucket.max_in_flight > 2
+    assert len(bucket.uploads) == 8
+    assert bucket.objects["study-guides/0/course-meta.json"]["metadata"] == {
+        "content_sha256": hashlib.sha256(b"{}").hexdigest()
+    }
+    metrics = storage.upload_metrics()
+    assert metrics["uploads"] == 8
+    assert metrics["skipped_unchanged"] == 2
+    storage.close()
+
+
+def test_gcs_storage_detects_unchanged_objects_across_restarts_and_by_md5():
+    bucket = FakeBucket()
+    GCSStorage(bucket=bucket).write_study_guide("1", "", "Guide", {"n": 1})
+    legacy = bucket.blob("study-guides/2/study-guide.md")
+    legacy.upload_from_string(b"Legacy")
+
+    restarted = GCSStorage(bucket=bucket, upload_workers=1)
+    uploads_before = len(bucket.uploads)
+
+    assert restarted.write_study_guide("1", "", "Guide", {"n": 1}).status == "unchanged"
+    restarted.write_study_guide("2", "", "Legacy", {})
+    assert len(bucket.uploads) == uploads_before + 1
+    assert bucket.uploads[-1][0] == "study-guides/2/course-meta.json"
+
+
+def test_gcs_storage_round_trips_config_runs_artifacts_and_compression():
+    bucket = FakeBucket()
+    bucket.blob("config/study-guide-template.md").upload_from_string(b"# Template")
+    storage = GCSStorage(bucket=bucket, codec=GZIP)
+
+    storage.write_run_history("run-1", {"success": True})
+    storage.write_course_fingerprint("1", {"fingerprint": "abc"})
+    storage.write_artifact("http-cache/x", b"payload" * 50)
+
+    assert storage.read_config() == ("# Template", "")
+    assert storage.read_run_history("run-1") == {"success": True}
+    assert storage.read_run_history("missing") is None
+    assert storage.read_course_fingerprint("1") == {"fingerprint": "abc"}
+    assert storage.read_artifact("http-cache/x") == b"payload" * 50
+    assert bucket.objects["artifacts/http-cache/x"]["content_encoding"] == "gzip"
+    storage.delete_artifact("http-cache/x")
+    assert storage.read_artifact("http-cache/x") is None
+
+
+def test_gcs_storage_uses_resumable_and_composite_uploads_for_large_artifacts():
+    bucket = FakeBucket()
+    storage = GCSStorage(
+        bucket=bucket,
+        resumable_threshold=100,
+        composite_threshold=1_000,
+        composite_part_bytes=300,
+    )
+    medium = bytes(range(256)) * 2
+    large = bytes(range(256)) * 10
+
+    storage.write_artifact("medium", medium)
+    storage.write_artifact("large", large)
+
+    assert ("artifacts/medium", 8 * 1024 * 1024) in bucket.uploads
+    assert len(bucket.composed) == 1 and len(bucket.composed[0]) == 9
+    assert storage.read_artifact("large") == large
+    assert sorted(bucket.client.batched_deletes) == sorted(bucket.composed[0])
+    assert [name for name in bucket.objects if ".part-" in name] == []
+    metrics = storage.upload_metrics()
+    assert metrics["resumable_uploads"] == 1
+    assert metrics["composite_uploads"] == 1
@@ -0,0 +1,89 @@
+from study_guide_agent.orchestrators import build_study_guide_tools
+from study_guide_agent.tools.html_markdown import html_to_markdown, normalize_html_fields
+
+CANVAS_PAGE = """
+<link rel="stylesheet" href="/theme.css">
+<div class="show-content user_content clearfix enhanced" style="font-family: Lato">
+  <h2><span style="color: #2d3b45;">Week 3: Recurrences</span></h2>
+  <p>Read <a href="https://example.edu/notes.pdf" target="_blank">the notes</a> and
+     <strong>bring questions</strong>.</p>
+  <ul>
+    <li>Master theorem
+      <ul><li>case 2</li></ul>
+    </li>
+    <li><em>Substitution</em></li>
+  </ul>
+  <ol><li>First</li><li>Second</li></ol>
+  <p><img class="equation_image" data-equation-content="T(n) = 2T(n/2) + n" alt="LaTeX"></p>
+  <table><tr><th>Topic</th><th>Due</th></tr><tr><td>PS1</td><td>Jan 10</td></tr></table>
+  <pre>def f(n):
+    return n</pre>
+  <script>trackPageView();</script>
+  <iframe src="https://video.example.edu/embed"></iframe>
+</div>
+"""
+
+
+def test_html_to_markdown_keeps_structure_and_drops_chrome():
+    markdown = html_to_markdown(CANVAS_PAGE)
+
+    assert markdown.startswith("## Week 3: Recurrences")
+    assert "Read [the notes](https://example.edu/notes.pdf) and **bring questions**." in markdown
+    assert "- Master theorem\n  - case 2\n- *Substitution*" in markdown
+    assert "1. First\n2. Second" in markdown
+    assert "$T(n) = 2T(n/2) + n$" in markdown
+    assert "| Topic | Due |\n| --- | --- |\n| PS1 | Jan 10 |" in markdown
+    assert "```\ndef f(n):\n    return n\n```" in markdown
+    for dropped in ("trackPageView", "iframe", "style", "<", "font-family"):
+        assert dropped not in markdown
+    assert len(markdown) < len(CANVAS_PAGE) / 2
+
+
+def test_html_to_markdown_passes_plain_text_through_and_memoizes():
+    assert html_to_markdown("  plain text, no markup  ") == "plain text, no markup"
+    assert html_to_markdown("Fish &amp; chips") == "Fish & chips"
+
+    html_to_markdown.cache_clear()
+    html_to_markdown("<p>same body</p>")
+    html_to_markdown("<p>same body</p>")
+    assert html_to_markdown.cache_info().hits == 1
+
+
+def test_normalize_html_fields_only_converts_known_fields():
+    value = {
+        "course_id": "1",
+        "pages": [{"url": "intro", "title": "<b>kept</b>", "body": "<p>Hello</p>"}],
+        "announcements": [{"message": "<h1>Exam</h1>"}],
+        "assignments": [{"description": None}],
+    }
+
+    assert normalize_html_fields(value) == {
+        "course_id": "1",
+        "pages": [{"url": "intro", "title": "<b>kept</b>", "body": "Hello"}],
+        "announcements": [{"message": "# Exam"}],
+        "assignments": [{"description": None}],
+    }
+
+
+class FakeCanvasTools:
+    def get_page_content(self, course_id, page_url):
+        return {"url": page_url, "body": "<p>Page <em>body</em></p>"}
+
+    def list_announcements(self, context_codes):
+        return [{"id": 1, "message": "<div><p>Quiz moved</p></div>"}]
+
+    def list_assignments(self, course_id):
+        return [{"id": 2, "description": "<ul><li>Part A</li></ul>"}]
+
+
+def test_build_study_guide_tools_normalizes_bodies_unless_disabled():
+    tools = build_study_guide_tools(canvas_tools=FakeCanvasTools(), storage=object())
+
+    assert tools["get_page_content"]("1", "intro")["body"] == "Page *body*"
+    assert tools["list_announcements"](["course_1"])[0]["message"] == "Quiz moved"
+    assert tools["list_assignments"]("1")[0]["description"] == "- Part A"
+
+    raw = build_study_guide_tools(
+        canvas_tools=FakeCanvasTools(), storage=object(), html_to_markdown=False
+    )
+    assert raw["get_page_content"]("1", "intro")["body"] == "<p>Page <em>body</em></p>"
@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import httpx
+
+from study_guide_agent.storage.gcs import GCSStorage
+from study_guide_agent.tools.canvas_tools import CanvasTools
+from study_guide_agent.tools.http_cache import (
+    HttpCache,
+    LocalCacheBackend,
+    StorageCacheBackend,
+)
+
+
+def _etag_handler(seen: list[httpx.Request]):
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, json=[{"id": "11"}], headers={"ETag": '"v1"'})
+
+    return handler
+
+
+def test_conditional_request_serves_cached_body_on_304(tmp_path: Path):
+    seen: list[httpx.Request] = []
+    cache = HttpCache(LocalCacheBackend(str(tmp_path)))
+    client = httpx.Client(transport=httpx.MockTransport(_etag_handler(seen)))
+    tools = CanvasTools(token="t", client=client, cache=cache)
+
+    assert tools.list_modules(course_id="42") == [{"id": "11"}]
+    assert tools.list_modules(course_id="42") == [{"id": "11"}]
+
+    assert "If-None-Match" not in seen[0].headers
+    assert seen[1].headers["If-None-Match"] == '"v1"'
+    metrics = tools.cache_metrics()
+    assert metrics["hits"] == 1
+    assert metrics["misses"] == 1
+    assert metrics["bytes_saved"] == len(b'[{"id":"11"}]')
+
+
+def test_cache_index_survives_flush_and_reload(tmp_path: Path):
+    backend = LocalCacheBackend(str(tmp_path))
+    client = httpx.Client(transport=httpx.MockTransport(_etag_handler([])))
+    tools = CanvasTools(token="t", client=client, cache=HttpCache(backend))
+    tools.list_modules(course_id="42")
+    tools.close()
+
+    seen: list[httpx.Request] = []
+    client = httpx.Client(transport=httpx.MockTransport(_etag_handler(seen)))
+    reloaded = CanvasTools(token="t", client=client, cache=HttpCache(backend))
+
+    assert reloaded.list_modules(course_id="42") == [{"id": "11"}]
+    assert seen[0].headers["If-None-Match"] == '"v1"'
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path: Path):
+    cache = HttpCache(LocalCacheBackend(str(tmp_path)), max_bytes=120)
+    headers = httpx.Headers({"ETag": '"x"'})
+    cache.store("a", headers, b"a" * 40)
+    cache.store("b", headers, b"b" * 40)
+    assert cache.lookup("a") is not None
+    cache.store("c", headers, b"c" * 40)
+
+    assert cache.lookup("b") is None
+    assert cache.lookup("a") is not None
+    assert cache.lookup("c") is not None
+    assert not (tmp_path / "b").exists()
+
+
+def test_cache_skips_responses_without_validators(tmp_path: Path):
+    cache = HttpCache(LocalCacheBackend(str(tmp_path)))
+    cache.store("a", httpx.Headers({"Content-Type": "application/json"}), b"[]")
+    assert cache.lookup("a") is None
+
+
+def test_storage_cache_backend_uses_storage_artifacts(tmp_path: Path):
+    storage = GCSStorage(base_dir=str(tmp_path / "gcs"))
+    cache = HttpCache(StorageCacheBackend(storage))
+    cache.store("k", httpx.Headers({"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}), b"{}")
+    cache.flush()
+
+    assert (tmp_path / "gcs" / "artifacts" / "http-cache" / "k").exists()
+    entry = HttpCache(StorageCacheBackend(storage)).lookup("k")
+    assert entry is not None
+    assert entry.validators() == {"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+
+
+def test_backend_errors_never_fail_canvas_requests():
+    class BrokenStorage:
+        def read_artifact(self, name):
+            raise OSError("container missing")
+
+        def write_artifact(self, name, data):
+            raise OSError("container missing")
+
+        def delete_artifact(self, name):
+            raise OSError("container missing")
+
+    cache = HttpCache(StorageCacheBackend(BrokenStorage()))
+    client = httpx.Client(transport=httpx.MockTransport(_etag_handler([])))
+    tools = CanvasTools(token="t", client=client, cache=cache)
+
+    assert tools.list_modules(course_id="42") == [{"id": "11"}]
+    assert tools.list_modules(course_id="42") == [{"id": "11"}]
+    tools.close()
+
+    metrics = cache.metrics()
+    assert metrics["misses"] == 2
+    assert metrics["entries"] == 0
+    assert metrics["backend_errors"] == 3
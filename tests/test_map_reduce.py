@@ -0,0 +1,83 @@
+import json
+from types import SimpleNamespace
+
+from study_guide_agent.orchestrators.map_reduce import MapReducePipeline, course_sources
+from study_guide_agent.tools.http_cache import LocalCacheBackend
+
+
+class EchoCompletions:
+    def __init__(self) -> None:
+        self.prompts = []
+
+    def create(self, **kwargs):
+        prompt = kwargs["messages"][0]["content"]
+        self.prompts.append(prompt)
+        text = "GUIDE" if "Combine these summaries" in prompt else f"summary {len(self.prompts)}"
+        message = SimpleNamespace(content=text, tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _tools(pages, written):
+    def write_study_guide(course_id, content, slug="", meta=None):
+        written.append({"course_id": course_id, "content": content, "meta": meta})
+        return {"path": f"/guides/{course_id}/study-guide.md"}
+
+    return {
+        "list_modules": lambda course_id: [
+            {
+                "id": "m1",
+                "name": "Week 1",
+                "items": [{"title": "Intro", "type": "Page", "page_url": "intro"}],
+            }
+        ],
+        "get_module_items": lambda course_id, module_id: [],
+        "list_pages": lambda course_id: [
+            {"url": "intro", "title": "Intro"},
+            {"url": "syllabus", "title": "Syllabus"},
+        ],
+        "get_page_content": lambda course_id, page_url: {"body": pages[page_url]},
+        "list_assignments": lambda course_id: [{"name": "A1", "due_at": "2026-01-01"}],
+        "list_announcements": lambda context_codes: [],
+        "write_study_guide": write_study_guide,
+    }
+
+
+def test_course_sources_groups_module_pages_and_standalone_pages():
+    tools = _tools({"intro": "<p>Hello</p>", "syllabus": "Rules"}, [])
+
+    sources = course_sources(tools, "1")
+
+    assert [(s["kind"], s["title"]) for s in sources] == [
+        ("module", "Week 1"),
+        ("page", "Syllabus"),
+        ("assignments", "Assignments"),
+    ]
+    assert "<p>Hello</p>" in sources[0]["text"]
+
+
+def test_pipeline_summarizes_in_parallel_and_reuses_cached_summaries(tmp_path):
+    pages = {"intro": "Hello", "syllabus": "Rules"}
+    written = []
+    completions = EchoCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    cache = LocalCacheBackend(str(tmp_path))
+    course = {"id": "1", "name": "Course", "course_code": "CSC100"}
+
+    first = MapReducePipeline(client, "m", _tools(pages, written), summary_cache=cache)
+    result = first.run_course("Use the template.", course)
+
+    assert result == {"path": "/guides/1/study-guide.md"}
+    assert written[0]["content"] == "GUIDE"
+    assert written[0]["meta"]["generated_by"] == "map_reduce"
+    assert first.metrics() == {"summarized": 3, "cached": 0}
+    reduce_prompt = completions.prompts[-1]
+    assert reduce_prompt.startswith("Use the template.")
+    assert "### Module: Week 1" in reduce_prompt
+
+    pages["syllabus"] = "New rules"
+    second = MapReducePipeline(client, "m", _tools(pages, written), summary_cache=cache)
+    second.run_course("Use the template.", course)
+
+    assert second.metrics() == {"summarized": 1, "cached": 2}
+    assert len(list(tmp_path.iterdir())) == 4
+    assert all("summary" in json.loads(p.read_text()) for p in tmp_path.iterdir())
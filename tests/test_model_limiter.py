@@ -0,0 +1,129 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from study_guide_agent.orchestrators.model_limiter import (
+    AdaptiveConcurrencyLimiter,
+    ResilientModelClient,
+    is_retryable,
+)
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = httpx.Response(status_code, headers=headers or {})
+
+
+class ScriptedCompletions:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _client(outcomes):
+    completions = ScriptedCompletions(outcomes)
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions)), completions
+
+
+def test_is_retryable_classifies_status_codes_and_transport_errors():
+    assert is_retryable(StatusError(429))
+    assert is_retryable(StatusError(502))
+    assert is_retryable(TimeoutError())
+    assert not is_retryable(StatusError(400))
+    assert not is_retryable(ValueError("bad"))
+
+
+def test_limiter_halves_on_throttle_and_grows_on_success():
+    limiter = AdaptiveConcurrencyLimiter(initial=8, minimum=1, maximum=10)
+
+    limiter.acquire()
+    limiter.release(throttled=True)
+    assert limiter.limit == 4
+
+    for _ in range(8):
+        limiter.acquire()
+        limiter.release(succeeded=True)
+    assert limiter.limit == 5
+
+
+def test_limiter_blocks_callers_beyond_the_window():
+    limiter = AdaptiveConcurrencyLimiter(initial=2, maximum=2)
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    def work():
+        limiter.acquire()
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        time.sleep(0.05)
+        with lock:
+            in_flight.pop()
+        limiter.release(succeeded=True)
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) == 2
+    assert limiter.max_in_flight == 2
+
+
+def test_client_retries_throttles_honoring_retry_after():
+    sleeps = []
+    client, completions = _client(
+        [StatusError(429, {"Retry-After": "7"}), StatusError(500), "ok"]
+    )
+    resilient = ResilientModelClient(
+        client, base_delay=1.0, sleep=sleeps.append, jitter=lambda: 0.5, request_timeout_seconds=30
+    )
+
+    assert resilient.chat.completions.create(model="m", messages=[]) == "ok"
+    assert sleeps == [7.0, 1.0]
+    assert completions.calls[0]["timeout"] == 30
+    metrics = resilient.metrics()
+    assert metrics["requests"] == 3
+    assert metrics["retries"] == 2
+    assert metrics["throttled"] == 1
+    assert metrics["successes"] == 1
+
+
+def test_client_raises_non_retryable_and_exhausted_errors():
+    client, _ = _client([StatusError(400)])
+    with pytest.raises(StatusError):
+        ResilientModelClient(client, sleep=lambda _: None).chat.completions.create(model="m")
+
+    client, completions = _client([StatusError(503)] * 3)
+    resilient = ResilientModelClient(client, max_retries=2, sleep=lambda _: None)
+    with pytest.raises(StatusError):
+        resilient.chat.completions.create(model="m")
+    assert len(completions.calls) == 3
+    assert resilient.metrics()["failures"] == 1
+
+
+def test_streamed_response_holds_its_slot_until_consumed():
+    client, _ = _client([iter(["a", "b"])])
+    limiter = AdaptiveConcurrencyLimiter(initial=1, maximum=1)
+    resilient = ResilientModelClient(client, limiter=limiter)
+
+    stream = resilient.chat.completions.create(model="m", stream=True)
+    assert next(stream) == "a"
+    assert limiter._in_flight == 1
+    assert list(stream) == ["b"]
+    assert limiter._in_flight == 0
+    assert resilient.metrics()["successes"] == 1
@@ -20,3 +20,9 @@ def test_write_study_guide_has_required_params():
     params = write_tool["function"]["parameters"]["properties"]
     assert "course_id" in params
     assert "content" in params
+
+
+def test_course_bundle_tool_requires_course_id():
+    tools = get_openai_tool_definitions()
+    bundle_tool = next(t for t in tools if t["function"]["name"] == "get_course_bundle")
+    assert bundle_tool["function"]["parameters"]["required"] == ["course_id"]
@@ -0,0 +1,74 @@
+import json
+
+from study_guide_agent.tools.projection import (
+    ToolResultProjector,
+    columnar,
+    field_tree,
+    project,
+)
+
+MODULES = [
+    {
+        "id": 1,
+        "name": "Week 1",
+        "position": 1,
+        "published": True,
+        "items": [
+            {
+                "id": 10,
+                "title": "Intro",
+                "type": "Page",
+                "page_url": "intro",
+                "html_url": "https://q.utoronto.ca/courses/1/modules/items/10",
+                "completion_requirement": {"type": "must_view"},
+            }
+        ],
+    }
+]
+
+
+def test_field_tree_nests_dotted_paths_and_keeps_whole_values():
+    assert field_tree(["id", "items.title", "items.id", "pages", "pages.body"]) == {
+        "id": True,
+        "items": {"title": True, "id": True},
+        "pages": True,
+    }
+
+
+def test_project_applies_allowlist_to_nested_lists():
+    projected = project(MODULES, field_tree(["id", "name", "items.title", "items.page_url"]))
+
+    assert projected == [
+        {"id": 1, "name": "Week 1", "items": [{"title": "Intro", "page_url": "intro"}]}
+    ]
+
+
+def test_columnar_encodes_homogeneous_lists_only():
+    assert columnar([{"a": 1, "b": 2}, {"a": 3, "b": 4}]) == {
+        "columns": ["a", "b"],
+        "rows": [[1, 2], [3, 4]],
+    }
+    assert columnar([{"a": 1}, {"b": 2}]) == [{"a": 1}, {"b": 2}]
+    assert columnar({"pages": [{"u": 1}]}) == {"pages": [{"u": 1}]}
+
+
+def test_projector_serializes_compactly_and_reports_bytes_saved():
+    projector = ToolResultProjector()
+
+    serialized = projector.serialize("list_modules", MODULES)
+
+    assert " " not in serialized.replace("Week 1", "")
+    assert "html_url" not in serialized
+    assert json.loads(serialized)[0]["items"][0]["page_url"] == "intro"
+    stats = projector.metrics()["list_modules"]
+    assert stats["calls"] == 1
+    assert stats["bytes_saved"] == stats["raw_bytes"] - stats["projected_bytes"] > 0
+
+
+def test_projector_passes_unlisted_tools_and_strings_through():
+    projector = ToolResultProjector({"list_pages": None}, use_columnar=True)
+
+    assert projector.serialize("list_pages", [{"url": "a", "x": 1}, {"url": "b", "x": 2}]) == (
+        '{"columns":["url","x"],"rows":[["a",1],["b",2]]}'
+    )
+    assert projector.serialize("get_file_content", "raw text") == "raw text"
@@ -0,0 +1,78 @@
+from datetime import UTC, datetime
+
+import httpx
+
+from study_guide_agent.tools.canvas_tools import CanvasTools
+from study_guide_agent.tools.rate_limit import (
+    CanvasRateLimiter,
+    is_rate_limited,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_parse_retry_after_accepts_seconds_and_http_dates():
+    now = datetime(2024, 1, 1, 0, 0, 0, tzinfo=UTC)
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Mon, 01 Jan 2024 00:00:05 GMT", now=now) == 5.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_is_rate_limited_detects_429_and_empty_bucket_403():
+    assert is_rate_limited(httpx.Response(429))
+    assert is_rate_limited(httpx.Response(403, headers={"X-Rate-Limit-Remaining": "0.0"}))
+    assert not is_rate_limited(httpx.Response(403))
+    assert not is_rate_limited(httpx.Response(200))
+
+
+def test_limiter_paces_below_low_watermark_from_headers():
+    clock = FakeClock()
+    limiter = CanvasRateLimiter(refill_per_second=10.0, low_watermark=100.0, clock=clock)
+    assert limiter.reserve() == 0.0
+
+    limiter.observe(
+        httpx.Response(200, headers={"X-Rate-Limit-Remaining": "95", "X-Request-Cost": "1"})
+    )
+    assert limiter.reserve() == 0.6
+    assert limiter.metrics()["waits"] == 1
+
+    clock.now += 10.0
+    assert limiter.reserve() == 0.0
+
+
+def test_limiter_blocks_all_callers_until_retry_after():
+    clock = FakeClock()
+    limiter = CanvasRateLimiter(clock=clock)
+    limiter.observe(httpx.Response(429, headers={"Retry-After": "2"}))
+
+    assert limiter.reserve() == 2.0
+    clock.now += 1.5
+    assert limiter.reserve() == 0.5
+    assert limiter.metrics()["throttled"] == 1
+
+
+def test_canvas_tools_report_rate_limit_metrics():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, json=[], headers={"X-Rate-Limit-Remaining": "650", "X-Request-Cost": "2"}
+        )
+
+    tools = CanvasTools(
+        token="t",
+        client=httpx.Client(transport=httpx.MockTransport(handler)),
+        rate_limiter=CanvasRateLimiter(),
+    )
+    tools.list_assignments(course_id="42")
+
+    metrics = tools.rate_limit_metrics()
+    assert metrics["requests"] == 1
+    assert metrics["throttled"] == 0
+    assert 649 <= metrics["remaining"] <= 700
@@ -0,0 +1,111 @@
+import json
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from study_guide_agent.storage.azure_blob import AzureBlobStorage
+from study_guide_agent.storage.gcs import GCSStorage
+from study_guide_agent.storage.run_history import RunHistoryIndex, index_record
+
+
+class MemoryStore:
+    def __init__(self) -> None:
+        self.objects: dict[str, bytes] = {}
+        self.reads: list[str] = []
+
+    def read(self, name):
+        self.reads.append(name)
+        return self.objects.get(name)
+
+    def write(self, name, data):
+        self.objects[name] = data
+
+
+def _index(store: MemoryStore, now: list[datetime]) -> RunHistoryIndex:
+    return RunHistoryIndex(
+        store.read,
+        store.write,
+        run_all=lambda calls: [call() for call in calls],
+        clock=lambda: now[0],
+    )
+
+
+def test_index_record_projects_summary_fields():
+    record = index_record(
+        "run-1",
+        {
+            "success": False,
+            "provider": "azure_openai",
+            "errors": 2,
+            "duration_seconds": 12.5,
+            "usage": {"totals": {"prompt_tokens": 100, "estimated_cost_usd": 0.01}},
+            "model_latency": {"p50": 1.0},
+        },
+        datetime(2026, 3, 1, 6, 0, tzinfo=timezone.utc),
+    )
+
+    assert record["status"] == "failed"
+    assert record["recorded_at"] == "2026-03-01T06:00:00+00:00"
+    assert record["prompt_tokens"] == 100
+    assert record["estimated_cost_usd"] == 0.01
+    assert "model_latency" not in record
+
+
+def test_index_appends_daily_partitions_and_queries_only_the_range():
+    store = MemoryStore()
+    now = [datetime(2026, 3, 1, 6, 0, tzinfo=timezone.utc)]
+    index = _index(store, now)
+
+    index.append("run-1", {"success": True, "provider": "azure_openai"})
+    index.append("run-2", {"success": False, "provider": "azure_openai"})
+    now[0] = datetime(2026, 3, 3, 6, 0, tzinfo=timezone.utc)
+    index.append("run-3", {"success": True, "provider": "other"})
+
+    assert sorted(store.objects) == ["index/2026-03-01.jsonl", "index/2026-03-03.jsonl"]
+    assert len(store.objects["index/2026-03-01.jsonl"].splitlines()) == 2
+
+    store.reads.clear()
+    runs = index.query(start="2026-03-02", end=date(2026, 3, 3))
+    assert [record["run_id"] for record in runs] == ["run-3"]
+    assert store.reads == ["index/2026-03-02.jsonl", "index/2026-03-03.jsonl"]
+
+    assert [r["run_id"] for r in index.query(start="2026-03-01", status="failed")] == ["run-2"]
+    assert [r["run_id"] for r in index.query(start="2026-03-01", provider="other")] == ["run-3"]
+    assert len(index.query()) == 3
+    with pytest.raises(ValueError):
+        index.query(status="skipped")
+
+
+def test_storage_adapters_keep_run_detail_and_query_the_index(tmp_path: Path):
+    today = datetime.now(timezone.utc).date()
+    for storage in (
+        AzureBlobStorage(base_dir=str(tmp_path / "azure")),
+        GCSStorage(base_dir=str(tmp_path / "gcs")),
+    ):
+        storage.write_run_history("run-1", {"success": True, "provider": "azure_openai"})
+        storage.write_run_history("run-2", {"success": False, "provider": "azure_openai"})
+
+        assert storage.read_run_history("run-1") == {"success": True, "provider": "azure_openai"}
+        partition = Path(storage.write_run_history("run-3", {"success": True})).parent / "index"
+        assert (partition / f"{today.isoformat()}.jsonl").exists()
+        failed = storage.query_run_history(start=today, end=today, status="failed")
+        assert [record["run_id"] for record in failed] == ["run-2"]
+        assert json.loads(json.dumps(failed))[0]["provider"] == "azure_openai"
+
+
+def test_index_failures_do_not_fail_write_run_history(tmp_path: Path, caplog):
+    for storage in (
+        AzureBlobStorage(base_dir=str(tmp_path / "azure")),
+        GCSStorage(base_dir=str(tmp_path / "gcs")),
+    ):
+
+        def unavailable(name):
+            raise OSError("index unavailable")
+
+        storage._run_index.read = unavailable
+        path = storage.write_run_history("run-1", {"success": True})
+
+        assert storage.read_run_history("run-1") == {"success": True}
+        assert path.endswith("run-1.json")
+    assert caplog.text.count("Could not index run run-1") == 2
@@ -0,0 +1,62 @@
+from study_guide_agent.run_trends import daily_trends, main
+
+
+class FakeStorage:
+    def __init__(self, records):
+        self.records = records
+        self.queries = []
+
+    def query_run_history(self, start=None, end=None, status=None, provider=None):
+        self.queries.append({"start": start, "end": end, "status": status, "provider": provider})
+        return self.records
+
+
+RECORDS = [
+    {
+        "recorded_at": "2026-03-01T06:00:00+00:00",
+        "status": "success",
+        "errors": 0,
+        "duration_seconds": 10.0,
+        "estimated_cost_usd": 0.5,
+    },
+    {
+        "recorded_at": "2026-03-01T18:00:00+00:00",
+        "status": "failed",
+        "errors": 3,
+        "duration_seconds": 20.0,
+        "estimated_cost_usd": None,
+    },
+    {"recorded_at": "2026-03-02T06:00:00+00:00", "status": "success", "errors": 0},
+]
+
+
+def test_daily_trends_aggregates_per_day():
+    assert daily_trends(RECORDS) == [
+        {
+            "day": "2026-03-01",
+            "runs": 2,
+            "failed": 1,
+            "errors": 3,
+            "mean_seconds": 15.0,
+            "cost_usd": 0.5,
+        },
+        {
+            "day": "2026-03-02",
+            "runs": 1,
+            "failed": 0,
+            "errors": 0,
+            "mean_seconds": 0.0,
+            "cost_usd": 0.0,
+        },
+    ]
+
+
+def test_main_queries_the_requested_range(capsys):
+    storage = FakeStorage(RECORDS)
+
+    assert main(["--until", "2026-03-02", "--days", "7", "--status", "failed"], storage) == 0
+
+    query = storage.queries[0]
+    assert (query["start"].isoformat(), query["end"].isoformat()) == ("2026-02-24", "2026-03-02")
+    assert query["status"] == "failed"
+    assert "2026-03-01" in capsys.readouterr().out
@@ -1,16 +1,31 @@
-from study_guide_agent.models import CourseResult, RunOutcome, StudyGuideConfig
+from study_guide_agent.models import (
+    CourseResult,
+    GuideWriteResult,
+    RunOutcome,
+    StudyGuideConfig,
+)
 from study_guide_agent.runner import StudyGuideRunner, load_config_from_env
 
 
 class FakeStorage:
     def __init__(self) -> None:
         self.run_history = []
+        self.fingerprints = {}
 
     def read_config(self) -> tuple[str, str]:
         return "# Template", "- Guideline"
 
-    def write_study_guide(self, course_id: str, slug: str, content: str, meta: dict) -> str:
-        return f"/tmp/{course_id}/study-guide.md"
+    def write_study_guide(
+        self, course_id: str, slug: str, content: str, meta: dict
+    ) -> GuideWriteResult:
+        return GuideWriteResult(path=f"/tmp/{course_id}/study-guide.md")
+
+    def read_course_fingerprint(self, course_id: str) -> dict | None:
+        return self.fingerprints.get(course_id)
+
+    def write_course_fingerprint(self, course_id: str, record: dict) -> str:
+        self.fingerprints[course_id] = record
+        return f"/tmp/{course_id}/fingerprint.json"
 
     def write_run_history(self, run_id: str, summary: dict) -> str:
         self.run_history.append({"run_id": run_id, "summary": summary})
@@ -71,3 +86,133 @@ def test_load_config_from_env_uses_values(monkeypatch):
     assert config.agent_provider == "azure_openai"
     assert config.storage_provider == "azure"
     assert config.task_prompt == "custom prompt"
+
+
+def test_runner_prefetches_before_invoking_orchestrator():
+    events = []
+
+    class Prefetcher:
+        def prefetch(self, course_filter=None):
+            events.append(("prefetch", course_filter))
+            return {}
+
+        def course_ids(self):
+            return []
+
+    class PrefetchingOrchestrator(FakeOrchestrator):
+        prefetcher = Prefetcher()
+
+        def invoke(self, task_prompt, config):
+            events.append(("invoke", None))
+            return super().invoke(task_prompt, config)
+
+    config = StudyGuideConfig(
+        agent_provider="azure_openai",
+        storage_provider="azure",
+        task_prompt="sync",
+        course_filter="CSC108",
+    )
+    StudyGuideRunner(orchestrator=PrefetchingOrchestrator(), storage=FakeStorage()).run(config)
+
+    assert events == [("prefetch", "CSC108"), ("invoke", None)]
+
+
+class SnapshotPrefetcher:
+    def __init__(self, courses: dict, incomplete: tuple[str, ...] = ()) -> None:
+        self.courses = courses
+        self.incomplete = incomplete
+        self.restricted = None
+
+    def prefetch(self, course_filter=None):
+        return {}
+
+    def course_ids(self):
+        return list(self.courses)
+
+    def course(self, course_id):
+        return self.courses.get(course_id)
+
+    def is_complete(self, course_id):
+        return course_id not in self.incomplete
+
+    def restrict(self, course_ids):
+        self.restricted = list(course_ids)
+
+
+def test_runner_skips_courses_with_matching_fingerprints():
+    courses = {
+        "1": {"assignments": [{"id": "a", "updated_at": "2024-01-01"}]},
+        "2": {"assignments": [{"id": "b", "updated_at": "2024-01-01"}]},
+    }
+    storage = FakeStorage()
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+
+    first = FakeOrchestrator()
+    first.prefetcher = SnapshotPrefetcher(courses)
+    StudyGuideRunner(orchestrator=first, storage=storage).run(config)
+    assert set(storage.fingerprints) == {"1"}
+    assert first.prefetcher.restricted is None
+
+    courses["2"]["assignments"][0]["updated_at"] = "2024-02-01"
+    second = FakeOrchestrator()
+    second.prefetcher = SnapshotPrefetcher(courses)
+    outcome = StudyGuideRunner(orchestrator=second, storage=storage).run(config)
+
+    assert second.prefetcher.restricted == ["2"]
+    assert second.invocations[0]["config"].course_filter == "2"
+    assert CourseResult(course_id="1", status="unchanged") in outcome.course_results
+    assert storage.run_history[-1]["summary"]["skipped_courses"] == 1
+
+
+def test_runner_skips_model_when_every_course_is_unchanged():
+    courses = {"1": {"modules": [{"id": "m", "items": []}]}}
+    storage = FakeStorage()
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+    first = FakeOrchestrator()
+    first.prefetcher = SnapshotPrefetcher(courses)
+    StudyGuideRunner(orchestrator=first, storage=storage).run(config)
+
+    second = FakeOrchestrator()
+    second.prefetcher = SnapshotPrefetcher(courses)
+    outcome = StudyGuideRunner(orchestrator=second, storage=storage).run(config)
+
+    assert second.invocations == []
+    assert outcome.course_results == [CourseResult(course_id="1", status="unchanged")]
+    assert outcome.metrics["time_saved_seconds"] >= 0
+
+
+def test_runner_regenerates_incomplete_courses_without_fingerprinting_them():
+    courses = {
+        "1": {"assignments": [{"id": "a", "updated_at": "2024-01-01"}]},
+        "2": {"assignments": []},
+    }
+    storage = FakeStorage()
+    config = StudyGuideConfig(
+        agent_provider="azure_openai", storage_provider="azure", task_prompt="sync"
+    )
+    first = FakeOrchestrator()
+    first.prefetcher = SnapshotPrefetcher(courses, incomplete=("2",))
+    StudyGuideRunner(orchestrator=first, storage=storage).run(config)
+
+    class SecondOrchestrator(FakeOrchestrator):
+        def invoke(self, task_prompt, config):
+            self.invocations.append({"task_prompt": task_prompt, "config": config})
+            return RunOutcome(
+                success=True, course_results=[CourseResult(course_id="2", status="updated")]
+            )
+
+    second = SecondOrchestrator()
+    second.prefetcher = SnapshotPrefetcher(courses, incomplete=("2",))
+    outcome = StudyGuideRunner(orchestrator=second, storage=storage).run(config)
+
+    assert len(second.invocations) == 1
+    assert second.prefetcher.restricted == ["2"]
+    assert {r.course_id: r.status for r in outcome.course_results} == {
+        "1": "unchanged",
+        "2": "updated",
+    }
+    assert set(storage.fingerprints) == {"1"}
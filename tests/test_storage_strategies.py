@@ -1,7 +1,15 @@
+import gzip
+import hashlib
 import json
+import threading
+import time
 from pathlib import Path
+from types import SimpleNamespace
+
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
 
 from study_guide_agent.storage.azure_blob import AzureBlobStorage
+from study_guide_agent.storage.compression import GZIP
 from study_guide_agent.storage.gcs import GCSStorage
 
 
@@ -27,14 +35,15 @@ def test_gcs_storage_writes_study_guide_and_json_meta(tmp_path: Path):
     base = tmp_path / "gcs"
     storage = GCSStorage(base_dir=str(base))
 
-    path = storage.write_study_guide(
+    written = storage.write_study_guide(
         course_id="1234",
         slug="course-slug",
         content="Guide body",
         meta={"course_name": "CSC101", "items": 12},
     )
 
-    guide_path = Path(path)
+    assert written.status == "written"
+    guide_path = Path(written.path)
     assert guide_path.exists()
     assert guide_path.read_text() == "Guide body"
 
@@ -59,3 +68,231 @@ def test_azure_blob_storage_writes_run_history_json(tmp_path: Path):
         "course_count": 4,
         "errors": 0,
     }
+
+
+def test_storage_reads_back_run_history(tmp_path: Path):
+    azure = AzureBlobStorage(base_dir=str(tmp_path / "azure"))
+    gcs = GCSStorage(base_dir=str(tmp_path / "gcs"))
+
+    for storage in (azure, gcs):
+        storage.write_run_history(run_id="run-1", summary={"success": True})
+        assert storage.read_run_history("run-1") == {"success": True}
+        assert storage.read_run_history("missing") is None
+
+
+class FakeBlobClient:
+    def __init__(self, container: "FakeContainerClient", name: str) -> None:
+        self.container = container
+        self.name = name
+
+    def upload_blob(self, data, overwrite=False, metadata=None, content_settings=None):
+        if not self.container.exists:
+            raise ResourceNotFoundError("ContainerNotFound")
+        with self.container.lock:
+            self.container.in_flight += 1
+            self.container.max_in_flight = max(
+                self.container.max_in_flight, self.container.in_flight
+            )
+        time.sleep(0.02)
+        self.container.uploads += 1
+        with self.container.lock:
+            self.container.in_flight -= 1
+            self.container.blobs[self.name] = data
+            self.container.metadata[self.name] = dict(metadata or {})
+            self.container.encodings[self.name] = getattr(
+                content_settings, "content_encoding", None
+            )
+
+    def get_blob_properties(self):
+        self.container.property_reads += 1
+        if self.name not in self.container.blobs:
+            raise LookupError(self.name)
+        return SimpleNamespace(
+            metadata=self.container.metadata[self.name],
+            content_settings=SimpleNamespace(
+                content_md5=bytearray(hashlib.md5(self.container.blobs[self.name]).digest())
+            ),
+        )
+
+    def download_blob(self, decompress=True):
+        if self.name not in self.container.blobs:
+            raise ResourceNotFoundError(self.name)
+        data = self.container.blobs[self.name]
+        encoding = self.container.encodings.get(self.name)
+        return SimpleNamespace(
+            readall=lambda: data,
+            properties=SimpleNamespace(
+                content_settings=SimpleNamespace(content_encoding=encoding)
+            ),
+        )
+
+
+class FakeContainerClient:
+    def __init__(self) -> None:
+        self.blobs: dict[str, bytes] = {}
+        self.metadata: dict[str, dict[str, str]] = {}
+        self.encodings: dict[str, str | None] = {}
+        self.property_reads = 0
+        self.uploads = 0
+        self.blob_clients_created = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.exists = True
+
+    def create_container(self):
+        if self.exists:
+            raise ResourceExistsError("ContainerAlreadyExists")
+        self.exists = True
+
+    def get_blob_client(self, name):
+        self.blob_clients_created += 1
+        return FakeBlobClient(self, name)
+
+
+class FakeBlobServiceClient:
+    def __init__(self) -> None:
+        self.containers: dict[str, FakeContainerClient] = {}
+        self.container_lookups = 0
+
+    def get_container_client(self, name):
+        self.container_lookups += 1
+        return self.containers.setdefault(name, FakeContainerClient())
+
+
+def test_azure_blob_storage_reuses_clients_and_uploads_concurrently():
+    service = FakeBlobServiceClient()
+    storage = AzureBlobStorage(blob_service_client=service, upload_workers=8)
+
+    path = storage.write_study_guide("1", "c", "Guide", {"name": "CSC101"}).path
+    paths = storage.write_study_guides(
+        [
+            {"course_id": str(course_id), "slug": "", "content": "G", "meta": {}}
+            for course_id in range(2, 6)
+        ]
+    )
+    storage.close()
+
+    guides = service.containers["study-guides"]
+    assert path == "study-guides/1/study-guide.md"
+    assert [result.path for result in paths] == [
+        f"study-guides/{course_id}/study-guide.md" for course_id in range(2, 6)
+    ]
+    assert guides.blobs["1/course-meta.json"] == b'{"name": "CSC101"}'
+    assert service.container_lookups == 1
+    assert guides.blob_clients_created == 10
+    assert guides.max_in_flight > 2
+    metrics = storage.upload_metrics()
+    assert metrics["uploads"] == 10
+    assert metrics["bytes"] > 0
+    assert metrics["bytes_per_second"] > 0
+
+
+def test_azure_blob_storage_serial_path_with_one_worker():
+    service = FakeBlobServiceClient()
+    storage = AzureBlobStorage(blob_service_client=service, upload_workers=1)
+
+    storage.write_study_guides(
+        [{"course_id": str(index), "slug": "", "content": "G", "meta": {}} for index in range(3)]
+    )
+
+    assert service.containers["study-guides"].max_in_flight == 1
+    assert storage.upload_metrics()["uploads"] == 6
+
+
+def test_azure_blob_storage_skips_identical_writes_by_content_hash():
+    service = FakeBlobServiceClient()
+    first = AzureBlobStorage(blob_service_client=service, upload_workers=2)
+
+    assert first.write_study_guide("1", "c", "Guide", {"n": 1}).status == "written"
+    assert first.write_study_guide("1", "c", "Guide", {"n": 1}).status == "unchanged"
+    assert first.write_study_guide("1", "c", "Guide", {"n": 2}).status == "written"
+
+    guides = service.containers["study-guides"]
+    assert guides.uploads == 3
+    assert guides.metadata["1/study-guide.md"]["content_sha256"] == hashlib.sha256(
+        b"Guide"
+    ).hexdigest()
+    assert first.upload_metrics()["skipped_unchanged"] == 3
+
+    restarted = AzureBlobStorage(blob_service_client=service, upload_workers=2)
+    reads_before = guides.property_reads
+    assert restarted.write_study_guide("1", "c", "Guide", {"n": 2}).status == "unchanged"
+    assert guides.property_reads == reads_before + 2
+    assert guides.uploads == 3
+
+
+def test_azure_blob_storage_falls_back_to_content_md5_for_legacy_blobs():
+    service = FakeBlobServiceClient()
+    guides = service.get_container_client("study-guides")
+    guides.blobs["1/study-guide.md"] = b"Guide"
+    guides.metadata["1/study-guide.md"] = {}
+    storage = AzureBlobStorage(blob_service_client=service, upload_workers=1)
+
+    storage.write_study_guide("1", "c", "Guide", {})
+
+    assert guides.uploads == 1
+    assert "1/course-meta.json" in guides.blobs
+
+
+def test_local_storage_reports_unchanged_guides(tmp_path: Path):
+    azure = AzureBlobStorage(base_dir=str(tmp_path / "azure"))
+    gcs = GCSStorage(base_dir=str(tmp_path / "gcs"))
+
+    for storage in (azure, gcs):
+        assert storage.write_study_guide("1", "c", "Guide", {}).status == "written"
+        assert storage.write_study_guide("1", "c", "Guide", {}).status == "unchanged"
+        assert storage.write_study_guide("1", "c", "Guide v2", {}).status == "written"
+        assert storage.upload_metrics()["skipped_unchanged"] == 3
+
+
+def test_azure_blob_storage_compresses_blobs_and_reads_them_back():
+    service = FakeBlobServiceClient()
+    storage = AzureBlobStorage(blob_service_client=service, upload_workers=1, codec=GZIP)
+    guide = "# Guide\n" + "Recurrences and the master theorem.\n" * 200
+
+    storage.write_study_guide("1", "c", guide, {"name": "CSC101"})
+    storage.write_run_history("run-1", {"success": True})
+    storage.write_artifact("http-cache/abc", b"payload" * 100)
+
+    guides = service.containers["study-guides"]
+    assert guides.encodings["1/study-guide.md"] == "gzip"
+    assert gzip.decompress(guides.blobs["1/study-guide.md"]).decode("utf-8") == guide
+    assert len(guides.blobs["1/study-guide.md"]) < len(guide) / 10
+    assert storage.read_run_history("run-1") == {"success": True}
+    assert storage.read_artifact("http-cache/abc") == b"payload" * 100
+    metrics = storage.upload_metrics()
+    assert metrics["stored_bytes"] < metrics["bytes"]
+
+
+def test_local_storage_compresses_with_suffix_and_reads_plain_files(tmp_path: Path):
+    for storage in (
+        AzureBlobStorage(base_dir=str(tmp_path / "azure"), codec=GZIP),
+        GCSStorage(base_dir=str(tmp_path / "gcs"), codec=GZIP),
+    ):
+        written = storage.write_study_guide("1", "c", "Guide", {"n": 1})
+        assert written.path.endswith("study-guide.md.gz")
+        assert storage.write_study_guide("1", "c", "Guide", {"n": 1}).status == "unchanged"
+
+        run_path = Path(storage.write_run_history("run-1", {"success": True}))
+        assert run_path.name == "run-1.json.gz"
+        assert storage.read_run_history("run-1") == {"success": True}
+
+        plain = Path(storage.write_artifact("cache/x", b"data")).with_suffix("")
+        plain.write_bytes(b"plain")
+        Path(str(plain) + ".gz").unlink()
+        assert storage.read_artifact("cache/x") == b"plain"
+        storage.delete_artifact("cache/x")
+        assert storage.read_artifact("cache/x") is None
+
+
+def test_azure_blob_storage_creates_a_missing_artifacts_container():
+    service = FakeBlobServiceClient()
+    service.get_container_client("artifacts").exists = False
+    storage = AzureBlobStorage(blob_service_client=service)
+
+    path = storage.write_artifact("http-cache/index.json", b"[]")
+
+    assert path == "artifacts/http-cache/index.json"
+    assert service.containers["artifacts"].exists is True
+    assert storage.read_artifact("http-cache/index.json") == b"[]"
@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+from study_guide_agent.orchestrators.streaming import (
+    StepTiming,
+    StreamAssembler,
+    summarize_timings,
+)
+
+
+def _chunk(content=None, tool_calls=None, usage=None):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=usage)
+
+
+def _call_delta(index, call_id=None, name=None, arguments=None):
+    return SimpleNamespace(
+        index=index,
+        id=call_id,
+        function=SimpleNamespace(name=name, arguments=arguments),
+    )
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        self.now += 0.5
+        return self.now
+
+
+def test_assembler_yields_each_tool_call_once_its_arguments_are_complete():
+    yielded = []
+    seen_before_next_index = []
+
+    def chunks():
+        yield _chunk(tool_calls=[_call_delta(0, "tc0", "list_pages", '{"course_')])
+        yield _chunk(tool_calls=[_call_delta(0, arguments='id": "1"}')])
+        seen_before_next_index.append(list(yielded))
+        yield _chunk(tool_calls=[_call_delta(1, "tc1", "list_files", "{}")])
+        yield SimpleNamespace(choices=[], usage=SimpleNamespace(completion_tokens=12))
+
+    assembler = StreamAssembler(clock=FakeClock())
+    for call in assembler.tool_calls(chunks()):
+        yielded.append((call.id, call.function.name, call.function.arguments))
+
+    assert seen_before_next_index == [[]]
+    assert yielded == [
+        ("tc0", "list_pages", '{"course_id": "1"}'),
+        ("tc1", "list_files", "{}"),
+    ]
+    assert [call.id for call in assembler.assembled_tool_calls] == ["tc0", "tc1"]
+    assert assembler.timing.ttft_seconds == 0.5
+    assert assembler.timing.generation_seconds == 1.0
+    assert assembler.timing.completion_tokens == 12
+    assert assembler.timing.tokens_per_second == 24.0
+
+
+def test_assembler_collects_content_and_estimates_tokens():
+    assembler = StreamAssembler(clock=FakeClock())
+
+    calls = list(assembler.tool_calls([_chunk(content="# Gui"), _chunk(content="de body")]))
+
+    assert calls == []
+    assert assembler.content == "# Guide body"
+    assert assembler.timing.completion_tokens == 3
+
+
+def test_summarize_timings_skips_missing_ttft():
+    summary = summarize_timings(
+        [
+            StepTiming(ttft_seconds=0.2, generation_seconds=1.0, completion_tokens=30),
+            StepTiming(generation_seconds=1.0, completion_tokens=10),
+        ]
+    )
+
+    assert summary == {
+        "steps": 2,
+        "mean_ttft_seconds": 0.2,
+        "generation_seconds": 2.0,
+        "completion_tokens": 40,
+        "tokens_per_second": 20.0,
+    }
@@ -0,0 +1,55 @@
+import threading
+import time
+
+import pytest
+
+from study_guide_agent.orchestrators.tool_memo import ToolCallMemo
+
+
+def test_memo_single_flights_concurrent_identical_calls():
+    memo = ToolCallMemo()
+    executions = []
+    results = {}
+
+    def slow_tool(course_id):
+        executions.append(course_id)
+        time.sleep(0.05)
+        return {"course": course_id}
+
+    def worker(call_id):
+        results[call_id] = memo.call("list_modules", {"course_id": "7"}, call_id, slow_tool)
+
+    threads = [threading.Thread(target=worker, args=(f"tc{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert executions == ["7"]
+    owners = [cid for cid, (_, earlier) in results.items() if earlier is None]
+    assert len(owners) == 1
+    assert all(earlier in (None, owners[0]) for _, earlier in results.values())
+    assert memo.metrics()["hits"] == 3
+
+
+def test_memo_skips_write_tools_and_forgets_failures():
+    memo = ToolCallMemo()
+    writes = []
+    memo.call("write_study_guide", {"course_id": "1"}, "a", lambda course_id: writes.append(1))
+    memo.call("write_study_guide", {"course_id": "1"}, "b", lambda course_id: writes.append(1))
+    assert len(writes) == 2
+
+    def failing(course_id):
+        raise RuntimeError("canvas down")
+
+    with pytest.raises(RuntimeError):
+        memo.call("list_modules", {"course_id": "1"}, "c", failing)
+    result, earlier = memo.call("list_modules", {"course_id": "1"}, "d", lambda course_id: [])
+    assert (result, earlier) == ([], None)
+
+
+def test_memo_forget_drops_entry_owned_by_call_id():
+    memo = ToolCallMemo()
+    memo.call("list_modules", {"course_id": "1"}, "tc1", lambda course_id: [1])
+    memo.forget("tc1")
+    assert memo.call("list_modules", {"course_id": "1"}, "tc2", lambda course_id: [2]) == ([2], None)
@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+from study_guide_agent.orchestrators.usage import ModelPricing, UsageLedger, usage_counts
+
+
+def test_usage_counts_reads_objects_dicts_and_missing_usage():
+    usage = SimpleNamespace(
+        prompt_tokens=100,
+        completion_tokens=20,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=60),
+    )
+
+    assert usage_counts(usage) == (100, 20, 60)
+    assert usage_counts({"prompt_tokens": 5, "completion_tokens": 1}) == (5, 1, 0)
+    assert usage_counts(None) == (0, 0, 0)
+
+
+def test_ledger_attributes_usage_to_courses_and_prices_cached_tokens():
+    ledger = UsageLedger(
+        ModelPricing(
+            prompt_per_million=2.0, completion_per_million=8.0, cached_prompt_per_million=0.5
+        )
+    )
+    ledger.record_completion(
+        {"prompt_tokens": 1000, "completion_tokens": 100, "prompt_tokens_details": {"cached_tokens": 400}},
+        1.25,
+        course_id="1",
+    )
+    ledger.record_completion({"prompt_tokens": 500, "completion_tokens": 50}, 0.5)
+    ledger.record_tool("list_modules", 0.2, 300)
+    ledger.record_tool("list_modules", 0.1, error=True)
+
+    metrics = ledger.metrics()
+
+    assert metrics["courses"]["1"]["estimated_cost_usd"] == round(
+        (600 * 2.0 + 400 * 0.5 + 100 * 8.0) / 1_000_000, 6
+    )
+    assert metrics["courses"]["_unattributed"]["prompt_tokens"] == 500
+    assert metrics["totals"]["prompt_tokens"] == 1500
+    assert metrics["totals"]["cached_tokens"] == 400
+    assert metrics["totals"]["completions"] == 2
+    assert metrics["totals"]["seconds"] == 1.75
+    assert metrics["tools"]["list_modules"] == {
+        "calls": 2,
+        "errors": 1,
+        "seconds": 0.3,
+        "result_bytes": 300,
+    }